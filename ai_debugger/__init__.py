@@ -1,3 +1,5 @@
 from .syntax_checker import SyntaxChecker
 from .runtime_err_checker import detect_runtime_error
-from .utils import format_code, analyze_complexity
\ No newline at end of file
+from .utils import format_code, analyze_complexity
+from .complexity_estimator import estimate_complexity
+from .structural_diff import structural_diff
\ No newline at end of file
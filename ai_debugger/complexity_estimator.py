@@ -0,0 +1,205 @@
+import ast
+from ai_debugger.performance_checkers import _LoopChecker, _source
+from ai_debugger.static_analyzer import ComplexityChecker, StaticAnalyzer, register_checker
+
+_DECISION_NODES = (ast.If, ast.IfExp, ast.ExceptHandler, ast.BoolOp, ast.comprehension, ast.Assert) + (
+    (ast.match_case,) if hasattr(ast, "match_case") else ())
+_LINEAR_BUILTINS = {"sum", "min", "max", "any", "all", "list", "tuple", "set", "dict", "sorted"}
+_LINEAR_METHODS = {"index", "count", "remove"}
+_LIST_ANNOTATIONS = {"list", "List", "Sequence"}
+
+
+def big_o(degree, log=False, exponential=False) -> str:
+    if exponential:
+        return "O(2^n)"
+    terms = []
+    if degree == 1:
+        terms.append("n")
+    elif degree > 1:
+        terms.append(f"n^{degree}")
+    if log:
+        terms.append("log n")
+    return f"O({' '.join(terms) or '1'})"
+
+
+def _names(node):
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+
+
+def _annotation_name(annotation):
+    if isinstance(annotation, ast.Subscript):
+        annotation = annotation.value
+    if isinstance(annotation, ast.Attribute):
+        return annotation.attr
+    return annotation.id if isinstance(annotation, ast.Name) else None
+
+
+@register_checker
+class ScalabilityChecker(_LoopChecker):
+    name = "scalability"
+    node_types = _LoopChecker.node_types + (ast.Assign, ast.Call, ast.Compare) + _DECISION_NODES
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.min_degree = self.options.get("scalability_min_degree", 2)
+        self.frames = []
+        self.results = []
+        self.weights = {}
+
+
+    def growth_depth(self, node):
+        return sum(self.weights.get(id(loop), 0) for loop in self.hot_loops(node))
+
+
+    def add_term(self, node, degree, reason, log=False):
+        frame = self.frames[-1]
+        frame["terms"].append((degree, log))
+        frame["drivers"].append({"line": getattr(node, "lineno", None), "reason": reason, "estimate": big_o(degree, log)})
+
+
+    def visit_function(self, node):
+        arguments = node.args
+        params = getattr(arguments, "posonlyargs", []) + arguments.args + arguments.kwonlyargs
+        params += [arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None]
+        names = {arg.arg for arg in params if arg.arg not in ("self", "cls")}
+        self.frames.append({
+            "node": node,
+            "derived": names,
+            "lists": {arg.arg for arg in params if _annotation_name(arg.annotation) in _LIST_ANNOTATIONS},
+            "terms": [(0, False)],
+            "drivers": [],
+            "recursive_calls": [],
+            "cyclomatic": 1
+        })
+
+
+    def visit_loop(self, node):
+        if not self.frames:
+            return
+        frame = self.frames[-1]
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            frame["cyclomatic"] += 1
+            weight = 1 if _names(node.iter) & frame["derived"] else 0
+            if weight:
+                # Elements of an input are usually inputs too (rows of a matrix, items of a batch).
+                frame["derived"] |= _names(node.target)
+            reason = f"loop over '{_source(node.iter)}'"
+        elif isinstance(node, ast.While):
+            frame["cyclomatic"] += 1
+            weight = 1 if _names(node.test) & frame["derived"] else 0
+            reason = f"while loop on '{_source(node.test)}'"
+        else:
+            weight = 0
+            for generator in node.generators:
+                if _names(generator.iter) & frame["derived"]:
+                    weight += 1
+                    frame["derived"] |= _names(generator.target)
+            reason = f"comprehension over '{_source(node.generators[0].iter)}'"
+
+        self.weights[id(node)] = weight
+        if weight:
+            self.add_term(node, self.growth_depth(node) + weight, reason)
+
+
+    def visit_node(self, node):
+        if not self.frames:
+            return
+        frame = self.frames[-1]
+
+        if isinstance(node, _DECISION_NODES):
+            frame["cyclomatic"] += ComplexityChecker.decision_points(node)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                if _names(node.value) & frame["derived"]:
+                    frame["derived"].add(target.id)
+                if isinstance(node.value, (ast.List, ast.ListComp)):
+                    frame["lists"].add(target.id)
+                else:
+                    frame["lists"].discard(target.id)
+        elif isinstance(node, ast.Compare):
+            for op, container in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)) and (
+                        isinstance(container, ast.ListComp)
+                        or (isinstance(container, ast.Name) and container.id in frame["lists"])):
+                    self.add_term(node, self.growth_depth(node) + 1, f"'in' test on list '{_source(container)}'")
+        else:
+            self.visit_call(node, frame)
+
+
+    def visit_call(self, node, frame):
+        function = frame["node"].name
+        func = node.func
+        if (isinstance(func, ast.Name) and func.id == function) or (
+                isinstance(func, ast.Attribute) and func.attr == function
+                and isinstance(func.value, ast.Name) and func.value.id in ("self", "cls")):
+            frame["recursive_calls"].append((node.lineno, self.loop_depth(node) > 0))
+            return
+
+        depth = self.growth_depth(node)
+        if isinstance(func, ast.Name) and func.id in _LINEAR_BUILTINS and node.args \
+                and _names(node.args[0]) & frame["derived"]:
+            self.add_term(node, depth + 1, f"{func.id}() over '{_source(node.args[0])}'", log=func.id == "sorted")
+        elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            target = func.value.id
+            if func.attr == "sort" and target in frame["derived"]:
+                self.add_term(node, depth + 1, f"'{target}.sort()'", log=True)
+            elif func.attr in _LINEAR_METHODS and (target in frame["lists"] or target in frame["derived"]):
+                self.add_term(node, depth + 1, f"'{target}.{func.attr}()' scans the list")
+
+
+    def depart_function(self, node):
+        frame = self.frames.pop()
+        degree, log = max(frame["terms"])
+        recursive_calls = frame["recursive_calls"]
+        exponential = len(recursive_calls) > 1 or any(in_loop for _, in_loop in recursive_calls)
+        if recursive_calls and not exponential:
+            # Each level of linear recursion repeats the body's own cost.
+            degree += 1
+            frame["drivers"].append({"line": recursive_calls[0][0], "reason": "recursive call",
+                                     "estimate": big_o(degree, log)})
+        elif exponential:
+            frame["drivers"].append({"line": recursive_calls[0][0], "reason": "multiple recursive calls",
+                                     "estimate": big_o(0, exponential=True)})
+
+        result = {
+            "function": node.name,
+            "line": node.lineno,
+            "end_line": getattr(node, "end_lineno", node.lineno),
+            "estimate": big_o(degree, log, exponential),
+            "degree": degree,
+            "log": log,
+            "exponential": exponential,
+            "recursive": bool(recursive_calls),
+            "cyclomatic": frame["cyclomatic"],
+            "drivers": sorted(frame["drivers"], key=lambda driver: driver["line"] or 0)
+        }
+        self.results.append(result)
+
+        if exponential or degree >= self.min_degree:
+            self.report_result(node, result)
+
+
+    def report_result(self, node, result):
+        drivers = ", ".join(f"{driver['reason']} (line {driver['line']})" for driver in result["drivers"][-3:])
+        if result["exponential"]:
+            fix = f"Memoize '{node.name}' (functools.lru_cache) or rewrite it iteratively"
+        elif result["log"]:
+            fix = "Sort once outside the loop and reuse the result (or use bisect/heapq on a sorted list)"
+        else:
+            fix = "Replace the inner scans with a dict/set lookup built once before the outer loop"
+        self.report(node, "Scalability", f"Function '{node.name}' is estimated {result['estimate']}: {drivers}", fix)
+
+
+    @staticmethod
+    def rank_key(result):
+        return result["exponential"], result["degree"], result["log"], result["cyclomatic"]
+
+
+    def metrics(self):
+        return sorted(self.results, key=self.rank_key, reverse=True)
+
+
+def estimate_complexity(code: str, options=None) -> list:
+    return StaticAnalyzer.run(code, [ScalabilityChecker.name], options)["metrics"].get(ScalabilityChecker.name, [])
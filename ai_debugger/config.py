@@ -1,3 +1,4 @@
+import copy
 import logging
 import yaml
 import os
@@ -14,10 +15,112 @@ DEFAULT_CONFIG= {
         "file": "ai_debugger.log"
     },
     "static_analysis": {
-        "enabled_checkers": ["unused", "complexity", "naming"]
+        "enabled_checkers": ["empty", "unused", "complexity", "naming", "performance"],
+        # "empty" runs even when a user's enabled_checkers leaves it out; list it here to turn it off.
+        "disabled_checkers": [],
+        "max_complexity": 10,
+        "hot_loop_depth": 2,
+        "scalability_min_degree": 2
+    },
+    "tools": {
+        "black": {"line_length": 88},
+        "cache": {
+            "enabled": True,
+            "max_entries": 2048,
+            "directory": "~/.ai_debugger/tool_cache",
+            "max_disk_entries": 10000
+        }
+    },
+    "routing": {
+        # Off by default: the default large model is an encoder and can't generate text.
+        "enabled": False,
+        "min_confidence": 0.3,
+        "escalate_on_invalid": True
+    },
+    "profiling": {
+        "timeout": 60,
+        "top": 10,
+        "hot_share": 0.05,
+        "llm_hotspots": 3,
+        "memory": {
+            "interval_ms": 50,
+            "max_samples": 512,
+            "min_growth_samples": 3,
+            "min_growth_kb": 64,
+            "in_analysis": False
+        }
+    },
+    "sessions": {
+        "snapshot_dir": "~/.ai_debugger/sessions",
+        "persist_delay": 1.0
+    },
+    "llm": {
+        "backend": "transformers",
+        "endpoint": None,
+        "timeout": 60,
+        "chunked_analysis": "auto",
+        "prompt_budget": {
+            "default": 512,
+            "microsoft/CodeGPT-small-py": 768,
+            "microsoft/CodeBERT-base": 384
+        },
+        "generation": {
+            "suggest_fix": {"max_new_tokens": 96, "stop": ["\n4.", "\n\n\n"]},
+            "explain": {"max_new_tokens": 256},
+            "auto_fix_line": {"max_new_tokens": 64, "complete_line": True},
+            "auto_fix_file": {"stop_on_fence": True},
+            "optimize": {"max_new_tokens": 128, "stop": ["\n\n\n"]}
+        },
+        "prefix_cache": {
+            "enabled": True,
+            "max_entries": 4,
+            "budget_share": 0.5
+        },
+        "cpu": {
+            "enabled": False,
+            "quantize": True,
+            "onnx": False,
+            "onnx_dir": "~/.ai_debugger/onnx",
+            "workers": 1,
+            "num_threads": None,
+            "interop_threads": None
+        },
+        "cache": {
+            "enabled": True,
+            "max_entries": 512,
+            "directory": "~/.ai_debugger/llm_cache",
+            "max_disk_entries": 10000
+        },
+        "batching": {
+            "enabled": False,
+            "max_batch_size": 8,
+            "batch_window_ms": 5
+        },
+        "server": {
+            "socket": "~/.ai_debugger/llm.sock",
+            "max_batch_size": 8,
+            "batch_window_ms": 5,
+            "preload": []
+        },
+        "stub": {
+            "latency_ms": 0,
+            "tokens_per_second": 0,
+            "prefill_tokens_per_second": 0,
+            "output_tokens": 16
+        }
     }
 }
 
+
+def _merge(base, overrides):
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
 class Config:
     def __init__(self, config_path=None):
         self.config = self._load_config(config_path)
@@ -27,18 +130,15 @@ class Config:
         if not config_path:
             config_path = Path.home() / ".ai_debugger.yml"
 
-        config = DEFAULT_CONFIG.copy()
+        # A deep copy, so neither the merge nor set() can leak into DEFAULT_CONFIG or other Config instances.
+        config = copy.deepcopy(DEFAULT_CONFIG)
 
         if os.path.exists(config_path):
             try:
                 with open(config_path, "r") as f:
                     user_config = yaml.safe_load(f)
                     if user_config:
-                        for key, value in user_config.items():
-                            if isinstance(value, dict) and key in config:
-                                config[key].update(value)
-                            else:
-                                config[key] = value
+                        _merge(config, user_config)
             except yaml.YAMLError as e:
                 print(f"Error loading config file: {e}")
 
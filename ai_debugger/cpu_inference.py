@@ -0,0 +1,129 @@
+import logging
+import os
+import re
+import threading
+
+WORKERS_ENV_VAR = "WEB_CONCURRENCY"
+
+_threads_lock = threading.Lock()
+_interop_configured = False
+
+
+def thread_budget(workers=1, cpu_count=None, num_threads=None, interop_threads=None):
+    cpu_count = cpu_count or os.cpu_count() or 1
+    workers = max(1, int(workers or 1))
+    # Every worker process gets an equal share of the cores so concurrent requests don't oversubscribe them.
+    return num_threads or max(1, cpu_count // workers), interop_threads or 1
+
+
+def _conv1d_to_linear(module):
+    try:
+        from transformers.pytorch_utils import Conv1D
+    except ImportError:
+        return module
+    import torch
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            # GPT-2 style models use Conv1D (weights stored transposed), which quantize_dynamic doesn't touch.
+            linear = torch.nn.Linear(child.weight.shape[0], child.weight.shape[1])
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+    return module
+
+
+def quantize_dynamic_int8(model):
+    import torch
+    model = _conv1d_to_linear(model.eval())
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class CPUInferenceProfile:
+    def __init__(self, enabled=False, quantize=True, onnx=False, onnx_dir="~/.ai_debugger/onnx", workers=1,
+                 num_threads=None, interop_threads=None):
+        self.enabled = enabled
+        self.quantize = quantize
+        self.onnx = onnx
+        self.onnx_dir = os.path.expanduser(onnx_dir) if onnx_dir else None
+        self.workers = max(1, int(workers or 1))
+        self.num_threads, self.interop_threads = thread_budget(self.workers, num_threads=num_threads,
+                                                               interop_threads=interop_threads)
+
+
+    def apply_threads(self):
+        global _interop_configured
+        import torch
+
+        with _threads_lock:
+            torch.set_num_threads(self.num_threads)
+            if not _interop_configured:
+                try:
+                    torch.set_num_interop_threads(self.interop_threads)
+                except RuntimeError as e:
+                    # torch only allows this before the first inter-op parallel work has started.
+                    logging.debug(f"Could not set inter-op threads: {e}")
+                _interop_configured = True
+
+
+    def _onnx_model(self, model_name):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForCausalLM
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = self.interop_threads
+
+        export_dir = os.path.join(self.onnx_dir, re.sub(r"[^\w.-]", "_", model_name)) if self.onnx_dir else None
+        if export_dir and os.path.exists(os.path.join(export_dir, "config.json")):
+            return ORTModelForCausalLM.from_pretrained(export_dir, session_options=options)
+
+        logging.info(f"Exporting {model_name} to ONNX")
+        model = ORTModelForCausalLM.from_pretrained(model_name, export=True, session_options=options)
+        if export_dir:
+            model.save_pretrained(export_dir)
+        return model
+
+
+    def load_pipeline(self, model_name):
+        from transformers import AutoTokenizer, pipeline
+
+        if self.onnx:
+            try:
+                model = self._onnx_model(model_name)
+                return pipeline('text-generation', model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+            except ImportError as e:
+                logging.warning(f"ONNX Runtime export unavailable, using the torch CPU path for {model_name}: {e}")
+
+        self.apply_threads()
+        code_analyzer = pipeline('text-generation', model=model_name, device=-1)
+        if self.quantize:
+            logging.info(f"Applying dynamic int8 quantization to {model_name}")
+            code_analyzer.model = quantize_dynamic_int8(code_analyzer.model)
+        return code_analyzer
+
+
+    def describe(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "quantize": self.quantize,
+            "onnx": self.onnx,
+            "workers": self.workers,
+            "num_threads": self.num_threads,
+            "interop_threads": self.interop_threads
+        }
+
+
+def create_cpu_profile(config=None) -> CPUInferenceProfile:
+    def setting(key, default=None):
+        return config.get(key, default) if config is not None else default
+
+    return CPUInferenceProfile(enabled=setting("llm.cpu.enabled", False),
+                               quantize=setting("llm.cpu.quantize", True),
+                               onnx=setting("llm.cpu.onnx", False),
+                               onnx_dir=setting("llm.cpu.onnx_dir", "~/.ai_debugger/onnx"),
+                               workers=os.environ.get(WORKERS_ENV_VAR) or setting("llm.cpu.workers", 1),
+                               num_threads=setting("llm.cpu.num_threads"),
+                               interop_threads=setting("llm.cpu.interop_threads"))
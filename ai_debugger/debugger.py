@@ -1,20 +1,34 @@
 import logging
-import difflib
+import hashlib
+import json
 import re
 import os
 import ast
 from pathlib import Path
 from ai_debugger.config import Config
+from ai_debugger.diff_engine import diff_lines
+from ai_debugger.structural_diff import normalized_hash, structural_diff
 from ai_debugger.syntax_checker import SyntaxChecker
 from ai_debugger.runtime_err_checker import detect_runtime_error
-from ai_debugger.static_analyzer import StaticAnalyzer
-from ai_debugger.llm_analyzer import analyze_code_with_llm
+from ai_debugger.static_analyzer import StaticAnalyzer, configured_checkers
+from ai_debugger.llm_analyzer import analyze_code_batch_with_llm, analyze_code_with_llm
+from ai_debugger.llm_backends import create_backend
+from ai_debugger.llm_cache import create_cache, normalize_code
+from ai_debugger.model_router import completion_text, create_router
+from ai_debugger.stopping import parses
+from ai_debugger.prompt_builder import DEFAULT_PROMPT_BUDGET, PromptBuilder
+from ai_debugger.profiler import profile_memory, profile_script
 from ai_debugger.pylint_analyzer import analyze_code_with_pylint
+from ai_debugger.variable_inspector import VariableInspector
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+_ADVISORY_CATEGORIES = ("Performance", "Memory")
+
+
 class Debugger:
-    def __init__(self, config_path=None, llm_model=None, max_length=None):
+    def __init__(self, config_path=None, llm_model=None, max_length=None, llm_backend=None, llm_cache=None,
+                 llm_router=None):
         self.config = Config(config_path)
         self.breakpoints = {}
         self.current_file = None
@@ -22,11 +36,148 @@ class Debugger:
         self.variables = {}
         self.call_stack = []
         self.return_value = None
-        self.llm_model = llm_model or "microsoft/CodeGPT-small-py"
+        self.llm_model = llm_model or self.config.get("models.default", "microsoft/CodeGPT-small-py")
         self.max_length = max_length or 150
+        self.inspector = VariableInspector()
+        self.llm_backend = llm_backend or create_backend(self.config)
+        self.llm_cache = llm_cache or create_cache(self.config)
+        self.llm_router = llm_router or create_router(self.config, small_model=self.llm_model)
+
+        budgets = self.config.get("llm.prompt_budget") or {}
+        self.prompt_builder = PromptBuilder(
+            lambda text: self.llm_backend.count_tokens(text, self.llm_model),
+            budget=budgets.get(self.llm_model, budgets.get("default", DEFAULT_PROMPT_BUDGET))
+        )
+
+
+    def _generation_params(self, task, **overrides):
+        params = {"max_new_tokens": self.max_length}
+        params.update(self.config.get(f"llm.generation.{task}") or {})
+        params.update(overrides)
+        return params
+
+
+    def _cache_key(self, task, code, params, extra=(), prefer_large=False):
+        return self.llm_cache.make_key(f"{self.llm_backend.name}:{self.llm_model}",
+                                       dict(params, prefer_large=prefer_large), task, code, extra)
+
+
+    def _file_prefix(self, file_path, code):
+        if not file_path or not self.config.get("llm.prefix_cache.enabled", True):
+            return ""
+
+        # Prompts about the same file version start with identical text, so the backend can reuse its KV cache.
+        header = f"# File: {os.path.basename(file_path)}\n"
+        share = self.config.get("llm.prefix_cache.budget_share", 0.5)
+        available = int(self.prompt_builder.budget * share) - self.prompt_builder.count_tokens(header)
+        if available <= 0:
+            return ""
+        return f"{header}{self.prompt_builder.select_context(code, None, available)}\n\n"
+
+
+    def _prompt_budget(self, prefix):
+        return max(0, self.prompt_builder.budget - self.prompt_builder.count_tokens(prefix)) if prefix else None
+
+
+    def _generate(self, task, code, prompt, extra=(), validate=None, prefer_large=False, prefix="", **overrides):
+        params = self._generation_params(task, **overrides)
+        if prefer_large and not self.llm_router.enabled:
+            # Every request goes to the small model without routing, so "large" must not split the cache either.
+            logging.warning(f"Large model requested for {task} but routing is disabled; using {self.llm_model}")
+            prefer_large = False
+        key_params = params
+        if prefix:
+            # Normalized like the code itself, so a comment or whitespace edit elsewhere in the file still hits.
+            key_params = dict(params, prefix=hashlib.sha256(normalize_code(prefix).encode("utf-8")).hexdigest())
+            params["prefix"] = prefix
+
+        def generate(model_name):
+            return analyze_code_with_llm(prompt, model_name=model_name, backend=self.llm_backend, **params)
+
+        key = self._cache_key(task, code, key_params, extra, prefer_large)
+        # Only the completion is cached: the prompt holds line numbers and text the key deliberately ignores.
+        return self.llm_cache.get_or_generate(key, lambda: completion_text(prompt, self.llm_router.route(
+            task, prompt, generate, validate=validate, prefer_large=prefer_large)))
+
+
+    @staticmethod
+    def _first_code_line(text):
+        text = text.replace('```python', '').replace('```', '')
+        return next((line.strip() for line in text.split('\n') if line.strip()), '')
+
+
+    def _generate_many(self, task, items, postprocess=None):
+        params = self._generation_params(task)
+        keys = [self._cache_key(task, code, params, extra) for code, prompt, extra in items]
+        results = [self.llm_cache.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        # Each group is one padded forward pass, so a large file must not become a single batch of every chunk.
+        batch_size = max(1, int(self.config.get("llm.batching.max_batch_size", 8)))
+        for start in range(0, len(missing), batch_size):
+            group = missing[start:start + batch_size]
+            texts = analyze_code_batch_with_llm([items[i][1] for i in group],
+                                                model_name=self.llm_model,
+                                                backend=self.llm_backend,
+                                                **params)
+            for i, text in zip(group, texts):
+                results[i] = postprocess(items[i][1], text) if postprocess else text
+                self.llm_cache.put(keys[i], results[i])
+        return results
+
+
+    def _use_chunked_analysis(self, code, focus_line):
+        mode = self.config.get("llm.chunked_analysis", "auto")
+        if mode == "always":
+            return True
+        if mode != "auto" or focus_line is not None:
+            return False
+        return self.prompt_builder.count_tokens(code) > self.prompt_builder.budget
+
+
+    def _analyze_chunks(self, file_path, code) -> list:
+        # Lines are numbered within the chunk, so a cached completion still applies after the chunk moves.
+        template = "# {file_name}, lines 1-{end}\n{context}"
+        file_name = os.path.basename(file_path)
+        overhead = self.prompt_builder.count_tokens(template.format(file_name=file_name, end=0, context=""))
+        chunks = self.prompt_builder.split_chunks(code, max(1, self.prompt_builder.budget - overhead))
+
+        items = []
+        for chunk in chunks:
+            prompt = template.format(file_name=file_name, end=chunk["end_line"] - chunk["start_line"] + 1,
+                                     context=chunk["code"])
+            # Keyed on the chunk's normalized AST, so a reformatted or re-commented chunk reuses its analysis.
+            items.append((normalized_hash(chunk["code"]) or chunk["code"], prompt, ()))
+
+        logging.info(f"Running chunked LLM analysis: {len(chunks)} chunks")
+        # Completions are cached without the prompt, which differs between versions sharing a key.
+        responses = self._generate_many("analyze_chunk", items, postprocess=lambda prompt, response: (
+            response[len(prompt):] if response.startswith(prompt) else response))
+
+        findings = []
+        for chunk, completion in zip(chunks, responses):
+            if not completion or not completion.strip():
+                continue
+            findings.append({
+                "issue": "LLM Analysis",
+                "message": completion.strip(),
+                "line": self._chunk_line(completion, chunk),
+                "end_line": chunk["end_line"]
+            })
+        return findings
+
+
+    @staticmethod
+    def _chunk_line(completion, chunk):
+        start, end = chunk["start_line"], chunk["end_line"]
+        for match in re.finditer(r'\bline (\d+)', completion, re.IGNORECASE):
+            number = int(match.group(1))
+            if 1 <= number <= end - start + 1:
+                return start + number - 1
+        return start
 
 
-    def analyze_file(self, file_path: str, should_generate_report=False) -> dict:
+    def analyze_file(self, file_path: str, should_generate_report=False, prefer_large=False) -> dict:
         errors = []
 
         logging.info(f"Analyzing file: {file_path}")
@@ -35,37 +186,60 @@ class Debugger:
         if os.path.getsize(file_path) > max_size:
             return {"error": f"File size exceeds the configured limit of {self.config.get('max_file_size_mb')}MB"}
 
-        llm_model = self.config.get("models.default", "microsoft/CodeGPT-small-py")
+        # Every syntax error in one pass, so a file with several broken lines needs one fix cycle, not several.
+        syntax_errors = SyntaxChecker.analyze_file_all(file_path)
+        syntax_err = syntax_errors[0] if syntax_errors else {}
+        if syntax_errors:
+            errors.extend(syntax_errors)
+            logging.error(f"Syntax errors found: {syntax_errors}")
 
-        syntax_err = SyntaxChecker.analyze_file(file_path)
-        if syntax_err:
-            errors.append(syntax_err)
-            logging.error(f"Syntax error found: {syntax_err}")
+        with open(file_path, "r", encoding="utf-8") as file:
+            code = file.read()
+
+        if syntax_errors:
+            # One token-stream pass gives a corrected line for every line the heuristics can repair.
+            errors_by_line = {error.get("line"): error for error in syntax_errors}
+            for finding in SyntaxChecker.scan_code(code):
+                if finding["line"] in errors_by_line:
+                    errors_by_line[finding["line"]]["fixed_line"] = finding["fixed_line"]
+                else:
+                    errors.append(finding)
 
         runtime_err = detect_runtime_error(file_path)
         if runtime_err:
             errors.append(runtime_err)
             logging.error(f"Runtime error found: {runtime_err}")
 
-        with open(file_path, "r", encoding="utf-8") as file:
-            code = file.read()
-
-        static_issues = StaticAnalyzer.analyze_code(code)
+        static_analysis = StaticAnalyzer.run(code, configured_checkers(self.config.get("static_analysis")),
+                                             self.config.get("static_analysis"))
+        static_issues = static_analysis["issues"]
+        complexity = static_analysis["metrics"].get("scalability", [])
         if static_issues:
             errors.extend(static_issues)
             logging.error(f"Static analysis issues found: {static_issues}")
 
         try:
-            llm_analysis = analyze_code_with_llm(code,
-                                                 model_name=self.llm_model,
-                                                 max_length=self.max_length)
-            if llm_analysis:
-                errors.append({"issue": "LLM Analysis", "message": llm_analysis})
-                logging.info(f"LLM analysis: {llm_analysis}")
+            focus_line = syntax_err.get("line") if syntax_err else None
+            if self._use_chunked_analysis(code, focus_line):
+                llm_analysis = self._analyze_chunks(file_path, code)
+                errors.extend(llm_analysis)
+                logging.info(f"LLM analysis: {len(llm_analysis)} chunk findings")
+            else:
+                failures = self._failure_summary(syntax_errors, runtime_err)
+                template = "The following Python code fails with:\n{failures}\n\n{context}" if failures else "{context}"
+                prompt, context = self.prompt_builder.build(template, code, line_number=focus_line, failures=failures)
+                llm_analysis = self._generate("analyze", context, prompt, extra=(failures,), prefer_large=prefer_large)
+                if llm_analysis:
+                    errors.append({"issue": "LLM Analysis", "message": llm_analysis})
+                    logging.info(f"LLM analysis: {llm_analysis}")
         except (ImportError, RuntimeError):
             llm_analysis = None
             logging.warning("LLM analysis skipped due to missing dependencies")
 
+        if self.config.get("profiling.memory.in_analysis", False) and not syntax_err and not runtime_err:
+            memory_profile = self.profile_memory(file_path)
+            errors.extend(memory_profile.get("findings", []))
+
         pylint_analysis = analyze_code_with_pylint(file_path)
         if pylint_analysis['errors']:
             errors.append({"issue": "Pylint Analysis", "message": pylint_analysis['errors']})
@@ -81,6 +255,8 @@ class Debugger:
 
             result = {"errors": prioritized_errors, "fixes": consolidated_fixes,
                       "validated_issues": validated_issues}
+            if complexity:
+                result["complexity"] = complexity
 
             if should_generate_report:
                 result["report"] = self._generate_report(file_path, {"errors": prioritized_errors})
@@ -91,6 +267,74 @@ class Debugger:
         return {}
 
 
+    @staticmethod
+    def _failure_summary(syntax_errors, runtime_err, traceback_lines=5):
+        if syntax_errors:
+            # Running a file that doesn't parse only repeats its first syntax error.
+            return "\n".join(f"{error.get('error', 'Syntax Error')} on line {error.get('line')}: {error.get('message')}"
+                             for error in syntax_errors)
+        if runtime_err:
+            # The tail of the traceback names the exception and the failing line; the rest would crowd out the code.
+            lines = str(runtime_err.get("message", "")).strip().splitlines()
+            return "\n".join(line for line in lines[-traceback_lines:] if not line.startswith("Traceback"))
+        return ""
+
+
+    def profile_file(self, file_path: str, args=(), suggest=True, prefer_large=False) -> dict:
+        logging.info(f"Profiling file: {file_path}")
+        profile = profile_script(file_path, args,
+                                 timeout=self.config.get("profiling.timeout", 60),
+                                 top=self.config.get("profiling.top", 10),
+                                 hot_share=self.config.get("profiling.hot_share", 0.05))
+        if "hotspots" not in profile or not suggest:
+            return profile
+
+        with open(file_path, 'r', encoding='utf-8') as file:
+            code = file.read()
+        prefix = self._file_prefix(file_path, code)
+        for hotspot in profile["hotspots"][:self.config.get("profiling.llm_hotspots", 3)]:
+            try:
+                prompt, context = self.prompt_builder.build(
+                    "Profiling shows line {line} of this Python code takes {percent}% of the run time "
+                    "({hits} executions):\n\n"
+                    "{context}\n\n"
+                    "Line {line} is: {target_line}\n\n"
+                    "Suggest how to make this line, or the loop around it, faster.",
+                    code,
+                    line_number=hotspot["line"],
+                    budget=self._prompt_budget(prefix),
+                    line=hotspot["line"],
+                    percent=hotspot["percent"],
+                    hits=hotspot["hits"],
+                    target_line=hotspot.get("content", "").strip()
+                )
+                prompt = prefix + prompt
+                suggestion = self._generate("optimize", context, prompt, extra=(hotspot["line"],),
+                                            prefer_large=prefer_large, prefix=prefix)
+                if suggestion:
+                    hotspot["suggestion"] = completion_text(prompt, suggestion).strip()
+            except (ImportError, RuntimeError) as e:
+                logging.warning(f"LLM optimization suggestion skipped: {e}")
+                break
+        return profile
+
+
+    def profile_memory(self, file_path: str, args=()) -> dict:
+        logging.info(f"Profiling memory of file: {file_path}")
+        options = self.config.get("profiling.memory") or {}
+        profile = profile_memory(file_path, args,
+                                 timeout=self.config.get("profiling.timeout", 60),
+                                 top=self.config.get("profiling.top", 10),
+                                 hot_share=self.config.get("profiling.hot_share", 0.05),
+                                 interval_ms=options.get("interval_ms", 50),
+                                 max_samples=options.get("max_samples", 512),
+                                 min_growth_samples=options.get("min_growth_samples", 3),
+                                 min_growth_kb=options.get("min_growth_kb", 64))
+        if profile.get("findings"):
+            logging.warning(f"Memory findings: {profile['findings']}")
+        return profile
+
+
     def set_breakpoint(self, file, line):
         if file not in self.breakpoints:
             self.breakpoints[file] = []
@@ -252,98 +496,161 @@ class Debugger:
         return None
 
 
-    def analyze_changes(self, old_file_path: str, new_file_path: str) -> dict:
+    def _json_safe(self, value):
+        try:
+            json.dumps(value)
+            return value
+        except (TypeError, ValueError):
+            return self.inspector.truncated_repr(value)
+
+
+    def snapshot(self) -> dict:
+        return {
+            "current_file": self.current_file,
+            "current_line": self.current_line,
+            "breakpoints": {file: list(lines) for file, lines in self.breakpoints.items()},
+            "call_stack": [
+                dict(frame, locals={k: self._json_safe(v) for k, v in frame.get('locals', {}).items()})
+                for frame in self.call_stack
+            ],
+            "variables": {k: self._json_safe(v) for k, v in self.variables.items()},
+            "return_value": self._json_safe(self.return_value)
+        }
+
+
+    def restore(self, state: dict):
+        self.current_file = state.get("current_file")
+        self.current_line = state.get("current_line", 0)
+        self.breakpoints = {file: list(lines) for file, lines in state.get("breakpoints", {}).items()}
+        self.call_stack = list(state.get("call_stack", []))
+        self.variables = dict(state.get("variables", {}))
+        self.return_value = state.get("return_value")
+
+
+    def _step_key(self):
+        return self.current_file, self.current_line, len(self.call_stack), id(self.variables)
+
+
+    def variable_handles(self) -> dict:
+        return self.inspector.summarize(self.variables, self._step_key())
+
+
+    def describe_variable(self, ref):
+        try:
+            value = self.inspector.resolve(self.variables, ref)
+        except (KeyError, ValueError):
+            return None
+        return self.inspector.describe(ref, value, self._step_key())
+
+
+    def variable_children(self, ref, offset=0, limit=None):
+        try:
+            return self.inspector.children(self.variables, ref, offset, limit, self._step_key())
+        except (KeyError, ValueError):
+            return None
+
+
+    def analyze_changes(self, old_file_path: str, new_file_path: str, structural=False) -> dict:
         with open(old_file_path, 'r', encoding='utf-8') as f1:
             old_content = f1.readlines()
         with open(new_file_path, 'r', encoding='utf-8') as f2:
             new_content = f2.readlines()
 
-        diff = difflib.unified_diff(old_content, new_content, n=3)
+        diff = diff_lines(old_content, new_content)
+        # Additions are numbered in the new file and removals in the old one; changed_lines are
+        # new-file lines, with a deletion-only hunk marking the line that now follows it.
         changes = {
             "changed_lines": [],
             "added_lines": [],
             "removed_lines": [],
-            "lines_info": {}
+            "lines_info": {},
+            "removed_info": {},
+            "hunks": [],
+            "old_to_new": diff["old_to_new"].tolist(),
+            "new_to_old": diff["new_to_old"].tolist()
         }
 
-        current_line_num = None
-
-        for line in diff:
-            if line.startswith('@@'):
-                match = re.search(r'\+(\d+)', line)
-                if match:
-                    current_line_num = int(match.group(1)) - 1
-                continue
-            if line.startswith('---') or line.startswith('+++'):
-                continue
-            if line.startswith('+'):
-                if current_line_num is not None:
-                    current_line_num += 1
-                    changes["added_lines"].append(current_line_num)
-                    changes["changed_lines"].append(current_line_num)
-                    changes["lines_info"][current_line_num] = {
-                        "change_type": "addition",
-                        "content": line[1:].strip(),
-                    }
-            elif line.startswith('-'):
-                if current_line_num is not None:
-                    changes["removed_lines"].append(current_line_num)
-                    changes["changed_lines"].append(current_line_num)
-                    changes["lines_info"][current_line_num] = {
-                        "change_type": "removal",
-                        "content": line[1:].strip(),
-                    }
-            else:
-                if current_line_num is not None:
-                    current_line_num += 1
-
+        for old_start, old_end, new_start, new_end in diff["hunks"]:
+            changes["hunks"].append({
+                "old_start": old_start + 1,
+                "old_count": old_end - old_start,
+                "new_start": new_start + 1,
+                "new_count": new_end - new_start
+            })
+            for index in range(old_start, old_end):
+                changes["removed_lines"].append(index + 1)
+                changes["removed_info"][index + 1] = {
+                    "change_type": "removal",
+                    "content": old_content[index].strip(),
+                }
+            for index in range(new_start, new_end):
+                changes["added_lines"].append(index + 1)
+                changes["changed_lines"].append(index + 1)
+                changes["lines_info"][index + 1] = {
+                    "change_type": "addition",
+                    "content": new_content[index].strip(),
+                }
+            if new_start == new_end and new_content:
+                changes["changed_lines"].append(min(new_start + 1, len(new_content)))
+
+        if structural:
+            changes["structural"] = structural_diff("".join(old_content), "".join(new_content))
         return changes
 
 
-    def suggest_fix_for_line(self, file_path, line_number):
+    def suggest_fix_for_line(self, file_path, line_number, prefer_large=False):
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
-                code_lines = file.readlines()
+                code = file.read()
+            code_lines = code.splitlines()
 
             if line_number < 0 or line_number >= len(code_lines):
                 return ["Invalid line number"]
 
-            start = max(0, line_number - 2)
-            end = min(len(code_lines), line_number + 3)
-            context = ''.join(code_lines[start:end])
-
             target_line = code_lines[line_number].strip()
 
             suggestions = []
 
-            syntax_check = SyntaxChecker.analyze_line(target_line, line_number)
+            syntax_check = next((finding for finding in SyntaxChecker.scan_code(code)
+                                 if finding["line"] == line_number + 1), None)
             if syntax_check:
                 suggestions.append(syntax_check.get("fix_suggestion", "Add missing syntax element"))
 
             try:
-                prompt = (
-                    f"The following Python code has an issue on line {line_number + 1}:\n\n"
-                    f"{context}\n\n"
-                    f"Line {line_number + 1} is: {target_line}\n\n"
-                    "Provide exactly three suggestions to fix this code. Each suggestion should be a complete, corrected version of the line."
+                prefix = self._file_prefix(file_path, code)
+                prompt, context = self.prompt_builder.build(
+                    "The following Python code has an issue on line {line}:\n\n"
+                    "{context}\n\n"
+                    "Line {line} is: {target_line}\n\n"
+                    "Provide exactly three suggestions to fix this code. Each suggestion should be a complete, corrected version of the line.",
+                    code,
+                    line_number=line_number + 1,
+                    budget=self._prompt_budget(prefix),
+                    line=line_number + 1,
+                    target_line=target_line
                 )
-
-                llm_suggestions = analyze_code_with_llm(
-                    prompt,
-                    model_name=self.llm_model,
-                    max_length=self.max_length
+                prompt = prefix + prompt
+
+                llm_suggestions = self._generate(
+                    "suggest_fix", context, prompt,
+                    extra=(target_line,),
+                    validate=lambda completion: any(
+                        parses(fix) for fix in re.findall(r'`(.*?)`', completion) or [self._first_code_line(completion)]
+                    ),
+                    prefer_large=prefer_large,
+                    prefix=prefix
                 )
 
                 if isinstance(llm_suggestions, str):
-                    import re
+                    llm_suggestions = completion_text(prompt, llm_suggestions)
                     fixes = re.findall(r'(\d+\.\s*`.*?`)', llm_suggestions, re.DOTALL)
                     if fixes:
                         for fix in fixes:
                             code = re.search(r'`(.*?)`', fix)
                             if code:
                                 suggestions.append(code.group(1))
-                    else:
-                        suggestions.append(llm_suggestions)
+                    elif llm_suggestions.strip():
+                        suggestions.append(llm_suggestions.strip())
             except Exception as e:
                 logging.warning(f"LLM suggestion failed: {str(e)}")
 
@@ -364,25 +671,29 @@ class Debugger:
             return [f"Error analyzing line: {str(e)}"]
 
 
-    def explain_code(self, code_segment):
+    def explain_code(self, code_segment, prefer_large=False, file_path=None):
         try:
             if not code_segment or code_segment.strip() == "":
                 return "No code provided to explain."
 
-            prompt = (
-                f"Explain the following Python code in simple terms:\n\n"
-                f"```python\n{code_segment}\n```\n\n"
+            prefix = ""
+            if file_path:
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    prefix = self._file_prefix(file_path, file.read())
+
+            prompt, context = self.prompt_builder.build(
+                "Explain the following Python code in simple terms:\n\n"
+                "```python\n{context}\n```\n\n"
                 "Provide a concise explanation that covers:\n"
                 "1. What the code does\n"
                 "2. How it works\n"
-                "3. Any potential issues or improvements\n"
+                "3. Any potential issues or improvements\n",
+                code_segment,
+                budget=self._prompt_budget(prefix)
             )
+            prompt = prefix + prompt
 
-            explanation = analyze_code_with_llm(
-                prompt,
-                model_name=self.llm_model,
-                max_length=max(500, self.max_length * 2)
-            )
+            explanation = self._generate("explain", context, prompt, prefer_large=prefer_large, prefix=prefix)
 
             if not explanation or explanation.strip() == "":
                 return "Could not generate an explanation for the provided code."
@@ -403,8 +714,13 @@ class Debugger:
             if not analysis or not analysis.get('errors') or len(analysis.get('errors', [])) == 0:
                 return original_code, []
 
+            # Performance and memory findings are advice about valid code, not errors to rewrite.
+            fixable = [error for error in analysis['errors'] if error.get('category') not in _ADVISORY_CATEGORIES]
+            if not fixable:
+                return original_code, []
+
             errors_by_line = {}
-            for error in analysis.get('errors', []):
+            for error in fixable:
                 if 'line' in error:
                     line = error.get('line', 0)
                     if line not in errors_by_line:
@@ -418,12 +734,22 @@ class Debugger:
                     "Return only the corrected code without explanations."
                 )
 
-                fixed_code = analyze_code_with_llm(
-                    prompt,
-                    model_name=self.llm_model,
-                    max_length=max(len(original_code) * 2, self.max_length)
+                prompt_tokens = self.prompt_builder.count_tokens(prompt)
+                if prompt_tokens > self.prompt_builder.budget:
+                    logging.warning(f"File is too large for a whole-file rewrite ({prompt_tokens} tokens, "
+                                    f"budget {self.prompt_builder.budget}); skipping AI fix")
+                    return original_code, []
+
+                # The rewrite needs roughly as many new tokens as the code itself, plus room for the fences.
+                code_tokens = self.prompt_builder.count_tokens(original_code)
+                fixed_code = self._generate(
+                    "auto_fix_file", original_code, prompt,
+                    validate=lambda completion: parses(
+                        (re.search(r'```(?:python)?\n(.*?)\n```', completion, re.DOTALL) or [None, completion])[1]),
+                    max_new_tokens=max(code_tokens + code_tokens // 4, self.max_length)
                 )
 
+                fixed_code = completion_text(prompt, fixed_code)
                 code_match = re.search(r'```(?:python)?\n(.*?)\n```', fixed_code, re.DOTALL)
                 if code_match:
                     fixed_code = code_match.group(1)
@@ -436,6 +762,7 @@ class Debugger:
                 return fixed_code, changes
 
             lines = original_code.split('\n')
+            file_prefix = self._file_prefix(file_path, original_code)
             changes = []
 
             for line_num in sorted(errors_by_line.keys()):
@@ -446,11 +773,8 @@ class Debugger:
                 errors = errors_by_line[line_num]
                 original_line = lines[idx]
 
-                fix_suggestion = None
-                for error in errors:
-                    if 'fix_suggestion' in error:
-                        fix_suggestion = error['fix_suggestion']
-                        break
+                # fix_suggestion is prose ("Remove the unused import ..."); only fixed_line is a replacement line.
+                fix_suggestion = next((error['fixed_line'] for error in errors if error.get('fixed_line')), None)
 
                 if fix_suggestion:
                     lines[idx] = fix_suggestion
@@ -461,27 +785,28 @@ class Debugger:
                         "message": errors[0].get('message', 'Fixed syntax error')
                     })
                 else:
-                    context_start = max(0, idx - 2)
-                    context_end = min(len(lines), idx + 3)
-                    context_code = '\n'.join(lines[context_start:context_end])
-
-                    prompt = (
-                        f"Fix the error on line {idx + 1} in this Python code:\n\n"
-                        f"```python\n{context_code}\n```\n\n"
-                        f"The specific line is: {original_line}\n\n"
-                        f"Error: {errors[0].get('message', 'Unknown error')}\n\n"
-                        "Return only the corrected line of code."
+                    prompt, context_code = self.prompt_builder.build(
+                        "Fix the error on line {line} in this Python code:\n\n"
+                        "```python\n{context}\n```\n\n"
+                        "The specific line is: {original_line}\n\n"
+                        "Error: {message}\n\n"
+                        "Return only the corrected line of code.",
+                        '\n'.join(lines),
+                        line_number=idx + 1,
+                        budget=self._prompt_budget(file_prefix),
+                        line=idx + 1,
+                        original_line=original_line,
+                        message=errors[0].get('message', 'Unknown error')
                     )
 
-                    llm_fix = analyze_code_with_llm(
-                        prompt,
-                        model_name=self.llm_model,
-                        max_length=self.max_length
-                    )
+                    prompt = file_prefix + prompt
+                    llm_fix = self._generate("auto_fix_line", context_code, prompt,
+                                             extra=(original_line.strip(), errors[0].get('message', 'Unknown error')),
+                                             validate=lambda completion: parses(self._first_code_line(completion)),
+                                             prefix=file_prefix)
 
                     if llm_fix:
-                        llm_fix = llm_fix.replace('```python', '').replace('```', '')
-                        fixed_line = next((line.strip() for line in llm_fix.split('\n') if line.strip()), '')
+                        fixed_line = self._first_code_line(completion_text(prompt, llm_fix))
 
                         if fixed_line and fixed_line != original_line:
                             lines[idx] = fixed_line
@@ -502,8 +827,9 @@ class Debugger:
 
     def _prioritize_errors(self, errors: list) -> list:
         priority_order = {"Syntax Error": 1, "Runtime Error": 2, "Pylint Analysis": 3,
-                          "Static Analysis": 4, "LLM Analysis": 5}
-        return sorted(errors, key=lambda x: priority_order.get(x.get("issue", ""), 999))
+                          "Static Analysis": 4, "Performance": 5, "Memory": 5, "LLM Analysis": 6}
+        return sorted(errors, key=lambda x: priority_order.get(x.get("issue", ""),
+                                                               priority_order.get(x.get("category", ""), 999)))
 
 
     def _consolidate_fixes(self, errors: list) -> dict:
@@ -540,11 +866,13 @@ class Debugger:
                         issues_by_line[line] = []
                     issues_by_line[line].append({"source": "pylint", "details": error})
 
-        if isinstance(llm_analysis, dict) and "line" in llm_analysis:
-            line = llm_analysis.get("line", 0)
-            if line not in issues_by_line:
-                issues_by_line[line] = []
-            issues_by_line[line].append({"source": "llm", "details": llm_analysis})
+        llm_findings = llm_analysis if isinstance(llm_analysis, list) else [llm_analysis]
+        for finding in llm_findings:
+            if isinstance(finding, dict) and "line" in finding:
+                line = finding.get("line", 0)
+                if line not in issues_by_line:
+                    issues_by_line[line] = []
+                issues_by_line[line].append({"source": "llm", "details": finding})
 
         for line, detections in issues_by_line.items():
             if len(detections) > 1:
@@ -591,6 +919,8 @@ class Debugger:
         report += "Detailed Issues:\n" + "-" * 50 + "\n\n"
         for i, error in enumerate(errors.get("errors", [])):
             report += f"Issue #{i + 1}: {error.get('issue', 'Unknown')}\n"
+            if "category" in error:
+                report += f"Category: {error['category']}\n"
 
             if "confidence" in error:
                 confidence = error.get("confidence")
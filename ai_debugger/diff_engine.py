@@ -0,0 +1,179 @@
+import array
+import bisect
+from collections import Counter
+
+# Regions with no unique common lines fall back to Myers; past this many edits they are split on
+# unique multi-line windows instead, or reported as a plain replacement if there are none.
+DEFAULT_MAX_COST = 1024
+
+
+def intern_lines(old_lines, new_lines):
+    # Exact ids rather than hash() values, so equal ids always mean equal lines.
+    ids = {}
+    old = array.array("i", [ids.setdefault(line, len(ids)) for line in old_lines])
+    new = array.array("i", [ids.setdefault(line, len(ids)) for line in new_lines])
+    return old, new
+
+
+def _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    a_counts = Counter(a[a_lo:a_hi])
+    b_counts = Counter(b[b_lo:b_hi])
+    positions = {a[i]: i for i in range(a_lo, a_hi) if a_counts[a[i]] == 1 and b_counts[a[i]] == 1}
+    pairs = [(positions[b[j]], j) for j in range(b_lo, b_hi) if b[j] in positions]
+
+    # Longest increasing subsequence of old positions (patience sorting), pairs being in new order.
+    tails, tail_indexes, previous = [], [], [-1] * len(pairs)
+    for index, (i, _) in enumerate(pairs):
+        pile = bisect.bisect_left(tails, i)
+        if pile:
+            previous[index] = tail_indexes[pile - 1]
+        if pile == len(tails):
+            tails.append(i)
+            tail_indexes.append(index)
+        else:
+            tails[pile] = i
+            tail_indexes[pile] = index
+
+    anchors = []
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _window_anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    # Repetitive regions (data tables, generated code) rarely have unique lines but do have unique
+    # runs: build ids for windows of 2, 4, 8, ... lines from pairs of half windows until some match.
+    a_windows, b_windows = a[a_lo:a_hi], b[b_lo:b_hi]
+    width = 1
+    while width * 2 <= min(len(a_windows), len(b_windows)):
+        ids = {}
+        a_windows = array.array("i", [ids.setdefault((a_windows[i], a_windows[i + width]), len(ids))
+                                      for i in range(len(a_windows) - width)])
+        b_windows = array.array("i", [ids.setdefault((b_windows[i], b_windows[i + width]), len(ids))
+                                      for i in range(len(b_windows) - width)])
+        width *= 2
+        anchors = _unique_anchors(a_windows, b_windows, 0, len(a_windows), 0, len(b_windows))
+        if anchors:
+            return width, [(a_lo + i, b_lo + j) for i, j in anchors]
+    return 0, []
+
+
+def _myers(a, b, a_lo, a_hi, b_lo, b_hi, max_cost):
+    n, m = a_hi - a_lo, b_hi - b_lo
+    limit = min(n + m, max_cost)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace = []
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, d, n, m)
+        trace.append(v[offset - d:offset + d + 1])
+    return None
+
+
+def _backtrack(trace, cost, x, y):
+    matches = []
+    for d in range(cost, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = previous[previous_k + d - 1]
+        previous_y = previous_x - previous_k
+        while x > previous_x and y > previous_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = previous_x, previous_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        matches.append((x, y))
+    return matches
+
+
+def match_lines(a, b, max_cost=DEFAULT_MAX_COST):
+    old_to_new = array.array("i", [-1]) * len(a)
+    new_to_old = array.array("i", [-1]) * len(b)
+
+    def link(i, j):
+        old_to_new[i] = j
+        new_to_old[j] = i
+
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        a_lo, a_hi, b_lo, b_hi = regions.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            link(a_lo, b_lo)
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            link(a_hi, b_hi)
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        width, anchors = 1, _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+        if not anchors:
+            if set(a[a_lo:a_hi]).isdisjoint(b[b_lo:b_hi]):
+                continue
+            matches = _myers(a, b, a_lo, a_hi, b_lo, b_hi, max_cost)
+            if matches is not None:
+                for i, j in matches:
+                    link(a_lo + i, b_lo + j)
+                continue
+            width, anchors = _window_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+            if not anchors:
+                continue
+
+        for i, j in anchors:
+            if i < a_lo or j < b_lo:
+                # Window anchors can overlap the previous one.
+                continue
+            for offset in range(width):
+                link(i + offset, j + offset)
+            regions.append((a_lo, i, b_lo, j))
+            a_lo, b_lo = i + width, j + width
+        regions.append((a_lo, a_hi, b_lo, b_hi))
+    return old_to_new, new_to_old
+
+
+def diff_hunks(old_to_new, new_to_old) -> list:
+    # Half-open, 0-based (old_start, old_end, new_start, new_end) ranges of unmatched lines.
+    hunks = []
+    i = j = 0
+    n, m = len(old_to_new), len(new_to_old)
+    while i < n or j < m:
+        if i < n and j < m and old_to_new[i] == j:
+            i += 1
+            j += 1
+            continue
+        old_start, new_start = i, j
+        while i < n and old_to_new[i] == -1:
+            i += 1
+        while j < m and new_to_old[j] == -1:
+            j += 1
+        hunks.append((old_start, i, new_start, j))
+    return hunks
+
+
+def diff_lines(old_lines, new_lines, max_cost=DEFAULT_MAX_COST) -> dict:
+    # old_to_new[i] is the 0-based new index of old line i, or -1 if it was removed; new_to_old mirrors it.
+    old_to_new, new_to_old = match_lines(*intern_lines(old_lines, new_lines), max_cost=max_cost)
+    return {"old_to_new": old_to_new, "new_to_old": new_to_old, "hunks": diff_hunks(old_to_new, new_to_old)}
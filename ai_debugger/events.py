@@ -0,0 +1,91 @@
+import json
+import queue
+import threading
+import time
+
+
+class EventBroker:
+    def __init__(self, max_queue_size=256):
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+
+    def subscribe(self, channel) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(subscriber)
+        return subscriber
+
+
+    def unsubscribe(self, channel, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+
+    def subscriber_count(self, channel) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, []))
+
+
+    def publish(self, channel, event_type: str, data=None) -> int:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, []))
+
+        if not subscribers:
+            return 0
+
+        event = {"type": event_type, "data": data, "timestamp": time.time()}
+        for subscriber in subscribers:
+            self._offer(subscriber, event)
+        return len(subscribers)
+
+
+    @staticmethod
+    def _offer(subscriber, item, retries=1):
+        for _ in range(retries + 1):
+            try:
+                subscriber.put_nowait(item)
+                return True
+            except queue.Full:
+                # A stalled client must not block the debugger; drop its oldest event instead.
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+        return False
+
+
+    def close(self, channel):
+        with self._lock:
+            subscribers = self._subscribers.pop(channel, [])
+        for subscriber in subscribers:
+            # The sentinel must arrive, or the subscriber's stream() keeps sending heartbeats forever.
+            self._offer(subscriber, None, retries=self.max_queue_size)
+
+
+    def stream(self, channel, heartbeat=15.0):
+        subscriber = self.subscribe(channel)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if event is None:
+                    break
+                yield format_sse(event)
+        finally:
+            self.unsubscribe(channel, subscriber)
+
+
+def format_sse(event: dict) -> str:
+    payload = json.dumps(event, default=str)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
@@ -1,7 +1,31 @@
-from transformers import pipeline
+import threading
+from ai_debugger.llm_backends import LLMBackend, create_backend
 
+_default_backend = None
+_default_backend_lock = threading.Lock()
 
-def analyze_code_with_llm(code: str, model_name='microsoft/CodeGPT-small-py', max_length=150) -> str:
-    code_analyzer = pipeline('text-generation', model=model_name)
-    response = code_analyzer(code, max_length=max_length, num_return_sequences=1, truncation=True)
-    return response[0]['generated_text']
+
+def get_default_backend() -> LLMBackend:
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = create_backend()
+        return _default_backend
+
+
+def set_default_backend(backend: LLMBackend):
+    global _default_backend
+    with _default_backend_lock:
+        _default_backend = backend
+
+
+def analyze_code_with_llm(code: str, model_name='microsoft/CodeGPT-small-py', max_length=150, backend=None,
+                          **params) -> str:
+    backend = backend or get_default_backend()
+    return backend.generate(code, model_name, max_length=max_length, **params)
+
+
+def analyze_code_batch_with_llm(prompts: list, model_name='microsoft/CodeGPT-small-py', max_length=150,
+                                backend=None, **params) -> list:
+    backend = backend or get_default_backend()
+    return backend.generate_batch(prompts, model_name, max_length=max_length, **params)
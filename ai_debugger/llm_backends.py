@@ -0,0 +1,400 @@
+import copy
+import hashlib
+import http.client
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from ai_debugger.cpu_inference import create_cpu_profile
+from ai_debugger.prompt_builder import approximate_tokens
+from ai_debugger.stopping import (CONSTRAINT_KEYS, has_stops, make_stopping_criteria, split_constraints, stop_position,
+                                  truncate_completion)
+
+BACKEND_ENV_VAR = "AI_DEBUGGER_LLM_BACKEND"
+ENDPOINT_ENV_VAR = "AI_DEBUGGER_LLM_ENDPOINT"
+
+
+class LLMBackend:
+    name = "base"
+
+    def generate(self, prompt: str, model_name: str, max_length=150, **params) -> str:
+        return self.generate_batch([prompt], model_name, max_length=max_length, **params)[0]
+
+
+    def generate_batch(self, prompts: list, model_name: str, max_length=150, **params) -> list:
+        raise NotImplementedError
+
+
+    def loaded_models(self) -> list:
+        return []
+
+
+    def count_tokens(self, text: str, model_name: str = None) -> int:
+        return approximate_tokens(text)
+
+
+class PrefixCache:
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def make_key(model_name: str, prefix: str):
+        return model_name, hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+
+class TransformersBackend(LLMBackend):
+    name = "transformers"
+
+    def __init__(self, cpu_profile=None, prefix_cache_entries=4):
+        self.cpu_profile = cpu_profile
+        self.prefix_cache = PrefixCache(prefix_cache_entries)
+        self._pipelines = {}
+        self._tokenizers = {}
+        self._lock = threading.Lock()
+
+
+    def get_pipeline(self, model_name):
+        with self._lock:
+            if model_name not in self._pipelines:
+                logging.info(f"Loading text-generation pipeline for {model_name}")
+                if self.cpu_profile is not None and self.cpu_profile.enabled:
+                    code_analyzer = self.cpu_profile.load_pipeline(model_name)
+                else:
+                    from transformers import pipeline
+                    code_analyzer = pipeline('text-generation', model=model_name)
+
+                # Decoder-only models need left padding (and often a pad token) to generate padded batches.
+                tokenizer = code_analyzer.tokenizer
+                if tokenizer.pad_token_id is None:
+                    tokenizer.pad_token_id = code_analyzer.model.config.eos_token_id
+                tokenizer.padding_side = "left"
+
+                self._pipelines[model_name] = code_analyzer
+            return self._pipelines[model_name]
+
+
+    def loaded_models(self) -> list:
+        with self._lock:
+            return sorted(self._pipelines)
+
+
+    def get_tokenizer(self, model_name):
+        with self._lock:
+            if model_name in self._pipelines:
+                return self._pipelines[model_name].tokenizer
+            if model_name not in self._tokenizers:
+                from transformers import AutoTokenizer
+                self._tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name)
+            return self._tokenizers[model_name]
+
+
+    def count_tokens(self, text: str, model_name: str = None) -> int:
+        if not model_name:
+            return approximate_tokens(text)
+        try:
+            return len(self.get_tokenizer(model_name).encode(text))
+        except (ImportError, OSError) as e:
+            logging.debug(f"Falling back to approximate token counts for {model_name}: {e}")
+            return approximate_tokens(text)
+
+
+    def _prefix_state(self, code_analyzer, model_name, prefix, input_ids):
+        import torch
+        from transformers import DynamicCache
+
+        prefix_ids = code_analyzer.tokenizer(prefix, return_tensors="pt").input_ids.to(input_ids.device)
+        length = prefix_ids.shape[1]
+        # Only reuse the prefix when the full prompt tokenizes to the same ids across the boundary.
+        if length >= input_ids.shape[1] or not torch.equal(input_ids[:, :length], prefix_ids):
+            return None
+
+        key = PrefixCache.make_key(model_name, prefix)
+        cached = self.prefix_cache.get(key)
+        if cached is None:
+            cached = DynamicCache()
+            with torch.no_grad():
+                code_analyzer.model(prefix_ids, past_key_values=cached, use_cache=True)
+            self.prefix_cache.put(key, cached)
+        return copy.deepcopy(cached)
+
+
+    def _generate_with_prefix(self, code_analyzer, model_name, prompt, prefix, max_length, constraints, params):
+        import torch
+
+        tokenizer = code_analyzer.tokenizer
+        input_ids = tokenizer(prompt, return_tensors="pt").input_ids.to(code_analyzer.model.device)
+        past_key_values = self._prefix_state(code_analyzer, model_name, prefix, input_ids)
+        if past_key_values is None:
+            return None
+
+        generate_params = {key: value for key, value in params.items() if key not in ("truncation", "batch_size")}
+        if generate_params.get("max_new_tokens") is None:
+            generate_params.pop("max_new_tokens", None)
+            generate_params["max_length"] = max_length
+        if has_stops(constraints):
+            generate_params["stopping_criteria"] = make_stopping_criteria(tokenizer, constraints)
+
+        with torch.no_grad():
+            output = code_analyzer.model.generate(input_ids, attention_mask=torch.ones_like(input_ids),
+                                                  past_key_values=past_key_values,
+                                                  pad_token_id=tokenizer.pad_token_id, **generate_params)
+        completion = tokenizer.decode(output[0, input_ids.shape[1]:], skip_special_tokens=True)
+        return truncate_completion(prompt, prompt + completion, constraints)
+
+
+    def generate_batch(self, prompts: list, model_name: str, max_length=150, **params) -> list:
+        constraints = split_constraints(params)
+        prefix = params.pop("prefix", None)
+        code_analyzer = self.get_pipeline(model_name)
+
+        if prefix and len(prompts) == 1 and prompts[0].startswith(prefix):
+            try:
+                text = self._generate_with_prefix(code_analyzer, model_name, prompts[0], prefix, max_length,
+                                                  constraints, params)
+                if text is not None:
+                    return [text]
+            except (TypeError, ValueError, AttributeError) as e:
+                logging.debug(f"Prefix cache unavailable for {model_name}, prefilling the full prompt: {e}")
+
+        params.setdefault("truncation", True)
+        params.setdefault("batch_size", len(prompts))
+        if params.get("max_new_tokens") is None:
+            params.pop("max_new_tokens", None)
+            params["max_length"] = max_length
+        if has_stops(constraints):
+            params["stopping_criteria"] = make_stopping_criteria(code_analyzer.tokenizer, constraints)
+
+        responses = code_analyzer(prompts, num_return_sequences=1, **params)
+        # Stopping happens at token granularity, so trim whatever overshot the stop sequence.
+        return [truncate_completion(prompt, response[0]['generated_text'], constraints)
+                for prompt, response in zip(prompts, responses)]
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class HTTPBackend(LLMBackend):
+    name = "http"
+
+    def __init__(self, endpoint: str, timeout=60):
+        if not endpoint:
+            raise ValueError("The http LLM backend requires an endpoint (llm.endpoint)")
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._parsed = urlparse(endpoint)
+
+
+    def _connection(self):
+        if self._parsed.scheme == "unix":
+            return _UnixHTTPConnection(self._parsed.path, timeout=self.timeout)
+        if self._parsed.scheme == "https":
+            return http.client.HTTPSConnection(self._parsed.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self._parsed.netloc, timeout=self.timeout)
+
+
+    def _request_path(self):
+        if self._parsed.scheme == "unix":
+            return "/generate"
+        return self._parsed.path.rstrip("/") + "/generate"
+
+
+    def generate_batch(self, prompts: list, model_name: str, max_length=150, **params) -> list:
+        constraints = {key: params[key] for key in CONSTRAINT_KEYS if key in params}
+        body = json.dumps({
+            "prompts": prompts,
+            "model": model_name,
+            "params": dict(params, max_length=max_length)
+        })
+
+        connection = self._connection()
+        try:
+            connection.request("POST", self._request_path(), body=body,
+                               headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = json.loads(response.read().decode("utf-8") or "{}")
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"LLM server at {self.endpoint} unavailable: {e}")
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            raise RuntimeError(f"LLM server error ({response.status}): {payload.get('error', 'unknown error')}")
+        # Servers that ignore stop sequences still return usable text.
+        return [truncate_completion(prompt, text, constraints) for prompt, text in zip(prompts, payload["texts"])]
+
+
+class StubBackend(LLMBackend):
+    name = "stub"
+
+    def __init__(self, latency_ms=0, tokens_per_second=0, prefill_tokens_per_second=0, output_tokens=16,
+                 line_tokens=0, prefix_cache_entries=4):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.output_tokens = output_tokens
+        self.line_tokens = line_tokens
+        self.prefix_cache = PrefixCache(prefix_cache_entries)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.prefill_tokens = 0
+        self.generated_tokens = 0
+        self._lock = threading.Lock()
+
+
+    def count_tokens(self, text: str, model_name: str = None) -> int:
+        return len(text.split())
+
+
+    def _completion(self, prompt, model_name, token_budget, constraints):
+        digest = hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+        words = [f"stub_{digest[i:i + 6]}" for i in range(0, len(digest), 6)]
+
+        completion = ""
+        for i in range(token_budget):
+            separator = "\n" if self.line_tokens and i and i % self.line_tokens == 0 else " "
+            completion += (separator if i else "") + words[i % len(words)]
+            # Emit token by token, like a real decoder, so stop sequences end generation early.
+            if has_stops(constraints) and stop_position("\n" + completion, **constraints) is not None:
+                return truncate_completion("", "\n" + completion, constraints)[1:], i + 1
+        return completion, token_budget
+
+
+    def simulated_latency(self, prompt_tokens: int, new_tokens: int) -> float:
+        seconds = self.latency_ms / 1000.0
+        if self.prefill_tokens_per_second:
+            seconds += prompt_tokens / self.prefill_tokens_per_second
+        if self.tokens_per_second:
+            seconds += new_tokens / self.tokens_per_second
+        return seconds
+
+
+    def generate_batch(self, prompts: list, model_name: str, max_length=150, **params) -> list:
+        constraints = split_constraints(params)
+        prefix = params.pop("prefix", None)
+        max_new_tokens = params.get("max_new_tokens")
+        texts = []
+        total_prompt_tokens = 0
+        total_prefill_tokens = 0
+        longest_output = 0
+
+        for prompt in prompts:
+            prompt_tokens = self.count_tokens(prompt)
+            prefill_tokens = prompt_tokens
+            if prefix and prompt.startswith(prefix):
+                key = PrefixCache.make_key(model_name, prefix)
+                cached_tokens = self.prefix_cache.get(key)
+                if cached_tokens is None:
+                    self.prefix_cache.put(key, self.count_tokens(prefix))
+                else:
+                    prefill_tokens -= cached_tokens
+            # output_tokens is where the simulated model would emit EOS on its own.
+            limit = max_new_tokens if max_new_tokens is not None else max_length - prompt_tokens
+            budget = max(0, min(self.output_tokens, limit))
+            completion, generated = self._completion(prompt, model_name, budget, constraints)
+            texts.append(f"{prompt}\n{completion}" if completion else prompt)
+            total_prompt_tokens += prompt_tokens
+            total_prefill_tokens += prefill_tokens
+            longest_output = max(longest_output, generated)
+
+        # A batch prefills every prompt (minus any cached prefix) but decodes all sequences in lockstep.
+        delay = self.simulated_latency(total_prefill_tokens, longest_output)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += total_prompt_tokens
+            self.prefill_tokens += total_prefill_tokens
+            self.generated_tokens += longest_output * len(prompts)
+        return texts
+
+
+SERVER_BACKEND = "server"
+DEFAULT_SERVER_SOCKET = "~/.ai_debugger/llm.sock"
+
+BACKENDS = {
+    TransformersBackend.name: TransformersBackend,
+    HTTPBackend.name: HTTPBackend,
+    StubBackend.name: StubBackend,
+    SERVER_BACKEND: HTTPBackend,
+}
+
+
+def create_backend(config=None, name=None, batching=True) -> LLMBackend:
+    def setting(key, default=None):
+        return config.get(key, default) if config is not None else default
+
+    name = name or os.environ.get(BACKEND_ENV_VAR) or setting("llm.backend", "transformers")
+    prefix_cache_entries = setting("llm.prefix_cache.max_entries", 4) if setting("llm.prefix_cache.enabled", True) else 0
+
+    if name == TransformersBackend.name:
+        backend = TransformersBackend(cpu_profile=create_cpu_profile(config),
+                                      prefix_cache_entries=prefix_cache_entries)
+    elif name == HTTPBackend.name:
+        endpoint = os.environ.get(ENDPOINT_ENV_VAR) or setting("llm.endpoint")
+        backend = HTTPBackend(endpoint, timeout=setting("llm.timeout", 60))
+    elif name == StubBackend.name:
+        backend = StubBackend(**dict({"prefix_cache_entries": prefix_cache_entries}, **(setting("llm.stub") or {})))
+    elif name == SERVER_BACKEND:
+        socket_path = os.path.expanduser(setting("llm.server.socket", DEFAULT_SERVER_SOCKET))
+        backend = HTTPBackend(f"unix://{socket_path}", timeout=setting("llm.timeout", 60))
+    else:
+        raise ValueError(f"Unknown LLM backend '{name}'. Available: {', '.join(BACKENDS)}")
+
+    if batching and setting("llm.batching.enabled", False):
+        from ai_debugger.llm_scheduler import BatchScheduler
+        backend = BatchScheduler(backend,
+                                 max_batch_size=setting("llm.batching.max_batch_size", 8),
+                                 batch_window_ms=setting("llm.batching.batch_window_ms", 5))
+    return backend
@@ -0,0 +1,168 @@
+import ast
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+
+def normalize_code(code: str) -> str:
+    try:
+        return ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError):
+        # Segments that don't parse on their own still ignore trailing whitespace and blank lines.
+        return "\n".join(line.rstrip() for line in code.splitlines() if line.strip())
+
+
+class LLMCache:
+    def __init__(self, max_entries=512, directory=None, enabled=True, max_disk_entries=10000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.enabled = enabled
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._disk_entries = None
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def make_key(model_name: str, params: dict, task: str, code: str, extra=()) -> str:
+        payload = json.dumps([model_name, params, task, normalize_code(code), list(extra)],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+
+    def _disk_files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+
+    def _prune_disk(self):
+        # Disk hits touch their file, so the oldest modification times are the least recently used entries.
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((os.stat(path).st_mtime_ns, path))
+            except OSError:
+                pass
+        files.sort()
+        # Prune below the cap so the next few writes don't each walk the directory again.
+        keep = self.max_disk_entries * 9 // 10
+        for _, path in files[:max(0, len(files) - keep)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return min(len(files), keep)
+
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.directory:
+            path = self._disk_path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)["response"]
+                os.utime(path)
+                with self._lock:
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+            except (OSError, ValueError, KeyError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+
+    def put(self, key, value):
+        if not self.enabled or value is None:
+            return
+
+        with self._lock:
+            self._remember(key, value)
+
+        if self.directory:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                # Created on first write, so a cache that never stores anything leaves no directory behind.
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                existed = os.path.exists(path)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"response": value}, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.warning(f"Failed to write LLM cache entry: {e}")
+                return
+
+            if self.max_disk_entries:
+                with self._lock:
+                    if self._disk_entries is None:
+                        self._disk_entries = sum(1 for _ in self._disk_files())
+                    elif not existed:
+                        self._disk_entries += 1
+                    if self._disk_entries > self.max_disk_entries:
+                        self._disk_entries = self._prune_disk()
+
+
+    def get_or_generate(self, key, generate):
+        value = self.get(key)
+        if value is None:
+            value = generate()
+            self.put(key, value)
+        return value
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+
+def create_cache(config=None) -> LLMCache:
+    def setting(key, default=None):
+        return config.get(key, default) if config is not None else default
+
+    return LLMCache(max_entries=setting("llm.cache.max_entries", 512),
+                    directory=setting("llm.cache.directory"),
+                    enabled=setting("llm.cache.enabled", True),
+                    max_disk_entries=setting("llm.cache.max_disk_entries", 10000))
@@ -0,0 +1,137 @@
+import json
+import logging
+import queue
+import threading
+import time
+from ai_debugger.llm_backends import LLMBackend
+
+
+class _PendingRequest:
+    __slots__ = ("prompt", "model_name", "max_length", "params", "key", "done", "result", "error")
+
+    def __init__(self, prompt, model_name, max_length, params):
+        self.prompt = prompt
+        self.model_name = model_name
+        self.max_length = max_length
+        self.params = params
+        self.key = (model_name, max_length, json.dumps(params, sort_keys=True, default=str))
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchScheduler(LLMBackend):
+    name = "batched"
+
+    def __init__(self, backend: LLMBackend, max_batch_size=8, batch_window_ms=5):
+        self.backend = backend
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.batch_window_ms = max(0.0, float(batch_window_ms))
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+
+    def count_tokens(self, text: str, model_name: str = None) -> int:
+        return self.backend.count_tokens(text, model_name)
+
+
+    def loaded_models(self) -> list:
+        return self.backend.loaded_models()
+
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Batch scheduler is closed")
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="llm-batch-scheduler", daemon=True)
+                self._worker.start()
+
+
+    def generate_batch(self, prompts: list, model_name: str, max_length=150, **params) -> list:
+        self._ensure_worker()
+        pending = [_PendingRequest(prompt, model_name, max_length, params) for prompt in prompts]
+        for request in pending:
+            self._queue.put(request)
+
+        results = []
+        for request in pending:
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+            results.append(request.result)
+        return results
+
+
+    def _collect(self, first):
+        groups = {first.key: [first]}
+        collected = 1
+        deadline = time.monotonic() + self.batch_window_ms / 1000.0
+
+        while collected < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            groups.setdefault(request.key, []).append(request)
+            collected += 1
+        return groups
+
+
+    def _execute(self, group):
+        head = group[0]
+        try:
+            texts = self.backend.generate_batch([request.prompt for request in group], head.model_name,
+                                                max_length=head.max_length, **head.params)
+            for request, text in zip(group, texts):
+                request.result = text
+        except Exception as e:
+            logging.error(f"Batched generation failed for {head.model_name}: {e}")
+            for request in group:
+                request.error = e
+        finally:
+            with self._lock:
+                self.batches += 1
+                self.requests += len(group)
+            for request in group:
+                request.done.set()
+
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            for group in self._collect(first).values():
+                for start in range(0, len(group), self.max_batch_size):
+                    self._execute(group[start:start + self.max_batch_size])
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_window_ms": self.batch_window_ms
+            }
+
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join()
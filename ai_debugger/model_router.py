@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+def completion_text(prompt: str, response: str) -> str:
+    if response and response.startswith(prompt):
+        return response[len(prompt):]
+    return response or ""
+
+
+def output_confidence(completion: str) -> float:
+    tokens = completion.split()
+    if not tokens:
+        return 0.0
+    # Small models degenerate into repeating the same few tokens when they are unsure.
+    return len(set(tokens)) / len(tokens)
+
+
+class ModelRouter:
+    def __init__(self, small_model: str, large_model: str = None, enabled=True, min_confidence=0.3,
+                 escalate_on_invalid=True, history_size=200):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.enabled = enabled and bool(large_model) and large_model != small_model
+        self.min_confidence = min_confidence
+        self.escalate_on_invalid = escalate_on_invalid
+        self.decisions = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+
+    def _escalation_reason(self, prompt, response, validate):
+        completion = completion_text(prompt, response)
+        if not completion.strip():
+            return "empty_output"
+        if output_confidence(completion) < self.min_confidence:
+            return "low_confidence"
+        if self.escalate_on_invalid and validate is not None and not validate(completion):
+            return "invalid_output"
+        return None
+
+
+    @staticmethod
+    def _timed(generate, model_name):
+        start = time.perf_counter()
+        response = generate(model_name)
+        return response, (time.perf_counter() - start) * 1000
+
+
+    def route(self, task: str, prompt: str, generate, validate=None, prefer_large=False) -> str:
+        decision = {"task": task, "escalated": False, "reason": None}
+
+        if self.enabled and prefer_large:
+            response, latency = self._timed(generate, self.large_model)
+            decision.update(model=self.large_model, reason="user_request", large_latency_ms=latency,
+                            latency_ms=latency)
+            self._record(decision)
+            return response
+
+        response, small_latency = self._timed(generate, self.small_model)
+        decision.update(model=self.small_model, small_latency_ms=small_latency, latency_ms=small_latency)
+
+        reason = self._escalation_reason(prompt, response, validate) if self.enabled else None
+        if reason:
+            decision.update(escalated=True, reason=reason)
+            try:
+                large_response, large_latency = self._timed(generate, self.large_model)
+                decision.update(model=self.large_model, large_latency_ms=large_latency,
+                                latency_ms=small_latency + large_latency)
+                if completion_text(prompt, large_response).strip():
+                    response = large_response
+                else:
+                    decision["model"] = self.small_model
+                    decision["reason"] = f"{reason}, large_model_empty"
+            except Exception as e:
+                logging.warning(f"Escalation to {self.large_model} failed, keeping {self.small_model} output: {e}")
+                decision["reason"] = f"{reason}, escalation_failed"
+
+        self._record(decision)
+        return response
+
+
+    def _record(self, decision):
+        logging.debug(f"LLM routing decision: {decision}")
+        with self._lock:
+            self.decisions.append(decision)
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            decisions = list(self.decisions)
+
+        escalated = [d for d in decisions if d["escalated"]]
+        by_model = {}
+        for decision in decisions:
+            entry = by_model.setdefault(decision["model"], {"requests": 0, "total_latency_ms": 0.0})
+            entry["requests"] += 1
+            entry["total_latency_ms"] += decision["latency_ms"]
+        for entry in by_model.values():
+            entry["mean_latency_ms"] = entry.pop("total_latency_ms") / entry["requests"]
+
+        return {
+            "enabled": self.enabled,
+            "small_model": self.small_model,
+            "large_model": self.large_model,
+            "requests": len(decisions),
+            "escalations": len(escalated),
+            "escalation_rate": len(escalated) / len(decisions) if decisions else 0.0,
+            "by_model": by_model,
+            "recent": decisions[-10:]
+        }
+
+
+def create_router(config=None, small_model=None) -> ModelRouter:
+    def setting(key, default=None):
+        return config.get(key, default) if config is not None else default
+
+    return ModelRouter(small_model or setting("models.default", "microsoft/CodeGPT-small-py"),
+                       setting("models.large"),
+                       enabled=setting("routing.enabled", False),
+                       min_confidence=setting("routing.min_confidence", 0.3),
+                       escalate_on_invalid=setting("routing.escalate_on_invalid", True))
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler
+from ai_debugger.llm_backends import LLMBackend, TransformersBackend
+from ai_debugger.llm_scheduler import BatchScheduler
+
+
+class _ModelRequestHandler(BaseHTTPRequestHandler):
+    server_version = "AIDebuggerModelServer/1.0"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "Not found"})
+            return
+        self._send_json(200, dict(self.server.model_server.status(), status="ok"))
+
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            prompts = data["prompts"]
+            model_name = data["model"]
+            params = dict(data.get("params") or {})
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+
+        if not isinstance(prompts, list) or not all(isinstance(prompt, str) for prompt in prompts):
+            self._send_json(400, {"error": "prompts must be a list of strings"})
+            return
+
+        try:
+            max_length = params.pop("max_length", 150)
+            texts = self.server.model_server.scheduler.generate_batch(prompts, model_name,
+                                                                      max_length=max_length, **params)
+            self._send_json(200, {"texts": texts})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+
+    def log_message(self, format, *args):
+        logging.debug(f"model server: {format % args}")
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ModelServer:
+    def __init__(self, socket_path: str, backend: LLMBackend = None, max_batch_size=8, batch_window_ms=5,
+                 preload_models=None):
+        self.socket_path = os.path.expanduser(socket_path)
+        self.backend = backend or TransformersBackend()
+        self.scheduler = BatchScheduler(self.backend, max_batch_size=max_batch_size,
+                                        batch_window_ms=batch_window_ms)
+        self.preload_models = list(preload_models or [])
+        self._server = None
+
+
+    def status(self) -> dict:
+        status = {
+            "backend": self.backend.name,
+            "loaded_models": self.backend.loaded_models(),
+            "scheduler": self.scheduler.stats()
+        }
+        prefix_cache = getattr(self.backend, "prefix_cache", None)
+        if prefix_cache is not None:
+            status["prefix_cache"] = prefix_cache.stats()
+        cpu_profile = getattr(self.backend, "cpu_profile", None)
+        if cpu_profile is not None:
+            status["cpu_profile"] = cpu_profile.describe()
+        return status
+
+
+    def _bind(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._server = _ThreadingUnixHTTPServer(self.socket_path, _ModelRequestHandler)
+        self._server.model_server = self
+        os.chmod(self.socket_path, 0o600)
+
+
+    def serve_forever(self):
+        for model_name in self.preload_models:
+            if isinstance(self.backend, TransformersBackend):
+                self.backend.get_pipeline(model_name)
+
+        self._bind()
+        logging.info(f"Model server listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+    def close(self):
+        self.scheduler.close()
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -0,0 +1,341 @@
+import ast
+from ai_debugger.static_analyzer import Checker, register_checker
+
+_LOOP_NODES = (ast.For, ast.AsyncFor, ast.While, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_REGEX_FUNCTIONS = {"compile", "match", "fullmatch", "search", "findall", "finditer", "sub", "subn", "split"}
+
+
+def _source(node):
+    if hasattr(ast, "unparse"):
+        return ast.unparse(node)
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_source(node.value)}.{node.attr}"
+    return "..."
+
+
+def _position(node):
+    return getattr(node, "lineno", 0), getattr(node, "col_offset", 0)
+
+
+def _dotted_name(node):
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class _LoopChecker(Checker):
+    family = "performance"
+    category = "Performance"
+    node_types = _LOOP_NODES + _FUNCTION_NODES
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.loops = []
+        self.functions = []
+
+
+    @staticmethod
+    def _evaluated_once(loop):
+        # A for loop's iterable (and a comprehension's first one) runs once, not on every iteration.
+        if isinstance(loop, (ast.For, ast.AsyncFor)):
+            return loop.iter
+        if isinstance(loop, ast.While):
+            return None
+        return loop.generators[0].iter
+
+
+    def hot_loops(self, node):
+        position = _position(node)
+        return [loop for loop, once in self.loops
+                if once is None or not _position(once) <= position < (once.end_lineno, once.end_col_offset)]
+
+
+    def loop_depth(self, node):
+        return len(self.hot_loops(node))
+
+
+    def visit(self, node):
+        if isinstance(node, _LOOP_NODES):
+            self.visit_loop(node)
+            self.loops.append((node, self._evaluated_once(node)))
+        elif isinstance(node, _FUNCTION_NODES):
+            # Loops in an enclosing function don't make a nested function's body hot.
+            self.functions.append((node, self.loops))
+            self.loops = []
+            self.visit_function(node)
+        else:
+            self.visit_node(node)
+
+
+    def depart(self, node):
+        if isinstance(node, _LOOP_NODES):
+            self.loops.pop()
+        elif isinstance(node, _FUNCTION_NODES):
+            self.depart_function(node)
+            _, self.loops = self.functions.pop()
+
+
+    def visit_loop(self, node):
+        pass
+
+
+    def visit_function(self, node):
+        pass
+
+
+    def depart_function(self, node):
+        pass
+
+
+    def visit_node(self, node):
+        pass
+
+
+class _BindingChecker(_LoopChecker):
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.scopes = [{}]
+
+
+    def visit_function(self, node):
+        self.scopes.append({})
+
+
+    def depart_function(self, node):
+        self.scopes.pop()
+
+
+    def bind(self, node):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.scopes[-1][target.id] = self.kind_of(node.value)
+
+
+    def kind(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+
+    @staticmethod
+    def kind_of(value):
+        if isinstance(value, (ast.List, ast.ListComp)):
+            return "list"
+        if isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == "list":
+            return "list"
+        if isinstance(value, ast.JoinedStr) or (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+            return "str"
+        return None
+
+
+@register_checker
+class ListMembershipChecker(_BindingChecker):
+    name = "perf_membership"
+    node_types = _LoopChecker.node_types + (ast.Assign, ast.Compare)
+
+    def visit_node(self, node):
+        if isinstance(node, ast.Assign):
+            self.bind(node)
+            return
+        if not self.loop_depth(node):
+            return
+
+        for op, container in zip(node.ops, node.comparators):
+            if not isinstance(op, (ast.In, ast.NotIn)):
+                continue
+            if isinstance(container, ast.Name) and self.kind(container.id) == "list":
+                target = f"list '{container.id}'"
+                fix = f"Build a set once before the loop ({container.id}_set = set({container.id})) and test against it"
+            elif isinstance(container, ast.ListComp) or (
+                    isinstance(container, ast.List) and not all(isinstance(elt, ast.Constant) for elt in container.elts)):
+                target = "a list built inside the loop"
+                fix = "Build the collection once, as a set, before the loop"
+            else:
+                continue
+            self.report(node, "Quadratic Membership Test",
+                        f"Membership test against {target} inside a loop scans the whole list on every "
+                        f"iteration (O(n*m))", fix)
+
+
+@register_checker
+class StringConcatenationChecker(_BindingChecker):
+    name = "perf_string_concat"
+    node_types = _LoopChecker.node_types + (ast.Assign, ast.AugAssign)
+
+    def visit_node(self, node):
+        if isinstance(node, ast.Assign):
+            self.bind(node)
+            return
+        if not isinstance(node.op, ast.Add) or not isinstance(node.target, ast.Name) or not self.loop_depth(node):
+            return
+        if self.kind(node.target.id) == "str" or self.kind_of(node.value) == "str":
+            name = node.target.id
+            self.report(node, "String Concatenation In Loop",
+                        f"'{name} += ...' inside a loop copies the whole string on every iteration (O(n^2))",
+                        f"Collect the pieces in a list ({name}_parts.append(...)) and "
+                        f"join them once after the loop: {name} = ''.join({name}_parts)")
+
+
+@register_checker
+class AppendLoopChecker(_LoopChecker):
+    name = "perf_append"
+
+    @staticmethod
+    def _append_call(statement):
+        if not isinstance(statement, ast.Expr) or not isinstance(statement.value, ast.Call):
+            return None
+        call = statement.value
+        if (isinstance(call.func, ast.Attribute) and call.func.attr == "append"
+                and isinstance(call.func.value, ast.Name) and len(call.args) == 1 and not call.keywords):
+            return call
+        return None
+
+
+    def visit_loop(self, node):
+        if not isinstance(node, ast.For) or node.orelse or len(node.body) != 1:
+            return
+
+        statement, condition = node.body[0], None
+        if isinstance(statement, ast.If) and not statement.orelse and len(statement.body) == 1:
+            statement, condition = statement.body[0], statement.test
+        call = self._append_call(statement)
+        if call is None:
+            return
+
+        name = call.func.value.id
+        if condition is not None and any(isinstance(child, ast.Name) and child.id == name
+                                         for child in ast.walk(condition)):
+            # e.g. "if x not in seen: seen.append(x)" depends on the list as it grows.
+            return
+        comprehension = f"[{_source(call.args[0])} for {_source(node.target)} in {_source(node.iter)}"
+        comprehension += f" if {_source(condition)}]" if condition is not None else "]"
+        self.report(node, "Append In Loop",
+                    f"Loop only appends to '{name}'; a comprehension avoids the per-item method lookup and call",
+                    f"{name} = {comprehension}  # or {name}.extend(...) if '{name}' is not empty")
+
+
+@register_checker
+class RegexInLoopChecker(_LoopChecker):
+    name = "perf_regex"
+    node_types = _LoopChecker.node_types + (ast.Import, ast.ImportFrom, ast.Call)
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.modules = set()
+        self.functions_imported = {}
+
+
+    def visit_node(self, node):
+        if isinstance(node, ast.Import):
+            self.modules.update(alias.asname or alias.name for alias in node.names if alias.name == "re")
+            return
+        if isinstance(node, ast.ImportFrom):
+            if node.module == "re":
+                self.functions_imported.update((alias.asname or alias.name, alias.name) for alias in node.names
+                                               if alias.name in _REGEX_FUNCTIONS)
+            return
+
+        if isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name) \
+                and node.func.value.id in self.modules:
+            function = node.func.attr
+        elif isinstance(node.func, ast.Name) and node.func.id in self.functions_imported:
+            function = self.functions_imported[node.func.id]
+        else:
+            return
+
+        if function not in _REGEX_FUNCTIONS or not node.args or not self.loop_depth(node):
+            return
+        pattern = node.args[0]
+        if not (isinstance(pattern, ast.Constant) and isinstance(pattern.value, (str, bytes))):
+            return
+
+        call = "" if function == "compile" else f" and call PATTERN.{function}(...)"
+        self.report(node, "Regex Compiled In Loop",
+                    f"re.{function}({pattern.value!r}, ...) recompiles or looks up the pattern on every iteration",
+                    f"Hoist PATTERN = re.compile({pattern.value!r}) above the loop{call}")
+
+
+@register_checker
+class NestedLoopChecker(_LoopChecker):
+    name = "perf_nested_loop"
+
+    def visit_loop(self, node):
+        if not isinstance(node, (ast.For, ast.AsyncFor)):
+            return
+        iterable = ast.dump(node.iter)
+        for outer, _ in self.loops:
+            if isinstance(outer, (ast.For, ast.AsyncFor)) and ast.dump(outer.iter) == iterable:
+                source = _source(node.iter)
+                self.report(node, "Nested Loop Over Same Iterable",
+                            f"Nested loops both iterate over '{source}' (O(n^2))",
+                            f"Index '{source}' once in a dict or set keyed on what the inner loop looks for, "
+                            f"or use itertools.combinations({source}, 2) if every pair is really needed")
+                return
+
+
+@register_checker
+class GlobalLookupChecker(_LoopChecker):
+    name = "perf_global_lookup"
+    node_types = _LoopChecker.node_types + (ast.Module, ast.Name, ast.Call)
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.hot_loop_depth = self.options.get("hot_loop_depth", 2)
+        self.module_names = set()
+        self.local_scopes = []
+
+
+    def visit_node(self, node):
+        if isinstance(node, ast.Module):
+            # Only the top-level statements are read here, so this stays within the single traversal budget.
+            for statement in node.body:
+                if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                    self.module_names.update((alias.asname or alias.name).split(".")[0] for alias in statement.names)
+                elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    self.module_names.add(statement.name)
+                elif isinstance(statement, ast.Assign):
+                    self.module_names.update(target.id for target in statement.targets if isinstance(target, ast.Name))
+            return
+
+        if not self.local_scopes:
+            return
+        scope = self.local_scopes[-1]
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                scope["locals"].add(node.id)
+            return
+
+        name = _dotted_name(node.func)
+        if not name or self.loop_depth(node) < self.hot_loop_depth:
+            return
+        root = name.split(".")[0]
+        if root not in self.module_names or root in scope["locals"] or name in scope["reported"]:
+            return
+
+        scope["reported"].add(name)
+        alias = name.rsplit(".", 1)[-1]
+        self.report(node, "Global Lookup In Loop",
+                    f"'{name}' is resolved through the module globals on every iteration of a loop "
+                    f"in '{scope['function']}'",
+                    f"Bind it to a local before the loop ({alias} = {name}) and call {alias}(...) inside it")
+
+
+    def visit_function(self, node):
+        arguments = node.args
+        names = [arg.arg for arg in arguments.args + arguments.kwonlyargs + getattr(arguments, "posonlyargs", [])]
+        names += [arg.arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None]
+        self.local_scopes.append({"function": node.name, "locals": set(names), "reported": set()})
+
+
+    def depart_function(self, node):
+        self.local_scopes.pop()
@@ -0,0 +1,398 @@
+import ast
+import json
+import linecache
+import logging
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_TOP = 10
+DEFAULT_HOT_SHARE = 0.05
+DEFAULT_SAMPLE_INTERVAL_MS = 50
+DEFAULT_MAX_SAMPLES = 512
+DEFAULT_MIN_GROWTH_SAMPLES = 3
+DEFAULT_MIN_GROWTH_KB = 64
+
+
+class LineProfiler:
+    # Elapsed time between two line events is charged to the earlier line, so calls into
+    # other files (libraries, builtins) count against the line in the target that made them.
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.hits = {}
+        self.times = {}
+        self.calls = {}
+        self.functions = {}
+        self.last_line = None
+        self.last_time = None
+        self.mode = "monitoring" if hasattr(sys, "monitoring") else "trace"
+
+
+    def _charge(self, line):
+        now = time.perf_counter()
+        if self.last_line is not None:
+            self.times[self.last_line] = self.times.get(self.last_line, 0.0) + now - self.last_time
+        self.last_line = line
+        self.last_time = now
+
+
+    def _line(self, code, line):
+        self._charge(line)
+        self.hits[line] = self.hits.get(line, 0) + 1
+        self.functions.setdefault(line, (getattr(code, "co_qualname", code.co_name), code.co_firstlineno))
+
+
+    def _call(self, code):
+        key = (getattr(code, "co_qualname", code.co_name), code.co_firstlineno)
+        self.calls[key] = self.calls.get(key, 0) + 1
+
+
+    def _monitor_line(self, code, line):
+        if code.co_filename != self.file_path:
+            return sys.monitoring.DISABLE
+        self._line(code, line)
+
+
+    def _monitor_start(self, code, offset):
+        if code.co_filename != self.file_path:
+            return sys.monitoring.DISABLE
+        self._call(code)
+
+
+    def _trace(self, frame, event, arg):
+        if frame.f_code.co_filename != self.file_path:
+            return None
+        self._call(frame.f_code)
+        return self._trace_lines
+
+
+    def _trace_lines(self, frame, event, arg):
+        if event == "line":
+            self._line(frame.f_code, frame.f_lineno)
+        return self._trace_lines
+
+
+    def start(self):
+        self.last_time = time.perf_counter()
+        if self.mode == "monitoring":
+            monitoring = sys.monitoring
+            try:
+                monitoring.use_tool_id(monitoring.PROFILER_ID, "ai_debugger")
+            except ValueError:
+                # Another profiler owns the tool id; tracing still works, just with more overhead.
+                self.mode = "trace"
+        if self.mode == "monitoring":
+            monitoring.register_callback(monitoring.PROFILER_ID, monitoring.events.LINE, self._monitor_line)
+            monitoring.register_callback(monitoring.PROFILER_ID, monitoring.events.PY_START, self._monitor_start)
+            monitoring.set_events(monitoring.PROFILER_ID, monitoring.events.LINE | monitoring.events.PY_START)
+        else:
+            sys.settrace(self._trace)
+
+
+    def stop(self):
+        if self.mode == "monitoring":
+            monitoring = sys.monitoring
+            monitoring.set_events(monitoring.PROFILER_ID, 0)
+            monitoring.free_tool_id(monitoring.PROFILER_ID)
+        else:
+            sys.settrace(None)
+        self._charge(None)
+
+
+    def results(self):
+        functions = {}
+        for line, key in self.functions.items():
+            entry = functions.setdefault(key, {"function": key[0], "line": key[1], "calls": self.calls.get(key, 0),
+                                               "hits": 0, "time_ms": 0.0})
+            entry["hits"] += self.hits[line]
+            entry["time_ms"] += self.times.get(line, 0.0) * 1000
+
+        return {
+            "mode": self.mode,
+            "lines": [{"line": line, "hits": self.hits[line], "time_ms": self.times.get(line, 0.0) * 1000}
+                      for line in sorted(self.hits)],
+            "functions": sorted(functions.values(), key=lambda entry: entry["line"])
+        }
+
+
+def _current_rss():
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryProfiler:
+    # A background thread samples RSS and per-line tracemalloc snapshots; a line whose retained
+    # memory keeps rising between samples is growing across the iterations of its loop.
+    def __init__(self, file_path, interval_ms=DEFAULT_SAMPLE_INTERVAL_MS, max_samples=DEFAULT_MAX_SAMPLES,
+                 frames=10):
+        self.file_path = file_path
+        with open(file_path, "r", encoding="utf-8") as file:
+            self.loop_lines = loop_body_lines(file.read())
+        self.loop_sites = {}
+        self.interval = interval_ms / 1000
+        self.max_samples = max_samples
+        self.frames = frames
+        self.mode = "memory"
+        self.timeline = []
+        self.line_history = {}
+        self.started = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+
+
+    def line_sizes(self, snapshot):
+        sizes = {}
+        for statistic in snapshot.statistics("traceback"):
+            # Attribute library and builtin allocations to the innermost line of the target that caused them,
+            # and remember the innermost loop body line on the way there (the allocation may be in a callee).
+            lines = [frame.lineno for frame in reversed(statistic.traceback) if frame.filename == self.file_path]
+            if not lines:
+                continue
+            size, count = sizes.get(lines[0], (0, 0))
+            sizes[lines[0]] = (size + statistic.size, count + statistic.count)
+            loop_line = next((line for line in lines if line in self.loop_lines), None)
+            if loop_line is not None:
+                self.loop_sites.setdefault(lines[0], loop_line)
+        return sizes
+
+
+    def sample(self):
+        snapshot = tracemalloc.take_snapshot()
+        traced, _ = tracemalloc.get_traced_memory()
+        rss = _current_rss()
+        self.timeline.append({"t_ms": round((time.perf_counter() - self.started) * 1000, 3),
+                              "rss_kb": rss // 1024 if rss is not None else None,
+                              "traced_kb": traced // 1024})
+        index = len(self.timeline) - 1
+        for line, (size, count) in self.line_sizes(snapshot).items():
+            self.line_history.setdefault(line, []).append((index, size, count))
+        return snapshot
+
+
+    def _sample_loop(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+            if len(self.timeline) >= self.max_samples:
+                # Keep long runs bounded: halve the resolution instead of dropping the tail.
+                self.timeline = self.timeline[::2]
+                self.line_history = {line: [(index // 2, size, count) for index, size, count in history
+                                            if index % 2 == 0]
+                                     for line, history in self.line_history.items()}
+                self.interval *= 2
+
+
+    def start(self):
+        self.started = time.perf_counter()
+        tracemalloc.start(self.frames)
+        self._thread.start()
+
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.final = self.sample()
+        self.peak_traced = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+
+    def results(self):
+        lines = []
+        for line, history in self.line_history.items():
+            final = history[-1] if history[-1][0] == len(self.timeline) - 1 else (None, 0, 0)
+            lines.append({"line": line,
+                          "size_kb": round(final[1] / 1024, 3),
+                          "count": final[2],
+                          "max_kb": round(max(size for _, size, _ in history) / 1024, 3),
+                          "loop_line": self.loop_sites.get(line),
+                          "samples": [[index, round(size / 1024, 3)] for index, size, _ in history]})
+
+        rss = [sample["rss_kb"] for sample in self.timeline if sample["rss_kb"] is not None]
+        peak_rss = _peak_rss()
+        return {
+            "mode": self.mode,
+            "lines": sorted(lines, key=lambda entry: entry["line"]),
+            "timeline": self.timeline,
+            "peak_traced_kb": self.peak_traced // 1024,
+            "peak_rss_kb": peak_rss // 1024 if peak_rss is not None else (max(rss) if rss else None)
+        }
+
+
+def _run_target(script, output, mode, argv):
+    script = os.path.abspath(script)
+    sys.argv = [script] + argv
+    sys.path[0] = os.path.dirname(script)
+
+    if mode == "memory":
+        options = json.loads(os.environ.get("AI_DEBUGGER_PROFILE_OPTIONS") or "{}")
+        profiler = MemoryProfiler(script, **options)
+    else:
+        profiler = LineProfiler(script)
+    error = None
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit:
+        pass
+    except BaseException:
+        error = traceback.format_exc()
+    finally:
+        profiler.stop()
+
+    result = profiler.results()
+    result["wall_ms"] = (time.perf_counter() - start) * 1000
+    result["error"] = error
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(result, file)
+
+
+def summarize(profile, file_path=None, top=DEFAULT_TOP, hot_share=DEFAULT_HOT_SHARE):
+    total = sum(line["time_ms"] for line in profile["lines"]) or 1.0
+    for entry in profile["lines"] + profile["functions"]:
+        entry["percent"] = round(entry["time_ms"] * 100 / total, 2)
+        entry["time_ms"] = round(entry["time_ms"], 3)
+    for line in profile["lines"]:
+        line["is_hot"] = line["percent"] >= hot_share * 100
+        if file_path:
+            line["content"] = linecache.getline(file_path, line["line"]).rstrip()
+
+    profile["total_ms"] = round(total, 3)
+    profile["hotspots"] = sorted((line for line in profile["lines"] if line["is_hot"]),
+                                 key=lambda line: line["time_ms"], reverse=True)[:top]
+    profile["functions"].sort(key=lambda entry: entry["time_ms"], reverse=True)
+    return profile
+
+
+def loop_body_lines(code):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return set()
+    lines = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            lines.update(range(node.body[0].lineno, node.end_lineno + 1))
+    return lines
+
+
+def summarize_memory(profile, file_path=None, top=DEFAULT_TOP, hot_share=DEFAULT_HOT_SHARE,
+                     min_growth_samples=DEFAULT_MIN_GROWTH_SAMPLES, min_growth_kb=DEFAULT_MIN_GROWTH_KB):
+    for line in profile["lines"]:
+        sizes = [size for _, size in line.pop("samples")]
+        # Longest run of samples in which the line's retained memory only went up.
+        run, longest = 1, 1
+        for previous, current in zip(sizes, sizes[1:]):
+            run = run + 1 if current > previous else 1
+            longest = max(longest, run)
+        line["growth_kb"] = round(sizes[-1] - sizes[0], 3) if len(sizes) > 1 else 0.0
+        line["is_growing"] = line["loop_line"] is not None and longest >= min_growth_samples and line["growth_kb"] >= min_growth_kb
+        if file_path:
+            line["content"] = linecache.getline(file_path, line["line"]).rstrip()
+
+    threshold = profile["peak_traced_kb"] * hot_share
+    profile["hotspots"] = sorted((line for line in profile["lines"] if line["max_kb"] and line["max_kb"] >= threshold),
+                                 key=lambda line: line["max_kb"], reverse=True)[:top]
+    profile["growing"] = [line for line in profile["lines"] if line["is_growing"]]
+    profile["findings"] = memory_findings(profile)
+    return profile
+
+
+def memory_findings(profile):
+    findings = []
+    for line in profile["growing"]:
+        loop = "" if line["loop_line"] == line["line"] else f" (called from the loop at line {line['loop_line']})"
+        findings.append({
+            "issue": "Memory Growth",
+            "line": line["line"],
+            "message": f"Memory retained by line {line['line']}{loop} grew by {line['growth_kb']:.0f} KB across "
+                       f"loop iterations (now {line['size_kb']:.0f} KB in {line['count']} blocks)",
+            "fix_suggestion": "Release or bound what the loop accumulates (clear caches, keep only what is needed, "
+                              "or stream results instead of collecting them)",
+            "category": "Memory"
+        })
+    growing = {line["line"] for line in profile["growing"]}
+    for line in profile["hotspots"]:
+        if line["line"] in growing:
+            continue
+        findings.append({
+            "issue": "Memory Hotspot",
+            "line": line["line"],
+            "message": f"Line {line['line']} held up to {line['max_kb']:.0f} KB "
+                       f"({line['size_kb']:.0f} KB still retained at exit)",
+            "fix_suggestion": "Process the data incrementally (generators, chunks) or use a more compact "
+                              "representation (array, numpy, __slots__)",
+            "category": "Memory"
+        })
+    return findings
+
+
+def _profile_child(file_path, mode, args, timeout, options=None):
+    # The target runs in a child interpreter, like detect_runtime_error, so its globals, exits
+    # and crashes never touch the debugger process.
+    handle, output = tempfile.mkstemp(suffix=".json", prefix="ai_debugger_profile_")
+    os.close(handle)
+    env = dict(os.environ, AI_DEBUGGER_PROFILE_OPTIONS=json.dumps(options or {}))
+    try:
+        command = [sys.executable, os.path.abspath(__file__), output, mode, file_path] + list(args)
+        try:
+            completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout, env=env)
+        except subprocess.TimeoutExpired:
+            logging.error(f"Profiling {file_path} timed out after {timeout}s")
+            return {"error": f"Profiling timed out after {timeout}s"}
+
+        try:
+            with open(output, "r", encoding="utf-8") as file:
+                profile = json.load(file)
+        except (OSError, ValueError):
+            logging.error(f"Profiler produced no results for {file_path}: {completed.stderr}")
+            return {"error": completed.stderr or "Profiler produced no results"}
+    finally:
+        os.remove(output)
+
+    profile["returncode"] = completed.returncode
+    profile["stdout"] = completed.stdout
+    linecache.checkcache(file_path)
+    return profile
+
+
+def profile_script(file_path: str, args=(), timeout=DEFAULT_TIMEOUT, top=DEFAULT_TOP,
+                   hot_share=DEFAULT_HOT_SHARE) -> dict:
+    profile = _profile_child(file_path, "time", args, timeout)
+    return summarize(profile, file_path, top, hot_share) if "lines" in profile else profile
+
+
+def profile_memory(file_path: str, args=(), timeout=DEFAULT_TIMEOUT, top=DEFAULT_TOP, hot_share=DEFAULT_HOT_SHARE,
+                   interval_ms=DEFAULT_SAMPLE_INTERVAL_MS, max_samples=DEFAULT_MAX_SAMPLES,
+                   min_growth_samples=DEFAULT_MIN_GROWTH_SAMPLES, min_growth_kb=DEFAULT_MIN_GROWTH_KB) -> dict:
+    profile = _profile_child(file_path, "memory", args, timeout,
+                             {"interval_ms": interval_ms, "max_samples": max_samples})
+    if "lines" not in profile:
+        return profile
+    return summarize_memory(profile, file_path, top, hot_share, min_growth_samples, min_growth_kb)
+
+
+if __name__ == "__main__":
+    _run_target(sys.argv[3], sys.argv[1], sys.argv[2], sys.argv[4:])
@@ -0,0 +1,233 @@
+import ast
+import re
+
+DEFAULT_PROMPT_BUDGET = 512
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _node_start(node):
+    decorators = getattr(node, "decorator_list", None) or []
+    return min([node.lineno] + [decorator.lineno for decorator in decorators])
+
+
+def _defined_names(node):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, ast.Assign):
+        return [target.id for target in node.targets if isinstance(target, ast.Name)]
+    if isinstance(node, (ast.AnnAssign, ast.AugAssign)) and isinstance(node.target, ast.Name):
+        return [node.target.id]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [(alias.asname or alias.name).split(".")[0] for alias in node.names]
+    return []
+
+
+def _signature(lines, node):
+    header = lines[_node_start(node) - 1:node.body[0].lineno - 1] or [lines[node.lineno - 1]]
+    return "\n".join(header) + "\n    ..."
+
+
+class PromptBuilder:
+    def __init__(self, count_tokens=None, budget=DEFAULT_PROMPT_BUDGET, line_radius=2):
+        self.count_tokens = count_tokens or approximate_tokens
+        self.budget = budget
+        self.line_radius = line_radius
+
+
+    def build(self, template: str, code: str, line_number=None, budget=None, **fields):
+        budget = self.budget if budget is None else budget
+        overhead = self.count_tokens(template.format(context="", **fields))
+        context = self.select_context(code, line_number, max(0, budget - overhead))
+        return template.format(context=context, **fields), context
+
+
+    def select_context(self, code: str, line_number=None, available=None) -> str:
+        available = self.budget if available is None else available
+        if line_number is None and self.count_tokens(code) <= available:
+            return code
+
+        lines = code.splitlines()
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            tree = None
+
+        if line_number is None:
+            return self._outline(tree, lines, available) if tree else self._line_window(lines, 1, available)
+
+        focus = self._enclosing_node(tree, line_number) if tree else None
+        if not isinstance(focus, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # Module-level code (or code that doesn't parse) gets the same few surrounding lines as before.
+            return self._line_window(lines, line_number, available,
+                                     max(1, line_number - self.line_radius), line_number + self.line_radius)
+
+        start, end = _node_start(focus), focus.end_lineno
+        focus_text = "\n".join(lines[start - 1:end])
+        used = self.count_tokens(focus_text)
+        if used > available:
+            return self._line_window(lines, line_number, available, start, end)
+
+        definitions = []
+        for node in self._referenced_definitions(tree, focus):
+            text = "\n".join(lines[_node_start(node) - 1:node.end_lineno])
+            cost = self.count_tokens(text)
+            if used + cost > available and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                text = _signature(lines, node)
+                cost = self.count_tokens(text)
+            if used + cost <= available:
+                definitions.append((_node_start(node), text))
+                used += cost
+
+        return "\n\n".join([text for _, text in sorted(definitions)] + [focus_text])
+
+
+    @staticmethod
+    def _enclosing_node(tree, line_number):
+        best = None
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if _node_start(node) <= line_number <= node.end_lineno:
+                if best is None or _node_start(node) >= _node_start(best):
+                    best = node
+
+        if best is not None:
+            return best
+
+        for node in tree.body:
+            if _node_start(node) <= line_number <= node.end_lineno:
+                return node
+        return None
+
+
+    @staticmethod
+    def _referenced_definitions(tree, focus):
+        referenced = []
+        for node in ast.walk(focus):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in referenced:
+                referenced.append(node.id)
+
+        definitions = {}
+        for node in tree.body:
+            if node is focus:
+                continue
+            for name in _defined_names(node):
+                definitions.setdefault(name, node)
+
+        selected = []
+        for name in referenced:
+            node = definitions.get(name)
+            if node is not None and node not in selected:
+                selected.append(node)
+        return selected
+
+
+    def _line_window(self, lines, center, available, lower=1, upper=None):
+        upper = min(upper or len(lines), len(lines))
+        center = min(max(center, lower), upper)
+        start = end = center
+        used = self.count_tokens(lines[center - 1]) if lines else 0
+
+        while True:
+            grew = False
+            for candidate in (start - 1, end + 1):
+                if not lower <= candidate <= upper:
+                    continue
+                cost = self.count_tokens(lines[candidate - 1]) + 1
+                if used + cost > available:
+                    continue
+                used += cost
+                start, end = min(start, candidate), max(end, candidate)
+                grew = True
+            if not grew:
+                break
+
+        return "\n".join(lines[start - 1:end])
+
+
+    def _outline(self, tree, lines, available):
+        parts = []
+        used = 0
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                text = _signature(lines, node)
+            else:
+                text = "\n".join(lines[node.lineno - 1:node.end_lineno])
+            cost = self.count_tokens(text)
+            if used + cost > available:
+                break
+            parts.append(text)
+            used += cost
+        return "\n".join(parts)
+
+
+    def _range_cost(self, lines, start, end):
+        return self.count_tokens("\n".join(lines[start - 1:end]))
+
+
+    def _split_lines(self, lines, start, end, available):
+        ranges = []
+        chunk_start = start
+        used = 0
+        for number in range(start, end + 1):
+            cost = self.count_tokens(lines[number - 1]) + 1
+            if used + cost > available and number > chunk_start:
+                ranges.append((chunk_start, number - 1))
+                chunk_start, used = number, 0
+            used += cost
+        if chunk_start <= end:
+            ranges.append((chunk_start, end))
+        return ranges
+
+
+    def _split_statements(self, lines, nodes, start, end, available):
+        starts = [start] + [_node_start(node) for node in nodes[1:]]
+        ends = [next_start - 1 for next_start in starts[1:]] + [end]
+
+        ranges = []
+        for node, unit_start, unit_end in zip(nodes, starts, ends):
+            body = getattr(node, "body", None)
+            if self._range_cost(lines, unit_start, unit_end) <= available:
+                ranges.append((unit_start, unit_end))
+            elif isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                # The header travels with the first body statement so every chunk stays readable.
+                ranges.extend(self._split_statements(lines, body, unit_start, unit_end, available))
+            else:
+                ranges.extend(self._split_lines(lines, unit_start, unit_end, available))
+        return ranges
+
+
+    def split_chunks(self, code: str, available=None) -> list:
+        available = self.budget if available is None else available
+        lines = code.splitlines()
+        if not lines:
+            return []
+
+        try:
+            tree = ast.parse(code)
+            units = self._split_statements(lines, tree.body, 1, len(lines), available) if tree.body else []
+        except (SyntaxError, ValueError):
+            units = self._split_lines(lines, 1, len(lines), available)
+        if not units:
+            units = [(1, len(lines))]
+
+        chunks = []
+        current, used = None, 0
+        for start, end in units:
+            cost = self._range_cost(lines, start, end)
+            if current is not None and used + cost <= available:
+                current = (current[0], end)
+                used += cost
+            else:
+                if current is not None:
+                    chunks.append(current)
+                current, used = (start, end), cost
+        chunks.append(current)
+
+        return [{"start_line": start, "end_line": end, "code": "\n".join(lines[start - 1:end])}
+                for start, end in chunks]
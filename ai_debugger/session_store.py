@@ -0,0 +1,95 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+
+SNAPSHOT_VERSION = 1
+
+_SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def content_hash(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_content_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SessionStore:
+    def __init__(self, directory=None):
+        # The directory is only created by the first save, so a store that is never written leaves no trace.
+        self.directory = os.path.expanduser(directory) if directory else None
+
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+
+    def _path(self, session_id):
+        if not _SESSION_ID_PATTERN.match(session_id):
+            raise ValueError(f"Invalid session id: {session_id}")
+        return os.path.join(self.directory, f"{session_id}.json.gz")
+
+
+    def save(self, session_id, snapshot: dict) -> bool:
+        if not self.enabled:
+            return False
+
+        path = self._path(session_id)
+        tmp_path = f"{path}.tmp"
+        payload = json.dumps(dict(snapshot, snapshot_version=SNAPSHOT_VERSION),
+                             separators=(",", ":"), default=str)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logging.error(f"Failed to save session snapshot {session_id}: {e}")
+            return False
+
+
+    def load(self, session_id):
+        if not self.enabled:
+            return None
+
+        try:
+            path = self._path(session_id)
+        except ValueError:
+            return None
+
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to load session snapshot {session_id}: {e}")
+            return None
+
+        if snapshot.get("snapshot_version") != SNAPSHOT_VERSION:
+            logging.warning(f"Ignoring session snapshot {session_id} with unsupported version")
+            return None
+        return snapshot
+
+
+    def delete(self, session_id):
+        if not self.enabled:
+            return
+
+        try:
+            os.remove(self._path(session_id))
+        except (OSError, ValueError):
+            pass
@@ -0,0 +1,124 @@
+import hashlib
+import mmap
+import os
+from array import array
+
+
+class SourceBuffer:
+    def __init__(self, file_path: str, encoding="utf-8"):
+        self.file_path = file_path
+        self.encoding = encoding
+        self._file = None
+        self._data = b""
+        self._size = 0
+        self._signature = None
+        self._offsets = array("I")
+        self._load()
+
+
+    def _load(self):
+        self.close()
+        self._file = open(self.file_path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        size = self._file.seek(0, 2)
+
+        if size:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b""
+        self._size = size
+
+        offsets = array("I" if size < 2 ** 32 else "Q", [0])
+        position = self._data.find(b"\n")
+        while position != -1:
+            offsets.append(position + 1)
+            position = self._data.find(b"\n", position + 1)
+        if size == 0:
+            offsets = array("I")
+        elif offsets[-1] == size:
+            offsets.pop()
+        self._offsets = offsets
+
+
+    def _check_stale(self):
+        # Reading past the end of a mapping whose file was truncated raises SIGBUS, and an in-place edit that keeps
+        # the size moves lines under the cached offsets, so remap whenever the file is no longer the one we indexed.
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            stat = None
+        if stat is not None and (stat.st_ino, stat.st_mtime_ns, stat.st_size) != self._signature:
+            self._load()
+        elif isinstance(self._data, mmap.mmap) and self._data.size() != self._size:
+            self._load()
+
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+    def __len__(self):
+        self._check_stale()
+        return len(self._offsets)
+
+
+    def _line_bounds(self, index):
+        start = self._offsets[index]
+        end = self._offsets[index + 1] if index + 1 < len(self._offsets) else self._size
+        return start, end
+
+
+    def line(self, index: int) -> str:
+        self._check_stale()
+        return self._line(index)
+
+
+    def _line(self, index):
+        if index < 0:
+            index += len(self._offsets)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError("line index out of range")
+        start, end = self._line_bounds(index)
+        return self._data[start:end].decode(self.encoding, errors="replace")
+
+
+    def text(self, start: int = 0, end: int = None) -> str:
+        self._check_stale()
+        start, end, _ = slice(start, end).indices(len(self._offsets))
+        if start >= end:
+            return ""
+        byte_start = self._offsets[start]
+        byte_end = self._line_bounds(end - 1)[1]
+        return self._data[byte_start:byte_end].decode(self.encoding, errors="replace")
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # One staleness check per slice, not one stat per line.
+            return [self._line(i) for i in range(*index.indices(len(self)))]
+        return self.line(index)
+
+
+    def __iter__(self):
+        self._check_stale()
+        for i in range(len(self._offsets)):
+            yield self._line(i)
+
+
+    def sha256(self) -> str:
+        self._check_stale()
+        return hashlib.sha256(self._data).hexdigest()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
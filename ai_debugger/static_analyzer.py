@@ -1,35 +1,288 @@
+import ast
+import logging
+import re
+import time
+
+CHECKERS = {}
+
+DEFAULT_MAX_COMPLEXITY = 10
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# These ran unconditionally before static_analysis.enabled_checkers existed, so older user lists don't name them.
+_ALWAYS_ON_CHECKERS = ("empty",)
+
+
+def register_checker(cls):
+    CHECKERS[cls.name] = cls
+    return cls
+
+
+class Checker:
+    name = "base"
+    family = None
+    category = "Static Analysis"
+    node_types = ()
+
+    def __init__(self, options=None):
+        self.options = options or {}
+        self.issues = []
+
+
+    def visit(self, node):
+        pass
+
+
+    def depart(self, node):
+        pass
+
+
+    def finish(self):
+        pass
+
+
+    def metrics(self):
+        return None
+
+
+    def report(self, node, issue, message, fix_suggestion):
+        self.issues.append({
+            "issue": issue,
+            "line": getattr(node, "lineno", None),
+            "message": message,
+            "fix_suggestion": fix_suggestion,
+            "category": self.category
+        })
+
+
+def configured_checkers(settings):
+    settings = settings or {}
+    enabled = settings.get("enabled_checkers")
+    if enabled is None:
+        return None
+    disabled = settings.get("disabled_checkers") or ()
+    names = list(enabled) + [name for name in _ALWAYS_ON_CHECKERS if name not in enabled]
+    return [name for name in names if name not in disabled]
+
+
+class _CheckerDispatcher(ast.NodeVisitor):
+    def __init__(self, checkers):
+        self.timings = {checker.name: 0.0 for checker in checkers}
+        self._visitors = {}
+        self._departures = {}
+        for checker in checkers:
+            departs = type(checker).depart is not Checker.depart
+            for node_type in checker.node_types:
+                self._visitors.setdefault(node_type, []).append(checker)
+                if departs:
+                    self._departures.setdefault(node_type, []).append(checker)
+
+
+    def _run(self, checkers, method, node):
+        for checker in checkers:
+            start = time.perf_counter()
+            getattr(checker, method)(node)
+            self.timings[checker.name] += time.perf_counter() - start
+
+
+    def visit(self, node):
+        node_type = type(node)
+        checkers = self._visitors.get(node_type)
+        if checkers:
+            self._run(checkers, "visit", node)
+        self.generic_visit(node)
+        checkers = self._departures.get(node_type)
+        if checkers:
+            self._run(checkers, "depart", node)
+
+
+@register_checker
+class EmptyDefinitionChecker(Checker):
+    name = "empty"
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+    def visit(self, node):
+        if node.body and not (len(node.body) == 1 and isinstance(node.body[0], ast.Pass)):
+            return
+        if isinstance(node, ast.ClassDef):
+            self.report(node, "Empty Class", f"Class '{node.name}' is empty",
+                        f"Implement class '{node.name}' or remove it")
+        else:
+            self.report(node, "Empty Function", f"Function '{node.name}' is empty",
+                        f"Implement function '{node.name}' or remove it")
+
+
+@register_checker
+class UnusedNameChecker(Checker):
+    name = "unused"
+    node_types = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.Assign, ast.AnnAssign,
+                  ast.Global, ast.Nonlocal, ast.Name)
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.imports = {}
+        self.loaded = set()
+        self.exports_all = False
+        self.scopes = []
+
+
+    def visit(self, node):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                self.loaded.add(node.id)
+                # Closures count as uses in every enclosing function.
+                for scope in self.scopes:
+                    scope["loaded"].add(node.id)
+        elif isinstance(node, _FUNCTION_NODES):
+            self.scopes.append({"assigned": {}, "loaded": set(), "declared": set()})
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            if self.scopes:
+                self.scopes[-1]["declared"].update(node.names)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if not self.scopes:
+                self.exports_all = self.exports_all or any(
+                    isinstance(target, ast.Name) and target.id == "__all__" for target in targets)
+                return
+            for target in targets:
+                for name in ast.walk(target):
+                    if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Store):
+                        self.scopes[-1]["assigned"].setdefault(name.id, name)
+        elif isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            return
+        elif not self.scopes:
+            for alias in node.names:
+                name = (alias.asname or alias.name).split(".")[0]
+                if name != "*":
+                    self.imports.setdefault(name, node)
+
+
+    def depart(self, node):
+        if not isinstance(node, _FUNCTION_NODES):
+            return
+        scope = self.scopes.pop()
+        for name, target in scope["assigned"].items():
+            if name in scope["loaded"] or name in scope["declared"] or name.startswith("_"):
+                continue
+            self.report(target, "Unused Variable", f"Local variable '{name}' in '{node.name}' is assigned but never used",
+                        f"Remove the assignment to '{name}' or use it")
+
+
+    def finish(self):
+        if self.exports_all:
+            return
+        for name, node in self.imports.items():
+            if name not in self.loaded and not name.startswith("_"):
+                self.report(node, "Unused Import", f"'{name}' is imported but never used",
+                            f"Remove the unused import of '{name}'")
+
+
+@register_checker
+class ComplexityChecker(Checker):
+    name = "complexity"
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While,
+                  ast.ExceptHandler, ast.BoolOp, ast.comprehension, ast.Assert) + (
+                     (ast.match_case,) if hasattr(ast, "match_case") else ())
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.max_complexity = self.options.get("max_complexity", DEFAULT_MAX_COMPLEXITY)
+        self.stack = []
+
+
+    @staticmethod
+    def decision_points(node):
+        if isinstance(node, ast.BoolOp):
+            return len(node.values) - 1
+        if isinstance(node, ast.comprehension):
+            return 1 + len(node.ifs)
+        return 1
+
+
+    def visit(self, node):
+        if isinstance(node, _FUNCTION_NODES):
+            self.stack.append(1)
+        elif self.stack:
+            self.stack[-1] += self.decision_points(node)
+
+
+    def depart(self, node):
+        if not isinstance(node, _FUNCTION_NODES):
+            return
+        complexity = self.stack.pop()
+        if complexity > self.max_complexity:
+            self.report(node, "High Complexity",
+                        f"Function '{node.name}' has cyclomatic complexity {complexity} "
+                        f"(limit {self.max_complexity})",
+                        f"Split '{node.name}' into smaller functions")
+
+
+@register_checker
+class NamingChecker(Checker):
+    name = "naming"
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+    _FUNCTION_NAME = re.compile(r"^_{0,2}[a-z][a-z0-9_]*_{0,2}$")
+    _CLASS_NAME = re.compile(r"^_?[A-Z][a-zA-Z0-9]*$")
+    # ast.NodeVisitor, http.server and unittest hooks are camel case by convention.
+    _FUNCTION_EXEMPT = re.compile(r"^(visit_|do_|setUp|tearDown)")
+
+    def visit(self, node):
+        if isinstance(node, ast.ClassDef):
+            if not self._CLASS_NAME.match(node.name):
+                self.report(node, "Naming Convention", f"Class name '{node.name}' is not CapWords",
+                            f"Rename class '{node.name}' to CapWords style")
+        elif not self._FUNCTION_NAME.match(node.name) and not self._FUNCTION_EXEMPT.match(node.name):
+            self.report(node, "Naming Convention", f"Function name '{node.name}' is not snake_case",
+                        f"Rename function '{node.name}' to snake_case style")
+
+
 class StaticAnalyzer:
     @staticmethod
-    def analyze_code(code: str) -> list:
-        import ast
-        issues = []
+    def run(code: str, enabled_checkers=None, options=None) -> dict:
+        # A family name (e.g. "performance") enables every checker registered under it.
+        names = list(CHECKERS) if enabled_checkers is None else [
+            name for name, checker in CHECKERS.items() if name in enabled_checkers or checker.family in enabled_checkers
+        ]
+        if not names:
+            return {"issues": [], "timings": {}, "metrics": {}}
 
         try:
             tree = ast.parse(code)
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef) and (not node.body or
-                                                          (len(node.body) == 1 and isinstance(node.body[0], ast.Pass))):
-                    issues.append({
-                        "issue": "Empty Function",
-                        "message": f"Function '{node.name}' is empty",
-                        "fix_suggestion": f"Implement function '{node.name}' or remove it"
-                    })
-
-                if isinstance(node, ast.ClassDef) and (not node.body or
-                                                       (len(node.body) == 1 and isinstance(node.body[0], ast.Pass))):
-                    issues.append({
-                        "issue": "Empty Class",
-                        "message": f"Class '{node.name}' is empty",
-                        "fix_suggestion": f"Implement class '{node.name}' or remove it"
-                    })
-
-            return issues
-
         except SyntaxError as e:
-            return [{
+            return {"issues": [{
                 "issue": "Syntax Error",
                 "line": e.lineno,
                 "message": str(e),
                 "fix_suggestion": "Fix syntax error"
-            }]
+            }], "timings": {}, "metrics": {}}
+
+        checkers = [CHECKERS[name](options) for name in names]
+        dispatcher = _CheckerDispatcher(checkers)
+        dispatcher.visit(tree)
+
+        issues = []
+        for order, checker in enumerate(checkers):
+            start = time.perf_counter()
+            checker.finish()
+            dispatcher.timings[checker.name] += time.perf_counter() - start
+            issues.extend((issue["line"] or 0, order, index, issue) for index, issue in enumerate(checker.issues))
+
+        timings = {name: seconds * 1000 for name, seconds in dispatcher.timings.items()}
+        logging.debug(f"Static analysis checker timings (ms): {timings}")
+        metrics = {}
+        for checker in checkers:
+            values = checker.metrics()
+            if values is not None:
+                metrics[checker.name] = values
+        return {"issues": [issue for _, _, _, issue in sorted(issues, key=lambda item: item[:3])],
+                "timings": timings, "metrics": metrics}
+
+
+    @staticmethod
+    def analyze_code(code: str, enabled_checkers=None, options=None) -> list:
+        return StaticAnalyzer.run(code, enabled_checkers, options)["issues"]
+
+
+# Imported last: these modules register further checkers against the classes above.
+from ai_debugger import performance_checkers, complexity_estimator  # noqa: E402,F401
@@ -0,0 +1,94 @@
+import ast
+import textwrap
+
+CONSTRAINT_KEYS = ("stop", "stop_on_fence", "complete_line")
+
+
+def parses(snippet: str) -> bool:
+    snippet = textwrap.dedent(snippet).strip()
+    if not snippet:
+        return False
+    # A lone block header such as "if x == 1:" is valid once it has a body.
+    for candidate in (snippet, snippet + "\n    pass"):
+        try:
+            ast.parse(candidate)
+            return True
+        except SyntaxError:
+            continue
+    return False
+
+
+def _complete_line_end(completion, start):
+    index = start
+    while True:
+        newline = completion.find("\n", index)
+        if newline == -1:
+            return None
+        lines = [line for line in completion[start:newline].split("\n") if not line.strip().startswith("```")]
+        if parses("\n".join(lines)):
+            return newline
+        index = newline + 1
+
+
+def stop_position(completion: str, stop=(), stop_on_fence=False, complete_line=False):
+    # Stops only count once the model has produced some content, so a leading newline or fence isn't a stop.
+    start = len(completion) - len(completion.lstrip())
+    if start == len(completion):
+        return None
+
+    positions = [index for index in (completion.find(sequence, start) for sequence in stop or ()) if index != -1]
+
+    if stop_on_fence:
+        opening = completion.find("```", start)
+        closing = completion.find("```", opening + 3) if opening != -1 else -1
+        if closing != -1:
+            positions.append(closing + 3)
+
+    if complete_line:
+        end = _complete_line_end(completion, start)
+        if end is not None:
+            positions.append(end)
+
+    return min(positions) if positions else None
+
+
+def split_constraints(params: dict) -> dict:
+    return {key: params.pop(key) for key in CONSTRAINT_KEYS if key in params}
+
+
+def has_stops(constraints: dict) -> bool:
+    return bool(constraints.get("stop") or constraints.get("stop_on_fence") or constraints.get("complete_line"))
+
+
+def truncate_completion(prompt: str, text: str, constraints: dict) -> str:
+    if not has_stops(constraints):
+        return text
+    completion = text[len(prompt):] if text.startswith(prompt) else text
+    position = stop_position(completion, **constraints)
+    if position is None:
+        return text
+    return text[:len(text) - len(completion) + position]
+
+
+def make_stopping_criteria(tokenizer, constraints: dict):
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class _StopOnCompletion(StoppingCriteria):
+        def __init__(self):
+            self.prompt_length = None
+            self.last_length = None
+
+
+        def __call__(self, input_ids, scores, **kwargs):
+            length = input_ids.shape[1]
+            if self.last_length is None or length <= self.last_length:
+                # First step of a new generate() call: everything before the newest token is the (padded) prompt.
+                self.prompt_length = length - 1
+            self.last_length = length
+
+            completions = tokenizer.batch_decode(input_ids[:, self.prompt_length:], skip_special_tokens=True)
+            return torch.tensor([stop_position(completion, **constraints) is not None for completion in completions],
+                                dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([_StopOnCompletion()])
@@ -0,0 +1,157 @@
+import ast
+import hashlib
+
+_UNIT_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _normalize_docstring(node):
+    body = getattr(node, "body", None)
+    if (isinstance(body, list) and body and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)):
+        # black re-indents docstrings and strips their trailing whitespace.
+        text = body[0].value.value
+        return "\n".join(line.strip() for line in text.strip().splitlines())
+    return None
+
+
+def _dump(value, units=(), anonymous=False):
+    if isinstance(value, list):
+        return "[" + ", ".join(_dump(item, units) for item in value) + "]"
+    if not isinstance(value, ast.AST):
+        return repr(value)
+    if value in units:
+        # Nested classes and methods are units of their own; the parent only records that they exist.
+        return f"<unit {value.name}>"
+    docstring = _normalize_docstring(value)
+    fields = []
+    for field, child in ast.iter_fields(value):
+        if field == "type_comment" or (anonymous and field == "name"):
+            continue
+        if field == "body" and docstring is not None:
+            fields.append(f"body=[<doc {docstring!r}>, " + _dump(child[1:], units)[1:])
+        else:
+            fields.append(f"{field}={_dump(child, units)}")
+    return f"{type(value).__name__}({', '.join(fields)})"
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalized_hash(code: str):
+    # Same value for code that only differs in formatting, comments or docstring layout; None if it doesn't parse.
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    return _digest(_dump(tree))
+
+
+def _span(node):
+    start = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+    return start, getattr(node, "end_lineno", None) or start
+
+
+def code_units(code: str) -> dict:
+    tree = ast.parse(code)
+    lines = code.splitlines()
+    units = {}
+
+    def collect(body, prefix, parent):
+        children = [node for node in body if isinstance(node, _UNIT_NODES)]
+        for node in children:
+            qualname = f"{prefix}{node.name}"
+            # Methods and nested classes are separate units; functions nested in functions stay in their parent.
+            nested = [child for child in node.body if isinstance(child, _UNIT_NODES)] if isinstance(
+                node, ast.ClassDef) else []
+            start, end = _span(node)
+            units[qualname] = {
+                "name": qualname,
+                "type": "class" if isinstance(node, ast.ClassDef) else "method" if parent == "class" else "function",
+                "line": start,
+                "end_line": end,
+                # Name excluded, so a renamed but otherwise identical unit still matches.
+                "hash": _digest(_dump(node, nested, anonymous=True)),
+                "text_hash": _digest("\n".join(lines[index - 1] for index in range(start, end + 1)
+                                               if not any(_span(child)[0] <= index <= _span(child)[1]
+                                                          for child in nested)))
+            }
+            if nested:
+                collect(nested, f"{qualname}.", "class")
+        return children
+
+    top_level = collect(tree.body, "", "module")
+    module_body = [node for node in tree.body if node not in top_level]
+    if module_body:
+        units["<module>"] = {
+            "name": "<module>",
+            "type": "module",
+            "line": module_body[0].lineno,
+            "end_line": getattr(module_body[-1], "end_lineno", None) or module_body[-1].lineno,
+            # Only the remaining statements: reordering functions and classes alone leaves it unchanged.
+            "hash": _digest(_dump(ast.Module(body=module_body, type_ignores=[]))),
+            "text_hash": _digest("\n".join(ast.get_source_segment(code, node) or "" for node in module_body))
+        }
+    return units
+
+
+def _entry(name, status, old=None, new=None):
+    unit = new or old
+    return {
+        "name": name,
+        "type": unit["type"],
+        "status": status,
+        "old_name": old["name"] if old and old["name"] != name else None,
+        "old_line": old["line"] if old else None,
+        "old_end_line": old["end_line"] if old else None,
+        "line": new["line"] if new else None,
+        "end_line": new["end_line"] if new else None
+    }
+
+
+def structural_diff(old_code: str, new_code: str) -> dict:
+    try:
+        old_units, new_units = code_units(old_code), code_units(new_code)
+    except (SyntaxError, ValueError) as e:
+        return {"error": f"Structural diff needs both versions to parse: {e}"}
+
+    units = []
+    for name, new in new_units.items():
+        old = old_units.get(name)
+        if old is None:
+            continue
+        if old["hash"] != new["hash"]:
+            status = "modified"
+        elif old["text_hash"] != new["text_hash"]:
+            status = "reformatted"
+        elif old["line"] != new["line"]:
+            status = "moved"
+        else:
+            status = "unchanged"
+        units.append(_entry(name, status, old, new))
+
+    # Units that disappeared under one name and reappeared, unchanged, under another were renamed.
+    removed = {name: unit for name, unit in old_units.items() if name not in new_units}
+    removed_by_hash = {}
+    for name, unit in removed.items():
+        removed_by_hash.setdefault((unit["type"], unit["hash"]), []).append(name)
+    for name, new in new_units.items():
+        if name in old_units:
+            continue
+        candidates = removed_by_hash.get((new["type"], new["hash"]))
+        if candidates and name != "<module>":
+            units.append(_entry(name, "renamed", removed.pop(candidates.pop(0)), new))
+        else:
+            units.append(_entry(name, "added", new=new))
+    units.extend(_entry(name, "removed", old=old) for name, old in removed.items())
+
+    units.sort(key=lambda unit: (unit["line"] or unit["old_line"] or 0, unit["name"]))
+    summary = {}
+    for unit in units:
+        summary[unit["status"]] = summary.get(unit["status"], 0) + 1
+    return {
+        "units": units,
+        "summary": summary,
+        # Units whose semantics may have changed; everything else can reuse earlier analysis.
+        "changed": [unit["name"] for unit in units if unit["status"] in ("added", "modified")]
+    }
@@ -1,9 +1,126 @@
 import ast
 import logging
 import re
+import tokenize
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+MAX_SYNTAX_ERRORS = 50
+
+_COMPOUND_KEYWORDS = {"if", "elif", "else", "for", "while", "try", "except", "finally", "with", "def", "class",
+                      "match", "case"}
+_CLAUSE_PREDECESSORS = {
+    "elif": ("if", "elif"),
+    "else": ("if", "elif", "for", "while", "try", "except"),
+    "except": ("try", "except"),
+    "finally": ("try", "except", "else")
+}
+# Clauses can't be parsed on their own, so each is checked after a minimal statement it may follow.
+_CLAUSE_WRAPPERS = {
+    "elif": "if 1:\n    pass\n",
+    "else": "if 1:\n    pass\n",
+    "except": "try:\n    pass\n",
+    "finally": "try:\n    pass\n"
+}
+_COLON_KEYWORDS = {"if", "elif", "else", "for", "while", "try", "except", "finally", "with", "def", "class"}
+_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+
+
+def _indent_width(line):
+    return len(line[:len(line) - len(line.lstrip(" \t\f"))].expandtabs(8))
+
+
+def _logical_lines(lines, keep_errors=False):
+    # Leading whitespace is stripped before tokenizing, so the tokenizer never raises indentation errors
+    # and can be restarted at any line; block structure is checked separately from the recorded indents.
+    # Token positions are mapped back to the original lines before they are yielded.
+    stripped = [line.lstrip(" \t\f") for line in lines]
+    offsets = [len(line) - len(text) for line, text in zip(lines, stripped)]
+    skipped = (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER) + (
+        () if keep_errors else (tokenize.ERRORTOKEN,))
+    start = 0
+    while start < len(lines):
+        position = [start]
+
+        def readline():
+            if position[0] >= len(lines):
+                return ""
+            position[0] += 1
+            return stripped[position[0] - 1]
+
+        def locate(row, column):
+            row += start
+            return row, column + offsets[row - 1] if row <= len(lines) else column
+
+        tokens = []
+        brackets = []
+        try:
+            for token in tokenize.generate_tokens(readline):
+                if token.type in skipped or (token.type == tokenize.ERRORTOKEN and token.string.isspace()):
+                    continue
+                token = token._replace(start=locate(*token.start), end=locate(*token.end))
+                if token.type == tokenize.OP and token.string in _BRACKETS:
+                    brackets.append((token.string, token.start[0]))
+                elif token.type == tokenize.OP and token.string in _BRACKETS.values() and brackets:
+                    brackets.pop()
+                if token.type != tokenize.NEWLINE:
+                    tokens.append(token)
+                    continue
+                if tokens:
+                    yield "statement", tokens[0].start[0], token.start[0], tokens
+                tokens = []
+                brackets = []
+            return
+        except (tokenize.TokenError, SyntaxError) as e:
+            message = e.args[0] if e.args else str(e)
+            where = e.args[1] if len(e.args) > 1 and isinstance(e.args[1], tuple) else None
+            if brackets:
+                opener, line = brackets[0]
+                yield "error", line, None, f"'{opener}' was never closed"
+            elif "string" in message and ("multi-line" in message or "triple" in message):
+                # Everything after an unterminated triple-quoted string is part of the string.
+                line, column = locate(*where) if where else (start + 1, 0)
+                yield "error", line, column + 1, "unterminated triple-quoted string literal"
+                return
+            else:
+                line = tokens[0].start[0] if tokens else min(position[0], len(lines))
+                yield "error", line, None, message
+
+        first = tokens[0].start[0] if tokens else start + 1
+        indent = _indent_width(lines[first - 1])
+        start = max(line, first)
+        while start < len(lines) and (not stripped[start].strip() or stripped[start].startswith("#")
+                                      or _indent_width(lines[start]) > indent):
+            start += 1
+
+
+def _open_quote(text):
+    quote = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif text.startswith(quote, i):
+                i += len(quote) - 1
+                quote = None
+        elif char == "#":
+            break
+        elif char in "'\"":
+            quote = text[i:i + 3] if text[i:i + 3] in ("'''", '"""') else char
+            i += len(quote) - 1
+        i += 1
+    return quote
+
+
+def _apply_edits(line, edits):
+    text = line.rstrip("\r\n")
+    for start, end, replacement in sorted(edits, reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
 class SyntaxChecker:
     @staticmethod
     def check_syntax(code: str) -> dict:
@@ -48,40 +165,216 @@ class SyntaxChecker:
 
 
     @staticmethod
-    def analyze_line(line, line_number):
-        issues = []
+    def _error(line, column, message):
+        return {
+            "error": "Syntax Error",
+            "line": line,
+            "column": column,
+            "message": message,
+            "fix_suggestion": SyntaxChecker.get_fix_suggestion(SyntaxError(message))
+        }
 
-        if re.search(r'\b(if|elif|else|def|class|for|while|try|except|finally)\b.*\s*$', line) and not line.endswith(
-                ':'):
-            return {
-                "issue": "Syntax Error",
-                "line": line_number + 1,
-                "message": "Missing colon at the end of statement",
-                "fix_suggestion": f"{line}:"
-            }
 
-        quote_chars = ["'", '"', '"""', "'''"]
-        for quote in quote_chars:
-            if line.count(quote) % 2 == 1:
-                return {
-                    "issue": "Syntax Error",
-                    "line": line_number + 1,
-                    "message": f"Mismatched {quote} quotes",
-                    "fix_suggestion": f"{line}{quote}"
-                }
-
-        if ('if ' in line or 'while ' in line) and '=' in line and '==' not in line and '!=' not in line:
-            fixed = line.replace('=', '==', 1)
-            return {
-                "issue": "Syntax Error",
-                "line": line_number + 1,
-                "message": "Using assignment (=) instead of comparison (==) in condition",
-                "fix_suggestion": fixed
-            }
+    @staticmethod
+    def _parse_statement(lines, first, last, tokens):
+        keyword = tokens[1].string if tokens[0].string == "async" and len(tokens) > 1 else tokens[0].string
+        indent = len(lines[first - 1]) - len(lines[first - 1].lstrip(" \t\f"))
+        text = lines[first - 1][indent:] + "".join(lines[first:last])
+        if not text.endswith("\n"):
+            text += "\n"
+
+        prefix = _CLAUSE_WRAPPERS.get(keyword, "")
+        if tokens[0].type == tokenize.OP and tokens[0].string == "@":
+            text += "def _():\n    pass\n"
+        elif keyword == "case" and tokens[-1].string == ":":
+            prefix, text = "match _:\n", "    " + text + "        pass\n"
+        elif keyword == "match" and tokens[-1].string == ":":
+            text += "    case _:\n        pass\n"
+        elif keyword == "try" and tokens[-1].string == ":":
+            text += "    pass\nfinally:\n    pass\n"
+        elif tokens[-1].type == tokenize.OP and tokens[-1].string == ":":
+            text += "    pass\n"
 
+        try:
+            ast.parse(prefix + text)
+        except SyntaxError as e:
+            shift = first - prefix.count("\n") - 1
+            line = min(max((e.lineno or 1) + shift, first), last)
+            column = e.offset
+            if column is not None and line == first:
+                column += indent
+            message = re.sub(r"(?<=at line )(\d+)", lambda match: str(int(match.group(1)) + shift), e.msg)
+            return SyntaxChecker._error(line, column, message)
         return None
 
 
+    @staticmethod
+    def check_all(code: str, max_errors=MAX_SYNTAX_ERRORS) -> list:
+        try:
+            compile(code, "<string>", "exec")
+            return []
+        except SyntaxError as e:
+            first_error = SyntaxChecker._error(e.lineno, e.offset, e.msg)
+        except ValueError as e:
+            return [SyntaxChecker._error(None, None, str(e))]
+
+        lines = code.splitlines(True)
+        errors = []
+        stack = [0]
+        clauses = {}
+        header = None
+
+        for kind, first, last, detail in _logical_lines(lines):
+            if len(errors) >= max_errors:
+                break
+            if kind == "error":
+                errors.append(SyntaxChecker._error(first, last, detail))
+                continue
+
+            tokens = detail
+            indent = _indent_width(lines[first - 1])
+            keyword = tokens[1].string if tokens[0].string == "async" and len(tokens) > 1 else tokens[0].string
+            is_header = tokens[-1].type == tokenize.OP and tokens[-1].string == ":"
+
+            if header is not None:
+                header_line, header_keyword, strict = header
+                header = None
+                if indent <= stack[-1]:
+                    if strict:
+                        errors.append(SyntaxChecker._error(
+                            first, indent + 1,
+                            f"expected an indented block after '{header_keyword}' statement on line {header_line}"))
+                else:
+                    stack.append(indent)
+            elif indent > stack[-1]:
+                errors.append(SyntaxChecker._error(first, indent + 1, "unexpected indent"))
+                continue
+
+            if indent < stack[-1]:
+                while len(stack) > 1 and stack[-1] > indent:
+                    clauses.pop(stack.pop(), None)
+                if stack[-1] != indent:
+                    errors.append(SyntaxChecker._error(first, indent + 1,
+                                                       "unindent does not match any outer indentation level"))
+                    stack.append(indent)
+
+            error = None
+            if keyword in _CLAUSE_PREDECESSORS and clauses.get(indent) not in _CLAUSE_PREDECESSORS[keyword]:
+                error = SyntaxChecker._error(first, indent + 1, f"'{keyword}' without a matching "
+                                             f"{' / '.join(repr(k) for k in _CLAUSE_PREDECESSORS[keyword])}")
+            else:
+                error = SyntaxChecker._parse_statement(lines, first, last, tokens)
+            if error:
+                errors.append(error)
+
+            clauses[indent] = keyword if keyword in _COMPOUND_KEYWORDS else None
+            if is_header or (error and keyword in _COMPOUND_KEYWORDS):
+                # A broken header (e.g. a missing colon) still opens a block; don't also flag its body.
+                header = (first, keyword, not error)
+
+        if header is not None and header[2] and len(errors) < max_errors:
+            errors.append(SyntaxChecker._error(
+                header[0], None, f"expected an indented block after '{header[1]}' statement on line {header[0]}"))
+
+        # Errors the parser can't see statement by statement (e.g. 'return' outside a function) still count.
+        return errors or [first_error]
+
+
+    @staticmethod
+    def analyze_file_all(fpath: str) -> list:
+        try:
+            with open(fpath, "r", encoding="utf-8") as file:
+                code = file.read()
+        except Exception as e:
+            logging.exception(f"Unexpected error occurred while analyzing file {fpath}: {e}")
+            return [{"error": "Unexpected Error", "message": str(e)}]
+
+        errors = SyntaxChecker.check_all(code)
+        for error in errors:
+            logging.error(f"Syntax Error in {fpath}: {error['message']} at line {error['line']}, "
+                          f"column {error['column']}")
+        if not errors:
+            logging.info(f"File {fpath} parsed successfully.")
+        return errors
+
+
+    @staticmethod
+    def _scan_statement(lines, tokens, edits):
+        # edits: {line: [(start column, end column, replacement), ...]}, plus a message per edit.
+        keyword_index = 1 if tokens[0].string == "async" and len(tokens) > 1 else 0
+        keyword = tokens[keyword_index].string if tokens[keyword_index].type == tokenize.NAME else None
+
+        for token in tokens:
+            if token.type == tokenize.ERRORTOKEN and token.string[:1] in "'\"":
+                line = token.start[0]
+                quote = _open_quote(lines[line - 1]) or token.string[0]
+                end = len(lines[line - 1].rstrip("\r\n"))
+                edits.setdefault(line, []).append((end, end, quote, f"Mismatched {quote} quotes", token.start[1]))
+                # The rest of the statement was tokenized as if the string had ended, so stop here.
+                return
+
+        depth = 0
+        has_colon = False
+        for token in tokens[keyword_index + 1:]:
+            if token.type != tokenize.OP:
+                continue
+            if token.string in _BRACKETS:
+                depth += 1
+            elif token.string in _BRACKETS.values():
+                depth -= 1
+            elif depth == 0 and token.string == ":":
+                # Anything after the header's colon is a one-line body, where "=" is a plain assignment.
+                has_colon = True
+                break
+            elif depth == 0 and token.string == "=" and keyword in ("if", "elif", "while"):
+                line, column = token.start
+                edits.setdefault(line, []).append(
+                    (column, token.end[1], "==", "Using assignment (=) instead of comparison (==) in condition",
+                     column))
+
+        if keyword in _COLON_KEYWORDS and not has_colon:
+            line, column = tokens[-1].end
+            edits.setdefault(line, []).append((column, column, ":", "Missing colon at the end of statement", column))
+
+
+    @staticmethod
+    def scan_code(code: str) -> list:
+        lines = code.splitlines(True)
+        edits = {}
+        for kind, first, last, detail in _logical_lines(lines, keep_errors=True):
+            if kind == "statement":
+                SyntaxChecker._scan_statement(lines, detail, edits)
+            elif "string" in detail:
+                text = lines[first - 1]
+                column = (last or 1) - 1
+                quote = _open_quote(text[column:]) or _open_quote(text) or '"'
+                end = len(text.rstrip("\r\n"))
+                edits.setdefault(first, []).append((end, end, quote, f"Mismatched {quote} quotes", column))
+
+        findings = []
+        for line in sorted(edits):
+            fixed = _apply_edits(lines[line - 1], [edit[:3] for edit in edits[line]])
+            findings.append({
+                "issue": "Syntax Error",
+                "line": line,
+                "column": min(edit[4] for edit in edits[line]) + 1,
+                "message": "; ".join(edit[3] for edit in sorted(edits[line], key=lambda edit: edit[4])),
+                "fix_suggestion": fixed.strip(),
+                "fixed_line": fixed
+            })
+        return findings
+
+
+    @staticmethod
+    def analyze_line(line, line_number):
+        findings = SyntaxChecker.scan_code(line)
+        if not findings:
+            return None
+        finding = findings[0]
+        finding["line"] = line_number + 1
+        return finding
+
+
     @staticmethod
     def get_fix_suggestion(error) -> str:
         if "expected ':'" in error.msg:
@@ -90,8 +383,16 @@ class SyntaxChecker:
             return "Suggestion: Check for missing or misplaced characters."
         elif "unexpected indent" in error.msg:
             return "Suggestion: Check for consistent indentation (use spaces, not tabs)."
-        elif "EOF in multi-line statement" in error.msg:
+        elif "EOF in multi-line statement" in error.msg or "was never closed" in error.msg:
             return "Suggestion: Check for properly closed parentheses, brackets, or quotes."
+        elif "expected an indented block" in error.msg:
+            return "Suggestion: Indent the body of the block (or add 'pass' if it is intentionally empty)."
+        elif "unindent does not match" in error.msg:
+            return "Suggestion: Align the line with the indentation of an enclosing block."
+        elif "string literal" in error.msg or "EOL while scanning" in error.msg or "EOF while scanning" in error.msg:
+            return "Suggestion: Close the string with a matching quote."
+        elif "without a matching" in error.msg:
+            return "Suggestion: Check the indentation of this clause and the statement it belongs to."
         #TODO: add more suggestions
         return "No suggestion available."
 
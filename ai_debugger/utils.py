@@ -1,10 +1,157 @@
-import subprocess
+import difflib
+import hashlib
+import json
+import logging
+import os
+from ai_debugger.llm_cache import LLMCache
 
+DEFAULT_LINE_LENGTH = 88
 
-def format_code(file_path: str) -> str:
-    result = subprocess.run(['black', file_path], capture_output=True, text=True)
-    return result.stdout
+# Used when callers don't pass their own cache, so repeated calls in one process still hit.
+_default_cache = LLMCache(max_entries=2048)
 
-def analyze_complexity(file_path: str) -> str:
-    result = subprocess.run(['radon', 'cc', file_path], capture_output=True, text=True)
-    return result.stdout
\ No newline at end of file
+
+def create_tool_cache(config=None) -> LLMCache:
+    def setting(key, default=None):
+        return config.get(key, default) if config is not None else default
+
+    return LLMCache(max_entries=setting("tools.cache.max_entries", 2048),
+                    directory=setting("tools.cache.directory"),
+                    enabled=setting("tools.cache.enabled", True),
+                    max_disk_entries=setting("tools.cache.max_disk_entries", 10000))
+
+
+def _tool_key(tool: str, version: str, options: dict, code: str) -> str:
+    payload = json.dumps([tool, version, options, hashlib.sha256(code.encode("utf-8")).hexdigest()],
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _read(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def _import_black():
+    try:
+        import black
+    except ImportError:
+        raise ImportError("black is not installed; install it with 'pip install black'")
+    return black
+
+
+def format_source(code: str, line_length=DEFAULT_LINE_LENGTH, cache=None) -> str:
+    black = _import_black()
+    cache = cache or _default_cache
+    key = _tool_key("black", black.__version__, {"line_length": line_length}, code)
+    formatted = cache.get(key)
+    if formatted is None:
+        formatted = black.format_str(code, mode=black.Mode(line_length=line_length))
+        cache.put(key, formatted)
+    return formatted
+
+
+def _format_file(file_path, write, line_length, cache):
+    code = _read(file_path)
+    formatted = format_source(code, line_length, cache)
+    if write and formatted != code:
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(formatted)
+    return code, formatted
+
+
+def format_code(file_path: str, write=False, line_length=DEFAULT_LINE_LENGTH, cache=None) -> str:
+    # Dry run by default: the formatted text is returned and the file is only rewritten with write=True.
+    return _format_file(file_path, write, line_length, cache)[1]
+
+
+def format_files(file_paths, write=False, line_length=DEFAULT_LINE_LENGTH, cache=None) -> list:
+    _import_black()
+    results = []
+    for file_path in file_paths:
+        try:
+            code, formatted = _format_file(file_path, write, line_length, cache)
+        except (OSError, ValueError) as e:
+            # black reports code it can't parse as InvalidInput, a ValueError.
+            logging.error(f"Failed to format {file_path}: {e}")
+            results.append({"file": file_path, "error": str(e)})
+            continue
+        results.append({
+            "file": file_path,
+            "changed": formatted != code,
+            "formatted": formatted,
+            "diff": "".join(difflib.unified_diff(code.splitlines(True), formatted.splitlines(True),
+                                                 f"{file_path} (original)", f"{file_path} (formatted)"))
+        })
+    return results
+
+
+def complexity_rank(complexity: int) -> str:
+    # Same bands as radon: A (1-5) through F (41+).
+    for rank, limit in (("A", 5), ("B", 10), ("C", 20), ("D", 30), ("E", 40)):
+        if complexity <= limit:
+            return rank
+    return "F"
+
+
+def _estimator_blocks(code: str) -> list:
+    from ai_debugger.complexity_estimator import estimate_complexity
+    return [{"name": result["function"], "type": "function", "line": result["line"], "end_line": result["end_line"],
+             "complexity": result["cyclomatic"]} for result in estimate_complexity(code)]
+
+
+def _radon_blocks(code: str) -> list:
+    from radon.complexity import cc_visit
+
+    blocks = []
+    for block in cc_visit(code):
+        kind = "class" if not hasattr(block, "is_method") else "method" if block.is_method else "function"
+        blocks.append({"name": block.fullname, "type": kind, "line": block.lineno, "end_line": block.endline,
+                       "complexity": block.complexity})
+    return blocks
+
+
+def _complexity_backend():
+    # radon when it is installed; otherwise the in-repo estimator's cyclomatic counts.
+    try:
+        import radon
+    except ImportError:
+        return "estimator", _estimator_blocks
+    return f"radon {radon.__version__}", _radon_blocks
+
+
+def analyze_complexity(file_path: str, cache=None) -> list:
+    code = _read(file_path)
+    cache = cache or _default_cache
+    version, backend = _complexity_backend()
+    key = _tool_key("complexity", version, {}, code)
+    blocks = cache.get(key)
+    if blocks is None:
+        blocks = sorted(backend(code), key=lambda block: block["line"])
+        for block in blocks:
+            block["rank"] = complexity_rank(block["complexity"])
+        cache.put(key, blocks)
+    return blocks
+
+
+def analyze_complexity_files(file_paths, cache=None) -> list:
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append({"file": file_path, "blocks": analyze_complexity(file_path, cache)})
+        except (OSError, SyntaxError, ValueError) as e:
+            logging.error(f"Failed to analyze complexity of {file_path}: {e}")
+            results.append({"file": file_path, "error": str(e)})
+    return results
+
+
+def python_files(paths) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if not name.startswith(".") and name != "__pycache__")
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".py"))
+        else:
+            files.append(path)
+    return files
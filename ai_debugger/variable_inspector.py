@@ -0,0 +1,137 @@
+import reprlib
+from itertools import islice
+
+
+class VariableInspector:
+    def __init__(self, max_repr_length=120, page_size=50, max_variables=100):
+        self.max_repr_length = max_repr_length
+        self.page_size = page_size
+        self.max_variables = max_variables
+
+        self._repr = reprlib.Repr()
+        self._repr.maxlevel = 2
+        self._repr.maxstring = max_repr_length
+        self._repr.maxother = max_repr_length
+
+        self._step_key = None
+        self._cache = {}
+
+
+    def _sync_step(self, step_key):
+        if step_key != self._step_key:
+            self._step_key = step_key
+            self._cache = {}
+
+
+    def truncated_repr(self, value) -> str:
+        try:
+            text = self._repr.repr(value)
+        except Exception as e:
+            text = f"<repr failed: {type(e).__name__}>"
+        if len(text) > self.max_repr_length:
+            text = text[:self.max_repr_length - 3] + "..."
+        return text
+
+
+    @staticmethod
+    def _length(value):
+        try:
+            return len(value)
+        except Exception:
+            return None
+
+
+    @staticmethod
+    def _has_children(value) -> bool:
+        if isinstance(value, (str, bytes, int, float, bool, complex, type(None))):
+            return False
+        if isinstance(value, (list, tuple, dict, set, frozenset)):
+            return len(value) > 0
+        return bool(getattr(value, "__dict__", None))
+
+
+    @staticmethod
+    def _iter_children(value):
+        if isinstance(value, dict):
+            return ((k, v) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return ((f"[{i}]", v) for i, v in enumerate(value))
+        if isinstance(value, (set, frozenset)):
+            return ((f"{{{i}}}", v) for i, v in enumerate(value))
+        attributes = getattr(value, "__dict__", None)
+        if isinstance(attributes, dict):
+            return ((k, v) for k, v in attributes.items())
+        return iter(())
+
+
+    @staticmethod
+    def _child_count(value):
+        if isinstance(value, (list, tuple, dict, set, frozenset)):
+            return len(value)
+        attributes = getattr(value, "__dict__", None)
+        if isinstance(attributes, dict):
+            return len(attributes)
+        return 0
+
+
+    def describe(self, ref: str, value, step_key=None) -> dict:
+        self._sync_step(step_key)
+
+        cached = self._cache.get(ref)
+        if cached is not None:
+            return cached
+
+        handle = {
+            "ref": ref,
+            "type": type(value).__name__,
+            "length": self._length(value),
+            "repr": self.truncated_repr(value),
+            "has_children": self._has_children(value)
+        }
+        self._cache[ref] = handle
+        return handle
+
+
+    def summarize(self, variables: dict, step_key=None) -> dict:
+        handles = {}
+        for name, value in islice(variables.items(), self.max_variables):
+            handles[name] = self.describe(name, value, step_key)
+        return handles
+
+
+    def resolve(self, variables: dict, ref: str):
+        parts = ref.split("/")
+        if parts[0] not in variables:
+            raise KeyError(ref)
+
+        value = variables[parts[0]]
+        for part in parts[1:]:
+            index = int(part)
+            if index < 0:
+                raise KeyError(ref)
+            child = next(islice(self._iter_children(value), index, None), None)
+            if child is None:
+                raise KeyError(ref)
+            value = child[1]
+        return value
+
+
+    def children(self, variables: dict, ref: str, offset=0, limit=None, step_key=None) -> dict:
+        value = self.resolve(variables, ref)
+        offset = max(0, int(offset))
+        limit = self.page_size if limit is None else max(0, min(int(limit), self.page_size))
+
+        items = []
+        page = islice(self._iter_children(value), offset, offset + limit)
+        for index, (key, child) in enumerate(page, start=offset):
+            handle = dict(self.describe(f"{ref}/{index}", child, step_key))
+            handle["key"] = self.truncated_repr(key) if isinstance(value, dict) else key
+            items.append(handle)
+
+        return {
+            "ref": ref,
+            "offset": offset,
+            "limit": limit,
+            "total": self._child_count(value),
+            "items": items
+        }
@@ -0,0 +1,97 @@
+import argparse
+import difflib
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_debugger.cpu_inference import CPUInferenceProfile
+from ai_debugger.stopping import parses
+
+PROFILES = {
+    "fp32": {},
+    "fp32-threads": {"quantize": False},
+    "int8": {"quantize": True},
+    "onnx": {"quantize": False, "onnx": True},
+}
+
+
+def build_prompts(file_path, limit):
+    with open(file_path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    prompts = []
+    for number, line in enumerate(lines):
+        if not line.strip():
+            continue
+        context = "\n".join(lines[max(0, number - 3):number])
+        prompts.append(f"{context}\n" if context else "")
+        if len(prompts) >= limit:
+            break
+    return prompts
+
+
+def first_line(prompt, text):
+    completion = text[len(prompt):] if text.startswith(prompt) else text
+    return next((line.strip() for line in completion.split("\n") if line.strip()), "")
+
+
+def load(profile_name, model_name, workers, threads):
+    if profile_name == "fp32":
+        from transformers import pipeline
+        return pipeline("text-generation", model=model_name)
+    profile = CPUInferenceProfile(enabled=True, workers=workers, num_threads=threads, **PROFILES[profile_name])
+    return profile.load_pipeline(model_name)
+
+
+def run(generator, prompts, max_new_tokens):
+    outputs, samples = [], []
+    for prompt in prompts:
+        start = time.perf_counter()
+        text = generator(prompt, max_new_tokens=max_new_tokens, do_sample=False,
+                         pad_token_id=generator.tokenizer.eos_token_id)[0]["generated_text"]
+        samples.append((time.perf_counter() - start) * 1000)
+        outputs.append(first_line(prompt, text))
+    return outputs, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU inference profiles for latency and output quality")
+    parser.add_argument("file_path", nargs="?",
+                        default=os.path.join(os.path.dirname(__file__), "..", "tests", "test_files", "valid_script.py"))
+    parser.add_argument("--model", default="microsoft/CodeGPT-small-py")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["fp32", "int8"])
+    parser.add_argument("--prompts", type=int, default=10)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=1, help="API workers sharing this host")
+    parser.add_argument("--threads", type=int, help="Override intra-op threads per worker")
+    args = parser.parse_args()
+
+    prompts = build_prompts(args.file_path, args.prompts)
+    print(f"Model: {args.model}, prompts: {len(prompts)}, max_new_tokens: {args.max_new_tokens}")
+
+    reference = None
+    for profile_name in args.profiles:
+        try:
+            generator = load(profile_name, args.model, args.workers, args.threads)
+        except ImportError as e:
+            print(f"{profile_name:<14} skipped ({e})")
+            continue
+
+        run(generator, prompts[:1], args.max_new_tokens)
+        outputs, samples = run(generator, prompts, args.max_new_tokens)
+        reference = reference or outputs
+
+        # Quality is measured against the first profile (fp32 by default): exact first-line agreement,
+        # character similarity, and how many generated lines are valid Python.
+        agreement = sum(a == b for a, b in zip(outputs, reference)) / len(outputs)
+        similarity = statistics.mean(difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(outputs, reference))
+        parse_rate = sum(parses(line) for line in outputs if line) / max(1, sum(1 for line in outputs if line))
+        print(f"{profile_name:<14} mean {statistics.mean(samples):8.2f} ms   p50 {statistics.median(samples):8.2f} ms   "
+              f"agreement {agreement:5.0%}   similarity {similarity:5.2f}   parses {parse_rate:5.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import difflib
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_debugger.diff_engine import diff_lines
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<24} mean {statistics.mean(samples):8.2f} ms   "
+          f"p50 {statistics.median(samples):8.2f} ms   max {max(samples):8.2f} ms")
+
+
+def generated_file(lines, rng):
+    # Generated code and data tables: a few distinct lines repeated many times.
+    rows = [f"    ({rng.randint(0, 9)}, {rng.randint(0, 9)}),\n" for _ in range(lines - 2)]
+    return ["TABLE = [\n"] + rows + ["]\n"]
+
+
+def edited(old, edits, rng):
+    new = list(old)
+    for _ in range(edits):
+        position = rng.randrange(1, len(new) - 1)
+        action = rng.random()
+        if action < 0.4:
+            new[position] = f"    ({rng.randint(0, 9)}, {rng.randint(10, 99)}),\n"
+        elif action < 0.7:
+            del new[position:position + rng.randint(1, 5)]
+        else:
+            new[position:position] = [f"    # note {rng.randint(0, 999)}\n"] * rng.randint(1, 5)
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the line diff engine against difflib on large files")
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--difflib", action="store_true", help="Also time difflib.unified_diff (slow on these files)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    old = generated_file(args.lines, rng)
+    new = edited(old, args.edits, rng)
+
+    print(f"Old: {len(old)} lines, new: {len(new)} lines, {args.edits} edits, repeat: {args.repeat}")
+    result = diff_lines(old, new)
+    removed = sum(old_end - old_start for old_start, old_end, _, _ in result["hunks"])
+    added = sum(new_end - new_start for _, _, new_start, new_end in result["hunks"])
+    print(f"Diff: {len(result['hunks'])} hunks, {added} additions, {removed} removals")
+    report("diff_lines", timed(lambda: diff_lines(old, new), args.repeat))
+    if args.difflib:
+        report("difflib.unified_diff", timed(lambda: list(difflib.unified_diff(old, new, n=3)), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_debugger.config import Config
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_analyzer import analyze_code_with_llm
+from ai_debugger.llm_backends import StubBackend, create_backend
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<24} mean {statistics.mean(samples):8.2f} ms   "
+          f"p50 {statistics.median(samples):8.2f} ms   max {max(samples):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM-backed debugger code paths")
+    parser.add_argument("file_path", nargs="?",
+                        default=os.path.join(os.path.dirname(__file__), "..", "tests", "test_files", "valid_script.py"))
+    parser.add_argument("--backend", default="stub", help="LLM backend (default: stub)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--tokens-per-second", type=float, default=0)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=0)
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        backend = StubBackend(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second,
+                              prefill_tokens_per_second=args.prefill_tokens_per_second)
+    else:
+        backend = create_backend(Config(), name=args.backend)
+
+    debugger = Debugger(llm_backend=backend)
+    with open(args.file_path, "r", encoding="utf-8") as f:
+        code = f.read()
+
+    print(f"Backend: {backend.name}, file: {args.file_path}, repeat: {args.repeat}")
+    report("analyze (LLM pass)", timed(lambda: analyze_code_with_llm(
+        code, model_name=debugger.llm_model, max_length=debugger.max_length, backend=backend), args.repeat))
+    report("suggest_fix_for_line", timed(lambda: debugger.suggest_fix_for_line(args.file_path, 0), args.repeat))
+    report("explain_code", timed(lambda: debugger.explain_code(code), args.repeat))
+
+    if isinstance(backend, StubBackend):
+        print(f"\nStub totals: {backend.calls} calls, {backend.prompt_tokens} prompt tokens "
+              f"({backend.prefill_tokens} prefilled after prefix-cache reuse), "
+              f"{backend.generated_tokens} generated tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,32 @@ from pathlib import Path
 from ai_debugger.config import Config
 from ai_debugger.syntax_checker import SyntaxChecker
 from ai_debugger.runtime_err_checker import detect_runtime_error
-from ai_debugger.utils import format_code, analyze_complexity
-from ai_debugger.static_analyzer import StaticAnalyzer
+from ai_debugger.utils import analyze_complexity_files, create_tool_cache, format_files, python_files
+from ai_debugger.complexity_estimator import estimate_complexity
+from ai_debugger.static_analyzer import StaticAnalyzer, configured_checkers
 from ai_debugger.debugger import Debugger
 from ai_debugger.llm_analyzer import analyze_code_with_llm
+from ai_debugger.llm_backends import BACKENDS, DEFAULT_SERVER_SOCKET, create_backend
+from ai_debugger.model_server import ModelServer
 from ai_debugger.pylint_analyzer import analyze_code_with_pylint
 
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Everything after "--" belongs to the profiled script, so profile's own flags can come anywhere before it.
+    script_args = []
+    if "--" in argv and "profile" in argv[:argv.index("--")]:
+        split = argv.index("--")
+        argv, script_args = argv[:split], argv[split + 1:]
+
     parser = argparse.ArgumentParser(description="AI-powered Python code debugger.")
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
     check_parser = subparsers.add_parser('check', help='Basic syntax and runtime check')
-    check_parser.add_argument("file_path", type=str, help="Path to the Python script file")
-    check_parser.add_argument("--format", action="store_true", help="Format the code")
+    check_parser.add_argument("file_paths", type=str, nargs="+",
+                              help="Python files or directories (the runtime check only runs for a single file)")
+    check_parser.add_argument("--format", action="store_true", help="Show the black formatting diff")
+    check_parser.add_argument("--write", action="store_true", help="With --format, rewrite the files in place")
     check_parser.add_argument("--complexity", action="store_true", help="Analyze code complexity")
     check_parser.add_argument("--static", action="store_true", help="Perform static analysis")
 
@@ -35,11 +47,24 @@ def main():
                                 help='Name of the model to use (default: microsoft/CodeGPT-small-py)')
     analyze_parser.add_argument('--max-length', type=int, default=150,
                                 help='Maximum length of generated text for LLM analysis (default: 150)')
+    analyze_parser.add_argument('--backend', type=str, choices=list(BACKENDS),
+                                help='LLM backend to use (default: llm.backend from config)')
 
     diff_parser = subparsers.add_parser('diff', help='Analyze changes between two Python files')
     diff_parser.add_argument('old_file', type=str, help='Path to the original Python file')
     diff_parser.add_argument('new_file', type=str, help='Path to the updated Python file')
     diff_parser.add_argument('--json', action='store_true', help='Output in JSON format')
+    diff_parser.add_argument('--structural', action='store_true',
+                             help='Also compare functions and classes by their normalized AST')
+
+    profile_parser = subparsers.add_parser('profile', help='Run a Python file and report its hot lines and functions',
+                                           usage='%(prog)s [options] file_path [-- script_args ...]')
+    profile_parser.add_argument('file_path', type=str, help='Path to the Python file to profile')
+    profile_parser.add_argument('--top', type=int, help='Number of hot lines to show (default: profiling.top)')
+    profile_parser.add_argument('--no-llm', action='store_true', help='Skip LLM optimization suggestions')
+    profile_parser.add_argument('--memory', action='store_true',
+                                help='Profile memory (allocation sites, peak RSS, growth in loops) instead of time')
+    profile_parser.add_argument('--json', action='store_true', help='Output in JSON format')
 
     llm_parser = subparsers.add_parser('llm', help='Analyze code with language model only')
     llm_parser.add_argument('file_path', type=str, help='Path to the Python file to analyze')
@@ -48,13 +73,30 @@ def main():
                             help='Name of the model to use (default: microsoft/CodeGPT-small-py)')
     llm_parser.add_argument('--max-length', type=int, default=150,
                             help='Maximum length of generated text (default: 150)')
+    llm_parser.add_argument('--backend', type=str, choices=list(BACKENDS),
+                            help='LLM backend to use (default: llm.backend from config)')
+
+    serve_parser = subparsers.add_parser('serve-model',
+                                         help='Run a shared local model server on a Unix socket')
+    serve_parser.add_argument('--socket', type=str, help='Socket path (default: llm.server.socket from config)')
+    serve_parser.add_argument('--max-batch-size', type=int, help='Maximum requests per generation batch')
+    serve_parser.add_argument('--batch-window-ms', type=float, help='How long to wait for more requests to batch')
+    serve_parser.add_argument('--preload', type=str, action='append', default=None,
+                              help='Model to load at startup (repeatable)')
+    serve_parser.add_argument('--backend', type=str, choices=['transformers', 'stub'], default='transformers',
+                              help='Backend that serves the requests (default: transformers)')
+    serve_parser.add_argument('--cpu', action='store_true',
+                              help='Use the CPU inference profile (int8 quantization, tuned thread counts)')
+    serve_parser.add_argument('--onnx', action='store_true', help='Serve models through ONNX Runtime (implies --cpu)')
+    serve_parser.add_argument('--threads', type=int, help='Intra-op threads per model (default: cores / llm.cpu.workers)')
 
     parser.add_argument("--log", type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
                         help="Set the logging level")
     parser.add_argument("--log-file", type=str,
                         help="Path to the log file (e.g., ai_debugger.log)")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    args.script_args = script_args
 
     config = Config()
     if args.log:
@@ -68,46 +110,89 @@ def main():
     logging.debug("CLI started with arguments: %s", vars(args))
 
     if args.command in ['analyze', 'llm'] and hasattr(args, 'model'):
-        debugger = Debugger(llm_model=args.model, max_length=args.max_length)
+        backend = create_backend(config, name=args.backend) if args.backend else None
+        debugger = Debugger(llm_model=args.model, max_length=args.max_length, llm_backend=backend)
     else:
         debugger = Debugger()
 
     if args.command == 'check':
-        if args.format:
-            formatted_output = format_code(args.file_path)
-            print(formatted_output)
-
-        if args.complexity:
-            complexity_output = analyze_complexity(args.file_path)
-            print(complexity_output)
+        file_paths = python_files(args.file_paths)
+        tool_cache = create_tool_cache(config)
+        show_names = len(file_paths) > 1
 
-        if args.static:
+        if args.format:
             try:
-                with open(args.file_path, "r", encoding="utf-8") as file:
-                    code = file.read()
-                static_issues = StaticAnalyzer.analyze_code(code)
-                if static_issues:
-                    for issue in static_issues:
-                        line_info = f"at line {issue.get('line', 'unknown')}" if 'line' in issue else ""
-                        print(f"{issue['issue']}: {issue['message']} {line_info}")
+                results = format_files(file_paths, write=args.write, cache=tool_cache,
+                                       line_length=config.get("tools.black.line_length", 88))
+            except ImportError as e:
+                print(f"Error formatting code: {e}")
+                results = []
+            for result in results:
+                if "error" in result:
+                    print(f"{result['file']}: cannot format: {result['error']}")
+                elif not result["changed"]:
+                    print(f"{result['file']}: already formatted")
+                elif args.write:
+                    print(f"{result['file']}: reformatted")
                 else:
-                    print("No static issues found.")
-            except Exception as e:
-                print(f"Error analyzing file: {e}")
-
-        error = SyntaxChecker.analyze_file(args.file_path)
-        if error:
-            print(f"Syntax Error: {error['message']} at line {error.get('line', '?')}")
-            if 'fix_suggestion' in error:
-                print(f"Suggestion: {error['fix_suggestion']}")
-        else:
-            runtime_error = detect_runtime_error(args.file_path)
-            if runtime_error:
-                print(f"Runtime Error: {runtime_error['message']}")
-                if 'fix_suggestion' in runtime_error:
-                    print(f"Suggestion: {runtime_error['fix_suggestion']}")
+                    print(result["diff"], end="")
+
+        if args.complexity:
+            for result in analyze_complexity_files(file_paths, cache=tool_cache):
+                if show_names:
+                    print(f"\n{result['file']}:")
+                if "error" in result:
+                    print(f"Error analyzing complexity: {result['error']}")
+                    continue
+                with open(result["file"], "r", encoding="utf-8") as file:
+                    estimates = {estimate["line"]: estimate
+                                 for estimate in estimate_complexity(file.read(), config.get("static_analysis"))}
+                for block in result["blocks"]:
+                    estimate = estimates.get(block["line"])
+                    growth = f", {estimate['estimate']}" if estimate else ""
+                    print(f"{block['name']} (line {block['line']}): cyclomatic complexity {block['complexity']} "
+                          f"({block['rank']}){growth}")
+                    for driver in estimate["drivers"] if estimate else []:
+                        print(f"    line {driver['line']}: {driver['reason']} -> {driver['estimate']}")
+                if not result["blocks"]:
+                    print("No functions found.")
+
+        for file_path in file_paths:
+            if show_names:
+                print(f"\n{file_path}:")
+
+            if args.static:
+                try:
+                    with open(file_path, "r", encoding="utf-8") as file:
+                        code = file.read()
+                    static_issues = StaticAnalyzer.analyze_code(code, configured_checkers(config.get("static_analysis")),
+                                                                config.get("static_analysis"))
+                    if static_issues:
+                        for issue in static_issues:
+                            line_info = f"at line {issue.get('line', 'unknown')}" if 'line' in issue else ""
+                            print(f"{issue['issue']}: {issue['message']} {line_info}")
+                    else:
+                        print("No static issues found.")
+                except Exception as e:
+                    print(f"Error analyzing file: {e}")
+
+            syntax_errors = SyntaxChecker.analyze_file_all(file_path)
+            if syntax_errors:
+                for error in syntax_errors:
+                    print(f"Syntax Error: {error['message']} at line {error.get('line', '?')}")
+                    if 'fix_suggestion' in error:
+                        print(f"Suggestion: {error['fix_suggestion']}")
+            elif show_names:
+                # Running every module of a tree as a script is not what a batch check is for.
+                print("No syntax errors found.")
             else:
-                print("No syntax or runtime errors found in the script.")
+                runtime_error = detect_runtime_error(file_path)
+                if runtime_error:
+                    print(f"Runtime Error: {runtime_error['message']}")
+                    if 'fix_suggestion' in runtime_error:
+                        print(f"Suggestion: {runtime_error['fix_suggestion']}")
+                else:
+                    print("No syntax or runtime errors found in the script.")
 
 
     elif args.command == 'analyze':
@@ -165,23 +250,82 @@ def main():
             sys.exit(1)
 
         print(f"Analyzing changes between {old_file} and {new_file}...")
-        changes = debugger.analyze_changes(old_file, new_file)
+        changes = debugger.analyze_changes(old_file, new_file, structural=args.structural)
 
         if args.json:
             print(json.dumps(changes, indent=2))
         else:
             added = len(changes["added_lines"])
             removed = len(changes["removed_lines"])
-            total = len(changes["changed_lines"])
 
-            print(f"\nChanges detected: {total} total ({added} additions, {removed} removals)")
+            print(f"\nChanges detected: {added + removed} total ({added} additions, {removed} removals)")
             print("\nModified lines:")
-            for line_num in sorted(changes["lines_info"].keys()):
-                info = changes["lines_info"][line_num]
-                change_type = info["change_type"]
-                content = info["content"]
-                marker = "+" if change_type == "addition" else "-"
-                print(f"{marker} Line {line_num}: {content}")
+            for hunk in changes["hunks"]:
+                for line_num in range(hunk["old_start"], hunk["old_start"] + hunk["old_count"]):
+                    print(f"- Old line {line_num}: {changes['removed_info'][line_num]['content']}")
+                for line_num in range(hunk["new_start"], hunk["new_start"] + hunk["new_count"]):
+                    print(f"+ Line {line_num}: {changes['lines_info'][line_num]['content']}")
+
+            structural = changes.get("structural")
+            if structural and "error" in structural:
+                print(f"\n{structural['error']}")
+            elif structural:
+                counts = ", ".join(f"{count} {status}" for status, count in sorted(structural["summary"].items()))
+                print(f"\nStructural changes: {counts or 'none'}")
+                for unit in structural["units"]:
+                    if unit["status"] == "unchanged":
+                        continue
+                    renamed = f" (was {unit['old_name']})" if unit["old_name"] else ""
+                    location = f"line {unit['line']}" if unit["line"] else f"old line {unit['old_line']}"
+                    print(f"  {unit['status']:<12} {unit['type']} {unit['name']}{renamed} at {location}")
+
+    elif args.command == 'profile':
+        file_path = args.file_path
+
+        if not Path(file_path).exists():
+            print(f"Error: File '{file_path}' not found", file=sys.stderr)
+            sys.exit(1)
+
+        if args.top:
+            debugger.config.set("profiling.top", args.top)
+        print(f"Profiling {'memory of ' if args.memory else ''}{file_path}...")
+        if args.memory:
+            profile = debugger.profile_memory(file_path, args=args.script_args)
+        else:
+            profile = debugger.profile_file(file_path, args=args.script_args, suggest=not args.no_llm)
+
+        if args.json:
+            print(json.dumps(profile, indent=2))
+        elif "error" in profile and "lines" not in profile:
+            print(f"Error: {profile['error']}", file=sys.stderr)
+            sys.exit(1)
+        elif args.memory:
+            if profile["error"]:
+                print(f"\nScript raised an exception (profile covers the run up to it):\n{profile['error']}")
+            print(f"\nPeak RSS: {profile['peak_rss_kb']} KB, peak traced allocations: {profile['peak_traced_kb']} KB "
+                  f"({len(profile['timeline'])} samples)")
+            print("\nTop allocation sites:")
+            for hotspot in profile["hotspots"]:
+                print(f"  line {hotspot['line']:>5}  max {hotspot['max_kb']:>10.1f} KB  "
+                      f"retained {hotspot['size_kb']:>10.1f} KB  {hotspot['content'].strip()}")
+            for finding in profile["findings"]:
+                if finding["issue"] == "Memory Growth":
+                    print(f"\n{finding['issue']} at line {finding['line']}: {finding['message']}")
+                    print(f"   Suggested fix: {finding['fix_suggestion']}")
+        else:
+            if profile["error"]:
+                print(f"\nScript raised an exception (profile covers the run up to it):\n{profile['error']}")
+            print(f"\nProfiled {profile['total_ms']:.1f} ms of line time ({profile['mode']} mode)")
+            print("\nHot lines:")
+            for hotspot in profile["hotspots"]:
+                print(f"  line {hotspot['line']:>5}  {hotspot['percent']:>6.2f}%  {hotspot['time_ms']:>10.3f} ms  "
+                      f"{hotspot['hits']:>9} hits  {hotspot['content'].strip()}")
+                if "suggestion" in hotspot:
+                    print(f"      Suggestion: {hotspot['suggestion']}")
+            print("\nFunctions:")
+            for function in profile["functions"][:debugger.config.get("profiling.top", 10)]:
+                print(f"  {function['function']} (line {function['line']}): {function['calls']} calls, "
+                      f"{function['time_ms']:.3f} ms ({function['percent']:.2f}%)")
 
     elif args.command == 'llm':
         file_path = args.file_path
@@ -195,7 +339,8 @@ def main():
             with open(file_path, "r", encoding="utf-8") as file:
                 code = file.read()
 
-            analysis = analyze_code_with_llm(code, model_name=args.model, max_length=args.max_length)
+            analysis = analyze_code_with_llm(code, model_name=args.model, max_length=args.max_length,
+                                             backend=debugger.llm_backend)
             print("\nLanguage Model Analysis:")
             print(analysis)
         except Exception as e:
@@ -204,6 +349,27 @@ def main():
             print("pip install transformers torch")
             sys.exit(1)
 
+    elif args.command == 'serve-model':
+        if args.cpu or args.onnx:
+            config.set("llm.cpu.enabled", True)
+        if args.onnx:
+            config.set("llm.cpu.onnx", True)
+        if args.threads:
+            config.set("llm.cpu.num_threads", args.threads)
+        server = ModelServer(
+            socket_path=args.socket or config.get("llm.server.socket", DEFAULT_SERVER_SOCKET),
+            backend=create_backend(config, name=args.backend, batching=False),
+            max_batch_size=args.max_batch_size or config.get("llm.server.max_batch_size", 8),
+            batch_window_ms=(args.batch_window_ms if args.batch_window_ms is not None
+                             else config.get("llm.server.batch_window_ms", 5)),
+            preload_models=args.preload if args.preload is not None else config.get("llm.server.preload", [])
+        )
+        print(f"Serving models on {server.socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Model server stopped")
+
     else:
         parser.print_help()
 
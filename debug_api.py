@@ -1,12 +1,158 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+import atexit
+import hashlib
+import logging
 import os
+import threading
+from ai_debugger.config import Config
 from ai_debugger.debugger import Debugger
+from ai_debugger.events import EventBroker
+from ai_debugger.llm_backends import create_backend
+from ai_debugger.llm_cache import create_cache
+from ai_debugger.model_router import create_router
+from ai_debugger.session_store import SessionStore, file_content_hash
+from ai_debugger.source_buffer import SourceBuffer
 
 app = Flask(__name__)
 CORS(app)
 
+config = Config()
 sessions = {}
+events = EventBroker()
+session_store = SessionStore(config.get("sessions.snapshot_dir"))
+# One backend for the whole process so concurrent sessions share loaded models and LLM batches.
+llm_backend = create_backend(config)
+llm_cache = create_cache(config)
+llm_router = create_router(config)
+_restore_lock = threading.Lock()
+_persist_lock = threading.Lock()
+_pending_persists = {}
+
+_STATUS_FIELDS = ("session_id", "file_path", "current_line", "context", "call_stack", "variables",
+                  "variables_total", "breakpoints")
+_STEP_FIELDS = ("current_line", "context", "call_stack", "variables", "variables_total")
+
+
+def _session_snapshot(session):
+    return {
+        "file_path": session["file_path"],
+        "content_hash": session["content_hash"],
+        "debugger": session["debugger"].snapshot(),
+        "analysis": session.get("analysis"),
+        "profile": session.get("profile"),
+        "memory_profile": session.get("memory_profile"),
+        "status_version": session.get("status_version", 0)
+    }
+
+
+def _mark_changed(session, fields=_STATUS_FIELDS):
+    # The version is what status ETags and ?since= deltas compare against, so polling never rebuilds the status.
+    with session["lock"]:
+        session["status_version"] = session.get("status_version", 0) + 1
+        field_versions = session.setdefault("status_field_versions", {})
+        for field in fields:
+            field_versions[field] = session["status_version"]
+
+
+def _close_source(code_lines):
+    if isinstance(code_lines, SourceBuffer):
+        code_lines.close()
+
+
+def _save_session(session_id):
+    session = sessions.get(session_id)
+    if session is not None:
+        session_store.save(session_id, _session_snapshot(session))
+
+
+def _cancel_persist(session_id):
+    with _persist_lock:
+        timer = _pending_persists.pop(session_id, None)
+    if timer is not None:
+        timer.cancel()
+
+
+def _flush_session(session_id):
+    with _persist_lock:
+        _pending_persists.pop(session_id, None)
+    _save_session(session_id)
+
+
+def _persist_session(session_id, immediate=False):
+    if not session_store.enabled:
+        return
+    if immediate:
+        _cancel_persist(session_id)
+        _save_session(session_id)
+        return
+
+    # Stepping changes the session many times a second; one snapshot per burst is enough to survive a restart.
+    with _persist_lock:
+        if session_id in _pending_persists:
+            return
+        timer = threading.Timer(config.get("sessions.persist_delay", 1.0), _flush_session, args=(session_id,))
+        timer.daemon = True
+        _pending_persists[session_id] = timer
+    timer.start()
+
+
+@atexit.register
+def _flush_pending_persists():
+    with _persist_lock:
+        pending = list(_pending_persists)
+    for session_id in pending:
+        _cancel_persist(session_id)
+        _save_session(session_id)
+
+
+def _ensure_session(session_id):
+    if session_id in sessions:
+        return True
+
+    with _restore_lock:
+        if session_id in sessions:
+            return True
+
+        snapshot = session_store.load(session_id)
+        if snapshot is None:
+            return False
+
+        file_path = snapshot["file_path"]
+        try:
+            code_lines = SourceBuffer(file_path)
+            content_hash = code_lines.sha256()
+        except OSError as e:
+            logging.error(f"Cannot restore session {session_id}: {e}")
+            return False
+
+        debugger = Debugger(llm_backend=llm_backend, llm_cache=llm_cache, llm_router=llm_router)
+        debugger.restore(snapshot["debugger"])
+
+        analysis = snapshot.get("analysis")
+        profile = snapshot.get("profile")
+        memory_profile = snapshot.get("memory_profile")
+        if content_hash != snapshot.get("content_hash"):
+            logging.warning(f"Source of session {session_id} changed since snapshot; dropping cached analysis")
+            analysis = None
+            profile = None
+            memory_profile = None
+
+        sessions[session_id] = {
+            "debugger": debugger,
+            "file_path": file_path,
+            "code_lines": code_lines,
+            "content_hash": content_hash,
+            "analysis": analysis,
+            "profile": profile,
+            "memory_profile": memory_profile,
+            "status_version": snapshot.get("status_version", 0),
+            "lock": threading.RLock()
+        }
+        # Field versions aren't snapshotted, so everything counts as changed for clients polling from before.
+        _mark_changed(sessions[session_id])
+        logging.info(f"Restored session {session_id} from snapshot")
+        return True
 
 
 @app.route('/api/debugger/create', methods=['POST'])
@@ -22,21 +168,25 @@ def create_session():
     import uuid
     session_id = str(uuid.uuid4())
 
-    debugger = Debugger()
+    debugger = Debugger(llm_backend=llm_backend, llm_cache=llm_cache, llm_router=llm_router)
     debugger.current_file = file_path
     debugger.current_line = 0
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            code_lines = f.readlines()
+        code_lines = SourceBuffer(file_path)
+        content_hash = code_lines.sha256()
     except Exception as e:
         return jsonify({"error": f"Failed to read file: {str(e)}"}), 500
 
     sessions[session_id] = {
         "debugger": debugger,
         "file_path": file_path,
-        "code_lines": code_lines
+        "code_lines": code_lines,
+        "content_hash": content_hash,
+        "lock": threading.RLock()
     }
+    _mark_changed(sessions[session_id])
+    _persist_session(session_id, immediate=True)
 
     return jsonify({
         "session_id": session_id,
@@ -46,12 +196,7 @@ def create_session():
     })
 
 
-@app.route('/api/debugger/<session_id>/status', methods=['GET'])
-def get_session_status(session_id):
-    if session_id not in sessions:
-        return jsonify({"error": "Session not found"}), 404
-
-    session = sessions[session_id]
+def _build_status(session_id, session):
     debugger = session["debugger"]
 
     current_line = debugger.current_line
@@ -59,6 +204,12 @@ def get_session_status(session_id):
     start_line = max(0, current_line - 2)
     end_line = min(len(code_lines), current_line + 3)
 
+    line_profiles = {}
+    for key, field in (("profile", "profile"), ("memory_profile", "memory")):
+        profile = session.get(key)
+        if profile and profile.get("content_hash") == session["content_hash"]:
+            line_profiles[field] = profile["lines"]
+
     context = []
     for i in range(start_line, end_line):
         if i < len(code_lines):
@@ -71,6 +222,9 @@ def get_session_status(session_id):
                 "is_current": is_current,
                 "has_breakpoint": has_breakpoint
             })
+            for field, lines in line_profiles.items():
+                if str(i + 1) in lines:
+                    context[-1][field] = lines[str(i + 1)]
 
     call_stack = []
     if debugger.call_stack:
@@ -84,22 +238,79 @@ def get_session_status(session_id):
 
     variables = {}
     if debugger.variables:
-        variables = debugger.variables
+        variables = debugger.variable_handles()
 
-    return jsonify({
+    return {
         "session_id": session_id,
         "file_path": session["file_path"],
         "current_line": current_line + 1,
         "context": context,
         "call_stack": call_stack,
         "variables": variables,
+        "variables_total": len(debugger.variables),
         "breakpoints": [bp + 1 for bp in debugger.breakpoints.get(session["file_path"], [])]
-    })
+    }
+
+
+def _status_response(session_id, session):
+    with session["lock"]:
+        version = session["status_version"]
+        etag = f"{session_id}-{version}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        status = _build_status(session_id, session)
+        field_versions = dict(session["status_field_versions"])
+
+    since = request.args.get('since', type=int)
+    if since is not None and since <= version:
+        payload = {field: value for field, value in status.items()
+                   if field_versions.get(field, 0) > since}
+        payload["session_id"] = session_id
+        payload["delta"] = True
+    else:
+        payload = status
+
+    payload["version"] = version
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
+
+@app.route('/api/debugger/<session_id>/status', methods=['GET'])
+def get_session_status(session_id):
+    if not _ensure_session(session_id):
+        return jsonify({"error": "Session not found"}), 404
+
+    return _status_response(session_id, sessions[session_id])
+
+
+@app.route('/api/debugger/<session_id>/variables/<path:ref>', methods=['GET'])
+def get_variable(session_id, ref):
+    if not _ensure_session(session_id):
+        return jsonify({"error": "Session not found"}), 404
+
+    debugger = sessions[session_id]["debugger"]
+
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+
+    handle = debugger.describe_variable(ref)
+    if handle is None:
+        return jsonify({"error": f"Variable '{ref}' not found"}), 404
+
+    page = debugger.variable_children(ref, offset, limit)
+    return jsonify(dict(handle, children=page))
 
 
 @app.route('/api/debugger/<session_id>/analyze', methods=['GET'])
 def analyze_session(session_id):
-    if session_id not in sessions:
+    if not _ensure_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
     session = sessions[session_id]
@@ -107,28 +318,68 @@ def analyze_session(session_id):
     file_path = session["file_path"]
 
     try:
+        current_hash = file_content_hash(file_path)
+        cached = session.get("analysis")
+        if cached and cached.get("content_hash") == current_hash and not request.args.get('refresh'):
+            return jsonify(cached["result"])
+
         analysis = debugger.analyze_file(file_path)
+        session["analysis"] = {"content_hash": current_hash, "result": analysis}
+        _persist_session(session_id)
+        events.publish(session_id, "analysis_complete", {
+            "kind": "analyze",
+            "error_count": len(analysis.get("errors", []))
+        })
         return jsonify(analysis)
     except Exception as e:
+        events.publish(session_id, "analysis_complete", {"kind": "analyze", "error": str(e)})
         return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
 
-@app.route('/api/debugger/<session_id>/command', methods=['POST'])
-def execute_command(session_id):
-    if session_id not in sessions:
+@app.route('/api/debugger/<session_id>/profile', methods=['GET'])
+def profile_session(session_id):
+    if not _ensure_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
-    data = request.json
-    if not data or 'command' not in data:
-        return jsonify({"error": "Missing command parameter"}), 400
-
-    command = data['command']
     session = sessions[session_id]
     debugger = session["debugger"]
     file_path = session["file_path"]
+
+    memory = request.args.get('mode') == 'memory'
+    try:
+        current_hash = file_content_hash(file_path)
+        if memory:
+            profile = debugger.profile_memory(file_path)
+            session_key, fields = "memory_profile", ("size_kb", "max_kb", "growth_kb", "is_growing")
+        else:
+            profile = debugger.profile_file(file_path, suggest=request.args.get('suggest', '1') != '0',
+                                            prefer_large=request.args.get("model") == "large")
+            session_key, fields = "profile", ("hits", "time_ms", "percent", "is_hot")
+        if "lines" in profile:
+            # Keyed by line number (as a string, so snapshots round-trip through JSON) for the status view.
+            session[session_key] = {
+                "content_hash": current_hash,
+                "lines": {str(line["line"]): {key: line[key] for key in fields} for line in profile["lines"]}
+            }
+            _mark_changed(session, ("context",))
+            _persist_session(session_id)
+        events.publish(session_id, "analysis_complete", {
+            "kind": "memory_profile" if memory else "profile",
+            "hotspot_count": len(profile.get("hotspots", []))
+        })
+        return jsonify(profile)
+    except Exception as e:
+        events.publish(session_id, "analysis_complete", {"kind": "profile", "error": str(e)})
+        return jsonify({"error": f"Profiling failed: {str(e)}"}), 500
+
+
+def _run_command(session, command):
+    debugger = session["debugger"]
+    file_path = session["file_path"]
     code_lines = session["code_lines"]
 
     result = {"success": True, "message": ""}
+    changed = _STEP_FIELDS
 
     try:
         if command == 'step_over' or command == 'n':
@@ -154,6 +405,7 @@ def execute_command(session_id):
                 result["message"] = "Cannot step out - not inside a function call"
 
         elif command.startswith('set_breakpoint '):
+            changed = ("context", "breakpoints")
             try:
                 line_num = int(command.split()[1]) - 1
                 if 0 <= line_num < len(code_lines):
@@ -182,14 +434,12 @@ def execute_command(session_id):
                 result["message"] = "No breakpoint ahead, continued to end"
 
         elif command.startswith('inspect '):
+            changed = ()
             var_name = command.split(maxsplit=1)[1].strip()
-            value = debugger.inspect_variable(var_name)
-            if value is not None:
-                result["message"] = f"{var_name} = {value}"
-                result["variable"] = {
-                    "name": var_name,
-                    "value": value
-                }
+            handle = debugger.describe_variable(var_name)
+            if handle is not None:
+                result["message"] = f"{var_name} = {handle['repr']}"
+                result["variable"] = dict(handle, name=var_name)
             else:
                 result["message"] = f"Variable '{var_name}' not found"
                 result["success"] = False
@@ -202,21 +452,113 @@ def execute_command(session_id):
         result["success"] = False
         result["message"] = f"Error executing command: {str(e)}"
 
+    # A failed step may still have moved the debugger part of the way, so only known no-ops skip the bump.
+    if changed and (result["success"] or result["message"].startswith("Error executing command")):
+        _mark_changed(session, changed)
+    return result
+
+
+def _publish_command(session_id, session, command, result):
+    if not events.subscriber_count(session_id):
+        return
+
+    debugger = session["debugger"]
+    current_line = debugger.current_line
+    events.publish(session_id, "step", {
+        "command": command,
+        "result": result,
+        "current_line": current_line + 1,
+        "call_depth": len(debugger.call_stack)
+    })
+
+    if current_line in debugger.breakpoints.get(session["file_path"], []):
+        events.publish(session_id, "breakpoint", {"line": current_line + 1})
+
+
+@app.route('/api/debugger/<session_id>/command', methods=['POST'])
+def execute_command(session_id):
+    if not _ensure_session(session_id):
+        return jsonify({"error": "Session not found"}), 404
+
+    data = request.json
+    if not data or 'command' not in data:
+        return jsonify({"error": "Missing command parameter"}), 400
+
+    session = sessions[session_id]
+    with session["lock"]:
+        result = _run_command(session, data['command'])
+    _publish_command(session_id, session, data['command'], result)
+    _persist_session(session_id)
     return jsonify(result)
 
 
+@app.route('/api/debugger/<session_id>/batch', methods=['POST'])
+def execute_batch(session_id):
+    if not _ensure_session(session_id):
+        return jsonify({"error": "Session not found"}), 404
+
+    data = request.json
+    if not data or not isinstance(data.get('commands'), list):
+        return jsonify({"error": "Missing commands list"}), 400
+
+    session = sessions[session_id]
+    stop_on_error = data.get('stop_on_error', False)
+
+    results = []
+    with session["lock"]:
+        for command in data['commands']:
+            if not isinstance(command, str):
+                results.append({"success": False, "message": "Command must be a string"})
+            else:
+                results.append(_run_command(session, command))
+                _publish_command(session_id, session, command, results[-1])
+            if stop_on_error and not results[-1]["success"]:
+                break
+        status = _build_status(session_id, session)
+        status["version"] = session["status_version"]
+
+    _persist_session(session_id)
+    return jsonify({
+        "success": all(result["success"] for result in results),
+        "results": results,
+        "status": status
+    })
+
+
 @app.route('/api/debugger/<session_id>', methods=['DELETE'])
 def delete_session(session_id):
-    if session_id not in sessions:
+    if not _ensure_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
-    del sessions[session_id]
+    _cancel_persist(session_id)
+    _close_source(sessions.pop(session_id)["code_lines"])
+    session_store.delete(session_id)
+    events.close(session_id)
     return jsonify({"success": True, "message": "Session deleted"})
 
 
+@app.route('/api/debugger/<session_id>/events', methods=['GET'])
+def session_events(session_id):
+    if not _ensure_session(session_id):
+        return jsonify({"error": "Session not found"}), 404
+
+    response = Response(stream_with_context(events.stream(session_id)), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "ok", "active_sessions": len(sessions)})
+    health = {"status": "ok", "active_sessions": len(sessions), "llm_backend": llm_backend.name}
+    health["llm_cache"] = llm_cache.stats()
+    health["llm_routing"] = llm_router.stats()
+    if hasattr(llm_backend, "stats"):
+        health["llm_batching"] = llm_backend.stats()
+    prefix_cache = getattr(getattr(llm_backend, "backend", llm_backend), "prefix_cache", None)
+    if prefix_cache is not None:
+        health["llm_prefix_cache"] = prefix_cache.stats()
+    return jsonify(health)
 
 
 @app.route('/api/debugger/check_file', methods=['POST'])
@@ -241,7 +583,7 @@ def check_file():
             })
 
         try:
-            debugger = Debugger()
+            debugger = Debugger(llm_backend=llm_backend, llm_cache=llm_cache, llm_router=llm_router)
             analysis = debugger.analyze_file(file_path)
 
             if 'errors' in analysis and analysis['errors']:
@@ -260,7 +602,7 @@ def check_file():
 
 @app.route('/api/debugger/<session_id>/suggest_fix', methods=['GET'])
 def suggest_fix(session_id):
-    if session_id not in sessions:
+    if not _ensure_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
     session = sessions[session_id]
@@ -269,7 +611,12 @@ def suggest_fix(session_id):
     current_line = debugger.current_line
 
     try:
-        suggestions = debugger.suggest_fix_for_line(file_path, current_line)
+        suggestions = debugger.suggest_fix_for_line(file_path, current_line,
+                                                    prefer_large=request.args.get("model") == "large")
+        events.publish(session_id, "analysis_complete", {
+            "kind": "suggest_fix",
+            "line": current_line + 1
+        })
         return jsonify({
             "line": current_line + 1,
             "suggestions": suggestions
@@ -280,7 +627,7 @@ def suggest_fix(session_id):
 
 @app.route('/api/debugger/<session_id>/explain', methods=['POST'])
 def explain_code(session_id):
-    if session_id not in sessions:
+    if not _ensure_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
     data = request.json
@@ -288,19 +635,25 @@ def explain_code(session_id):
         return jsonify({"error": "Missing line range parameters"}), 400
 
     session = sessions[session_id]
-    code_lines = session["code_lines"]
 
     start_line = data.get('start_line', 1) - 1
     end_line = data.get('end_line', start_line + 1) - 1
 
-    if start_line < 0 or end_line >= len(code_lines) or start_line > end_line:
-        return jsonify({"error": "Invalid line range"}), 400
-
-    code_segment = ''.join(code_lines[start_line:end_line + 1])
+    with session["lock"]:
+        code_lines = session["code_lines"]
+        if start_line < 0 or end_line >= len(code_lines) or start_line > end_line:
+            return jsonify({"error": "Invalid line range"}), 400
+        code_segment = ''.join(code_lines[start_line:end_line + 1])
 
     debugger = session["debugger"]
     try:
-        explanation = debugger.explain_code(code_segment)
+        explanation = debugger.explain_code(code_segment, prefer_large=data.get("model") == "large",
+                                            file_path=session["file_path"])
+        events.publish(session_id, "analysis_complete", {
+            "kind": "explain",
+            "start_line": start_line + 1,
+            "end_line": end_line + 1
+        })
         return jsonify({
             "start_line": start_line + 1,
             "end_line": end_line + 1,
@@ -312,7 +665,7 @@ def explain_code(session_id):
 
 @app.route('/api/debugger/<session_id>/auto_fix', methods=['GET'])
 def auto_fix(session_id):
-    if session_id not in sessions:
+    if not _ensure_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
     session = sessions[session_id]
@@ -323,9 +676,21 @@ def auto_fix(session_id):
         fixed_code, changes = debugger.auto_fix_file(file_path)
 
         if fixed_code:
-            fixed_lines = fixed_code.split('\n')
-            session["code_lines"] = [line + '\n' for line in fixed_lines]
-
+            fixed_lines = [line + '\n' for line in fixed_code.split('\n')]
+            content_hash = hashlib.sha256("".join(fixed_lines).encode("utf-8")).hexdigest()
+            with session["lock"]:
+                old_lines = session["code_lines"]
+                session["code_lines"] = fixed_lines
+                session["content_hash"] = content_hash
+                _mark_changed(session, ("context",))
+            # Closed only after the swap: a status request still reading the old buffer holds the lock until done.
+            _close_source(old_lines)
+            _persist_session(session_id)
+
+        events.publish(session_id, "analysis_complete", {
+            "kind": "auto_fix",
+            "change_count": len(changes)
+        })
         return jsonify({
             "success": bool(fixed_code),
             "changes": changes
@@ -341,15 +706,27 @@ if __name__ == '__main__':
     parser.add_argument("--host", default="127.0.0.1", help="Host to run the server on")
     parser.add_argument("--port", type=int, default=5000, help="Port to run the server on")
     parser.add_argument("--debug", action="store_true", help="Run in debug mode")
+    parser.add_argument("--snapshot-dir", help="Directory for session snapshots (overrides sessions.snapshot_dir)")
+    parser.add_argument("--no-snapshots", action="store_true", help="Do not persist sessions across restarts")
 
     args = parser.parse_args()
 
+    if args.no_snapshots:
+        session_store = SessionStore(None)
+    elif args.snapshot_dir:
+        session_store = SessionStore(args.snapshot_dir)
+
     print(f"Starting AI Debugger API server on {args.host}:{args.port}")
     print("API Documentation:")
     print("- POST /api/debugger/create - Create a new debugging session")
-    print("- GET /api/debugger/<session_id>/status - Get current session status")
+    print("- GET /api/debugger/<session_id>/status - Get current session status (ETag, ?since=<version> for deltas)")
     print("- POST /api/debugger/<session_id>/command - Execute a debugging command")
+    print("- POST /api/debugger/<session_id>/batch - Execute a list of commands and return the final status")
+    print("- GET /api/debugger/<session_id>/variables/<ref> - Inspect a variable (?offset=&limit= for children)")
     print("- GET /api/debugger/<session_id>/analyze - Run analysis on the file")
+    print("- GET /api/debugger/<session_id>/profile - Profile the file and annotate hot lines in the status view "
+          "(?mode=memory for allocation sites and peak RSS)")
+    print("- GET /api/debugger/<session_id>/events - Server-sent event stream of step, breakpoint and analysis events")
     print("- DELETE /api/debugger/<session_id> - Delete a session")
 
-    app.run(host=args.host, port=args.port, debug=args.debug)
\ No newline at end of file
+    app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
\ No newline at end of file
@@ -2,6 +2,7 @@ import os
 import sys
 import argparse
 from ai_debugger.debugger import Debugger
+from ai_debugger.source_buffer import SourceBuffer
 
 
 def main():
@@ -30,9 +31,12 @@ def main():
     debugger.current_file = file_path
     debugger.current_line = 0
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        code_lines = f.readlines()
+    # Closed on every exit path, including Ctrl-C and EOF at the prompt.
+    with SourceBuffer(file_path) as code_lines:
+        _run_session(debugger, file_path, code_lines)
 
+
+def _run_session(debugger, file_path, code_lines):
     print(f"Loaded file: {file_path} ({len(code_lines)} lines)")
     print("\nDebugger Commands:")
     print("  n - Step over to next line")
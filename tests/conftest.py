@@ -0,0 +1,25 @@
+import os
+import shutil
+import tempfile
+
+from ai_debugger.config import DEFAULT_CONFIG
+
+# Keep the suite hermetic: LLM code paths run against the deterministic stub unless overridden.
+os.environ.setdefault("AI_DEBUGGER_LLM_BACKEND", "stub")
+
+_state_dir = None
+
+
+def pytest_configure(config):
+    global _state_dir
+    # Before test modules are imported, so module-level Config() objects (debug_api) never see ~/.ai_debugger.
+    _state_dir = tempfile.mkdtemp(prefix="ai_debugger_tests_")
+    DEFAULT_CONFIG["llm"]["cache"]["directory"] = os.path.join(_state_dir, "llm_cache")
+    DEFAULT_CONFIG["tools"]["cache"]["directory"] = os.path.join(_state_dir, "tool_cache")
+    DEFAULT_CONFIG["sessions"]["snapshot_dir"] = os.path.join(_state_dir, "sessions")
+    DEFAULT_CONFIG["llm"]["cpu"]["onnx_dir"] = os.path.join(_state_dir, "onnx")
+
+
+def pytest_unconfigure(config):
+    if _state_dir:
+        shutil.rmtree(_state_dir, ignore_errors=True)
@@ -0,0 +1,74 @@
+import re
+
+from ai_debugger.config import DEFAULT_CONFIG
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+
+
+def test_chunked_analysis_reports_absolute_lines():
+    backend = StubBackend(output_tokens=4)
+    debugger = Debugger(llm_backend=backend, llm_cache=LLMCache())
+    debugger.prompt_builder.budget = 40
+
+    code = "\n".join(f"def f{i}(x):\n    return x + {i}\n" for i in range(10))
+    findings = debugger._analyze_chunks("module.py", code)
+
+    assert len(findings) > 1
+    assert backend.calls == 1
+    assert findings[0]["line"] == 1
+    assert all(finding["issue"] == "LLM Analysis" for finding in findings)
+    assert [finding["line"] for finding in findings] == sorted(finding["line"] for finding in findings)
+
+
+def test_chunks_are_generated_in_bounded_batches(monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG["llm"]["batching"], "max_batch_size", 3)
+    backend = StubBackend(output_tokens=4)
+    debugger = Debugger(llm_backend=backend, llm_cache=LLMCache())
+    debugger.prompt_builder.budget = 40
+
+    code = "\n".join(f"def f{i}(x):\n    return x + {i}\n" for i in range(30))
+    findings = debugger._analyze_chunks("module.py", code)
+
+    assert len(findings) > 3
+    assert backend.calls == -(-len(findings) // 3)
+    assert not any(finding["message"].startswith("# module.py") for finding in findings)
+
+
+def test_chunk_line_maps_chunk_relative_references():
+    chunk = {"start_line": 40, "end_line": 60}
+    assert Debugger._chunk_line("problem on line 3", chunk) == 42
+    assert Debugger._chunk_line("problem on line 45", chunk) == 40
+    assert Debugger._chunk_line("no location", chunk) == 40
+
+
+class LineCitingBackend(StubBackend):
+    def generate_batch(self, prompts, model_name, max_length=150, **params):
+        # Cites the division the way a model would, using the line numbers in the prompt header.
+        self.calls += 1
+        completions = []
+        for prompt in prompts:
+            header, code = prompt.split("\n", 1)
+            first = int(re.search(r"lines (\d+)-", header).group(1))
+            lines = code.splitlines()
+            cited = [first + index for index, line in enumerate(lines) if "len(values)" in line]
+            completions.append(prompt + (f"\nZeroDivisionError on line {cited[0]}" if cited else "\nLooks fine"))
+        return completions
+
+
+def test_cached_chunk_findings_follow_a_moved_function():
+    backend = LineCitingBackend()
+    debugger = Debugger(llm_backend=backend, llm_cache=LLMCache())
+    debugger.prompt_builder.budget = 30
+    target = ("def mean(values):\n    total = 0\n    for value in values:\n        total += value\n"
+              "    return total / len(values)\n")
+    filler = "".join(f"\n\ndef f{i}(values):\n    total = {i}\n    for value in values:\n        total -= value\n"
+                     f"    return total\n" for i in range(4))
+
+    debugger._analyze_chunks("m.py", filler.lstrip("\n") + "\n\n" + target)
+    moved = target + filler
+    findings = debugger._analyze_chunks("m.py", moved)
+
+    assert backend.calls == 1
+    division = next(finding for finding in findings if "ZeroDivisionError" in finding["message"])
+    assert division["line"] == moved.splitlines().index("    return total / len(values)") + 1
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import cli
+import debug_cli
+from ai_debugger.source_buffer import SourceBuffer
+
+
+def test_profile_flags_before_script_args_go_to_profile(tmp_path, capsys):
+    script = tmp_path / "script.py"
+    script.write_text("import sys\nopen(sys.argv[1], 'w').write(' '.join(sys.argv[2:]))\n")
+    received = tmp_path / "argv.txt"
+
+    cli.main(["profile", str(script), "--no-llm", "--json", "--", str(received), "--json", "x"])
+
+    profile = json.loads(capsys.readouterr().out.split("...\n", 1)[1])
+    assert "lines" in profile
+    assert received.read_text() == "--json x"
+
+
+@pytest.mark.parametrize("command", ["q", EOFError])
+def test_debug_cli_closes_its_source_buffer(tmp_path, monkeypatch, command):
+    script = tmp_path / "script.py"
+    script.write_text("x = 1\n")
+    buffers = []
+    monkeypatch.setattr(debug_cli, "SourceBuffer", lambda path: buffers.append(SourceBuffer(path)) or buffers[-1])
+    monkeypatch.setattr("sys.argv", ["debug_cli.py", str(script)])
+
+    def read_command(prompt):
+        if command is EOFError:
+            raise EOFError
+        return command
+    monkeypatch.setattr("builtins.input", read_command)
+
+    if command is EOFError:
+        with pytest.raises(EOFError):
+            debug_cli.main()
+    else:
+        debug_cli.main()
+    assert len(buffers) == 1 and buffers[0]._file is None
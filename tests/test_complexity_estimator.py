@@ -0,0 +1,82 @@
+import os
+from ai_debugger.complexity_estimator import big_o, estimate_complexity
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.model_router import ModelRouter
+from ai_debugger.static_analyzer import StaticAnalyzer
+
+SAMPLE = """
+def pairs(items):
+    out = []
+    for a in items:
+        for b in items:
+            if a + b == 0:
+                out.append((a, b))
+    return out
+
+def sort_each(groups):
+    for group in groups:
+        sorted(group)
+
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+def constant(items):
+    for i in range(10):
+        print(i, len(items))
+
+def lookup(items, wanted: list):
+    return [x for x in items if x in wanted]
+"""
+
+
+def by_name(results):
+    return {result["function"]: result for result in results}
+
+
+def test_big_o_formatting():
+    assert big_o(0) == "O(1)"
+    assert big_o(1, log=True) == "O(n log n)"
+    assert big_o(3) == "O(n^3)"
+    assert big_o(1, exponential=True) == "O(2^n)"
+
+
+def test_estimates_per_function():
+    results = by_name(estimate_complexity(SAMPLE))
+
+    assert results["pairs"]["estimate"] == "O(n^2)"
+    assert [driver["line"] for driver in results["pairs"]["drivers"]] == [4, 5]
+    assert results["sort_each"]["estimate"] == "O(n^2 log n)"
+    assert results["fib"]["exponential"] and results["fib"]["recursive"]
+    assert results["constant"]["estimate"] == "O(1)"
+    assert results["lookup"]["estimate"] == "O(n^2)"
+    assert results["pairs"]["cyclomatic"] == 4
+
+
+def test_results_are_ranked_and_reported():
+    results = estimate_complexity(SAMPLE)
+    assert [result["function"] for result in results][:2] == ["fib", "sort_each"]
+    assert results[-1]["function"] == "constant"
+
+    issues = StaticAnalyzer.analyze_code(SAMPLE, ["scalability"])
+    assert [issue["line"] for issue in issues] == [2, 10, 14, 23]
+    assert all(issue["issue"] == "Scalability" and issue["category"] == "Performance" for issue in issues)
+    assert "lru_cache" in issues[2]["fix_suggestion"]
+    assert StaticAnalyzer.analyze_code(SAMPLE, ["scalability"], {"scalability_min_degree": 3}) == [issues[2]]
+
+
+def test_analyze_file_merges_estimates(tmp_path):
+    path = os.path.join(tmp_path, "sample.py")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(SAMPLE)
+    debugger = Debugger(llm_model="small", llm_backend=StubBackend(), llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+
+    result = debugger.analyze_file(path)
+
+    assert [estimate["function"] for estimate in result["complexity"]] == \
+        [estimate["function"] for estimate in estimate_complexity(SAMPLE)]
+    assert any(error["issue"] == "Scalability" for error in result["errors"])
@@ -1,7 +1,7 @@
 import tempfile
 import os
 import pytest
-from ai_debugger.config import Config
+from ai_debugger.config import Config, DEFAULT_CONFIG
 
 
 def test_default_config():
@@ -44,3 +44,32 @@ def test_set_and_save():
         assert new_config.get("new_option") == "value"
     finally:
         os.unlink(temp_path)
+
+
+def test_nested_user_config_is_merged_into_defaults():
+    with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp:
+        temp.write("""
+        llm:
+            generation:
+                explain:
+                    max_new_tokens: 32
+        """)
+        temp_path = temp.name
+
+    try:
+        config = Config(config_path=temp_path)
+        assert config.get("llm.generation.explain.max_new_tokens") == 32
+        assert config.get("llm.generation.suggest_fix.max_new_tokens") == 96
+        assert config.get("llm.backend") == "transformers"
+        assert DEFAULT_CONFIG["llm"]["generation"]["explain"] == {"max_new_tokens": 256}
+    finally:
+        os.unlink(temp_path)
+
+
+def test_set_does_not_touch_defaults():
+    config = Config()
+    config.set("llm.batching.enabled", True)
+    config.set("models.default", "other-model")
+
+    assert Config().get("models.default") == "microsoft/CodeGPT-small-py"
+    assert DEFAULT_CONFIG["llm"]["batching"]["enabled"] is False
@@ -0,0 +1,49 @@
+import pytest
+from ai_debugger import cpu_inference
+from ai_debugger.config import Config
+from ai_debugger.cpu_inference import CPUInferenceProfile, create_cpu_profile, quantize_dynamic_int8, thread_budget
+from ai_debugger.llm_backends import TransformersBackend, create_backend
+
+
+def test_thread_budget_splits_cores_between_workers():
+    assert thread_budget(workers=1, cpu_count=8) == (8, 1)
+    assert thread_budget(workers=4, cpu_count=8) == (2, 1)
+    assert thread_budget(workers=16, cpu_count=8) == (1, 1)
+    assert thread_budget(workers=4, cpu_count=8, num_threads=3, interop_threads=2) == (3, 2)
+
+
+def test_profile_from_config_and_worker_env(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    profile = create_cpu_profile(Config())
+    assert not profile.enabled
+    assert profile.quantize and not profile.onnx
+    assert profile.workers == 1
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    profile = create_cpu_profile(Config())
+    assert profile.workers == 2
+    assert profile.describe()["num_threads"] == thread_budget(2)[0]
+
+    backend = create_backend(Config(), name="transformers")
+    assert isinstance(backend, TransformersBackend)
+    assert backend.cpu_profile.workers == 2
+
+
+@pytest.fixture
+def torch(monkeypatch):
+    torch = pytest.importorskip("torch")
+    # Inter-op threads can only be set once per process, so the test leaves them alone.
+    monkeypatch.setattr(cpu_inference, "_interop_configured", True)
+    num_threads = torch.get_num_threads()
+    yield torch
+    torch.set_num_threads(num_threads)
+
+
+def test_dynamic_quantization_converts_linear_layers(torch):
+    model = torch.nn.Sequential(torch.nn.Linear(8, 8), torch.nn.ReLU(), torch.nn.Linear(8, 2))
+    quantized = quantize_dynamic_int8(model)
+
+    assert not any(type(module) is torch.nn.Linear for module in quantized.modules())
+    assert quantized(torch.randn(1, 8)).shape == (1, 2)
+    CPUInferenceProfile(enabled=True, num_threads=1).apply_threads()
+    assert torch.get_num_threads() == 1
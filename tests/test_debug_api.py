@@ -0,0 +1,159 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import debug_api
+from ai_debugger.session_store import SessionStore
+
+SCRIPT = "".join(f"value_{i} = {i}\n" for i in range(10))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(debug_api, "session_store", SessionStore())
+    monkeypatch.setattr(debug_api, "sessions", {})
+    return debug_api.app.test_client()
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.py"
+    path.write_text(SCRIPT)
+    return str(path)
+
+
+def create_session(client, script):
+    response = client.post("/api/debugger/create", json={"file_path": script})
+    assert response.status_code == 200
+    return response.get_json()["session_id"]
+
+
+def test_status_etag_returns_304_until_the_session_changes(client, script):
+    session_id = create_session(client, script)
+    url = f"/api/debugger/{session_id}/status"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/debugger/{session_id}/command", json={"command": "n"})
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_not_modified_polls_do_not_build_the_status(client, script, monkeypatch):
+    session_id = create_session(client, script)
+    url = f"/api/debugger/{session_id}/status"
+    etag = client.get(url).headers["ETag"]
+
+    def fail(*args):
+        raise AssertionError("status rebuilt for a 304")
+    monkeypatch.setattr(debug_api, "_build_status", fail)
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # Commands that don't change the session leave the ETag alone.
+    client.post(f"/api/debugger/{session_id}/command", json={"command": "bogus"})
+    client.post(f"/api/debugger/{session_id}/command", json={"command": "set_breakpoint 99"})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_status_since_returns_only_changed_fields(client, script):
+    session_id = create_session(client, script)
+    url = f"/api/debugger/{session_id}/status"
+    version = client.get(url).get_json()["version"]
+
+    client.post(f"/api/debugger/{session_id}/command", json={"command": "n"})
+    delta = client.get(f"{url}?since={version}").get_json()
+
+    assert delta["delta"] is True
+    assert delta["version"] == version + 1
+    assert delta["current_line"] == 2
+    assert "context" in delta
+    assert "file_path" not in delta and "breakpoints" not in delta
+
+    # A version from the future (e.g. after a server restart) gets the full status.
+    full = client.get(f"{url}?since={version + 10}").get_json()
+    assert "delta" not in full and full["file_path"] == script
+
+
+def test_batch_runs_commands_and_returns_status(client, script):
+    session_id = create_session(client, script)
+
+    response = client.post(f"/api/debugger/{session_id}/batch",
+                           json={"commands": ["n", "set_breakpoint 3", "n"]})
+    body = response.get_json()
+
+    assert body["success"] is True
+    assert [result["success"] for result in body["results"]] == [True, True, True]
+    assert body["status"]["current_line"] == 3
+    assert body["status"]["breakpoints"] == [3]
+
+
+def test_batch_reports_errors_mid_batch(client, script):
+    session_id = create_session(client, script)
+    url = f"/api/debugger/{session_id}/batch"
+
+    body = client.post(url, json={"commands": ["n", "bogus", 42, "n"]}).get_json()
+    assert body["success"] is False
+    assert [result["success"] for result in body["results"]] == [True, False, False, True]
+    assert body["results"][2]["message"] == "Command must be a string"
+    assert body["status"]["current_line"] == 3
+
+    stopped = client.post(url, json={"commands": ["n", "bogus", "n"], "stop_on_error": True}).get_json()
+    assert len(stopped["results"]) == 2
+    assert stopped["status"]["current_line"] == 4
+
+    assert client.post(url, json={"commands": "n"}).status_code == 400
+    assert client.post("/api/debugger/missing/batch", json={"commands": []}).status_code == 404
+
+
+def test_session_is_restored_lazily_from_its_snapshot(client, script, tmp_path, monkeypatch):
+    monkeypatch.setattr(debug_api, "session_store", SessionStore(str(tmp_path / "sessions")))
+    session_id = create_session(client, script)
+    client.post(f"/api/debugger/{session_id}/batch", json={"commands": ["n", "n", "set_breakpoint 7"]})
+    debug_api._flush_pending_persists()
+
+    # A restarted server starts with no sessions in memory.
+    debug_api.sessions.clear()
+    status = client.get(f"/api/debugger/{session_id}/status").get_json()
+
+    assert status["current_line"] == 3
+    assert status["breakpoints"] == [7]
+    assert session_id in debug_api.sessions
+    assert client.get("/api/debugger/missing/status").status_code == 404
+
+
+def test_steps_are_persisted_once_per_burst(client, script, tmp_path, monkeypatch):
+    store = SessionStore(str(tmp_path / "sessions"))
+    saves = []
+    monkeypatch.setattr(store, "save", lambda session_id, state: saves.append(state["debugger"]["current_line"]))
+    monkeypatch.setattr(debug_api, "session_store", store)
+    session_id = create_session(client, script)
+
+    for _ in range(3):
+        client.post(f"/api/debugger/{session_id}/command", json={"command": "n"})
+    assert saves == [0]
+
+    debug_api._flush_pending_persists()
+    assert saves == [0, 3]
+
+
+def test_auto_fix_swaps_in_the_fixed_text(client, script, monkeypatch):
+    session_id = create_session(client, script)
+    session = debug_api.sessions[session_id]
+    old_lines, old_hash = session["code_lines"], session["content_hash"]
+    fixed = SCRIPT.replace("value_0 = 0", "value_0 = 100")
+    monkeypatch.setattr(session["debugger"], "auto_fix_file", lambda path: (fixed, [{"line": 1}]))
+    session["profile"] = {"content_hash": old_hash, "lines": {"1": {"hits": 1}}}
+
+    assert client.get(f"/api/debugger/{session_id}/auto_fix").get_json()["success"] is True
+
+    assert session["content_hash"] != old_hash
+    assert old_lines._file is None
+    context = client.get(f"/api/debugger/{session_id}/status").get_json()["context"]
+    assert context[0]["content"] == "value_0 = 100"
+    # The profile describes the old text, so it no longer annotates the status view.
+    assert "profile" not in context[0]
@@ -0,0 +1,49 @@
+import random
+
+from ai_debugger.diff_engine import diff_lines
+
+
+def apply_hunks(old, new, hunks):
+    result, position = [], 0
+    for old_start, old_end, new_start, new_end in hunks:
+        result += old[position:old_start] + new[new_start:new_end]
+        position = old_end
+    return result + old[position:]
+
+
+def test_diff_lines_maps_old_and_new_positions():
+    old = ["a\n", "b\n", "c\n", "d\n"]
+    new = ["a\n", "c\n", "x\n", "d\n", "e\n"]
+
+    diff = diff_lines(old, new)
+
+    assert diff["old_to_new"].tolist() == [0, -1, 1, 3]
+    assert diff["new_to_old"].tolist() == [0, 2, -1, 3, -1]
+    assert diff["hunks"] == [(1, 2, 1, 1), (3, 3, 2, 3), (4, 4, 4, 5)]
+
+
+def test_diff_lines_is_exact_on_repetitive_input():
+    rng = random.Random(3)
+    for max_cost in (1024, 2):
+        for _ in range(200):
+            old = [str(rng.randint(0, 3)) for _ in range(rng.randint(0, 40))]
+            new = [str(rng.randint(0, 3)) for _ in range(rng.randint(0, 40))]
+
+            diff = diff_lines(old, new, max_cost=max_cost)
+
+            matched = [(i, j) for i, j in enumerate(diff["old_to_new"]) if j != -1]
+            assert all(old[i] == new[j] and diff["new_to_old"][j] == i for i, j in matched)
+            assert [j for _, j in matched] == sorted(j for _, j in matched)
+            assert apply_hunks(old, new, diff["hunks"]) == new
+
+
+def test_diff_lines_splits_large_tables_on_unique_runs():
+    rng = random.Random(0)
+    old = [f"({rng.randint(0, 3)}, {rng.randint(0, 3)}),\n" for _ in range(5000)]
+    new = list(old)
+    for position in range(100, 4900, 50):
+        new[position] = "(9, 9),\n"
+
+    diff = diff_lines(old, new, max_cost=16)
+
+    assert diff["hunks"] == [(position, position + 1, position, position + 1) for position in range(100, 4900, 50)]
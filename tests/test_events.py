@@ -0,0 +1,60 @@
+import itertools
+import json
+from ai_debugger.events import EventBroker, format_sse
+
+
+def test_publish_reaches_channel_subscribers_only():
+    broker = EventBroker()
+    first = broker.subscribe("session-1")
+    other = broker.subscribe("session-2")
+
+    assert broker.publish("session-1", "step", {"current_line": 3}) == 1
+    event = first.get_nowait()
+    assert event["type"] == "step"
+    assert event["data"] == {"current_line": 3}
+    assert other.empty()
+
+
+def test_full_queue_drops_oldest_event():
+    broker = EventBroker(max_queue_size=2)
+    subscriber = broker.subscribe("s")
+
+    for line in range(3):
+        broker.publish("s", "step", {"current_line": line})
+
+    assert [subscriber.get_nowait()["data"]["current_line"] for _ in range(2)] == [1, 2]
+
+
+def test_stream_formats_events_and_stops_on_close():
+    broker = EventBroker()
+    stream = broker.stream("s", heartbeat=0.01)
+
+    assert next(stream).startswith("retry:")
+    assert next(stream) == ": keep-alive\n\n"
+
+    broker.publish("s", "breakpoint", {"line": 7})
+    chunk = next(stream)
+    assert chunk.startswith("event: breakpoint\n")
+    assert json.loads(chunk.split("data: ", 1)[1])["data"] == {"line": 7}
+
+    broker.close("s")
+    assert list(stream) == []
+    assert broker.subscriber_count("s") == 0
+
+
+def test_close_ends_a_stream_whose_queue_is_full():
+    broker = EventBroker(max_queue_size=2)
+    stream = broker.stream("s", heartbeat=0.01)
+    assert next(stream).startswith("retry:")
+
+    for line in range(3):
+        broker.publish("s", "step", {"current_line": line})
+    broker.close("s")
+
+    # Without the sentinel the stream would keep yielding heartbeats.
+    assert [chunk.split("\n", 1)[0] for chunk in itertools.islice(stream, 5)] == ["event: step"]
+
+
+def test_format_sse():
+    text = format_sse({"type": "step", "data": None})
+    assert text == 'event: step\ndata: {"type": "step", "data": null}\n\n'
@@ -0,0 +1,77 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from ai_debugger.config import Config
+from ai_debugger.llm_analyzer import analyze_code_with_llm
+from ai_debugger.llm_backends import HTTPBackend, StubBackend, TransformersBackend, create_backend
+
+
+def test_stub_is_deterministic():
+    backend = StubBackend(output_tokens=8)
+    first = backend.generate("def f(): pass", "model-a", max_length=100)
+    assert first == backend.generate("def f(): pass", "model-a", max_length=100)
+    assert first != backend.generate("def f(): pass", "model-b", max_length=100)
+    assert first.startswith("def f(): pass\n")
+    assert len(first.split("\n", 1)[1].split()) == 8
+
+
+def test_stub_respects_max_length_and_counts_tokens():
+    backend = StubBackend(output_tokens=50)
+    text = backend.generate("one two three", "m", max_length=5)
+    assert len(text.split()) == 5
+    assert backend.calls == 1
+    assert backend.prompt_tokens == 3
+    assert backend.generated_tokens == 2
+
+
+def test_stub_latency_model():
+    backend = StubBackend(latency_ms=10, tokens_per_second=100, prefill_tokens_per_second=1000)
+    assert backend.simulated_latency(prompt_tokens=500, new_tokens=20) == pytest.approx(0.01 + 0.5 + 0.2)
+
+
+def test_create_backend_by_name():
+    config = Config()
+    assert isinstance(create_backend(config, name="stub"), StubBackend)
+    assert isinstance(create_backend(config, name="transformers"), TransformersBackend)
+    with pytest.raises(ValueError):
+        create_backend(config, name="http")
+    with pytest.raises(ValueError):
+        create_backend(config, name="unknown")
+
+
+def test_analyze_code_with_llm_uses_given_backend():
+    backend = StubBackend()
+    assert analyze_code_with_llm("x = 1", backend=backend) == backend.generate("x = 1", "microsoft/CodeGPT-small-py")
+
+
+def test_http_backend_roundtrip():
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            texts = [f"{body['model']}:{prompt}:{body['params']['max_length']}" for prompt in body["prompts"]]
+            payload = json.dumps({"texts": texts}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        backend = HTTPBackend(f"http://127.0.0.1:{server.server_port}", timeout=5)
+        assert backend.generate("x = 1", "m", max_length=42) == "m:x = 1:42"
+        assert backend.generate_batch(["a", "b"], "m") == ["m:a:150", "m:b:150"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_backend_unavailable_raises_runtime_error():
+    backend = HTTPBackend("unix:///nonexistent/ai_debugger.sock", timeout=1)
+    with pytest.raises(RuntimeError):
+        backend.generate("x = 1", "m")
@@ -0,0 +1,100 @@
+import os
+import tempfile
+from ai_debugger.config import DEFAULT_CONFIG
+from ai_debugger.debugger import Debugger
+from ai_debugger.model_router import ModelRouter
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache, normalize_code
+
+
+def test_cosmetic_edits_normalize_equal():
+    original = "def f(x):\n    return x + 1\n"
+    reformatted = "# helper\ndef f( x ):\n\n    return x+1   # add one\n"
+    assert normalize_code(original) == normalize_code(reformatted)
+    assert normalize_code(original) != normalize_code("def f(x):\n    return x + 2\n")
+
+
+def test_unparseable_code_falls_back_to_raw_text():
+    assert normalize_code("if x = 1\n    y()   \n\n") == normalize_code("if x = 1\n    y()\n")
+    assert normalize_code("if x = 1\n") != normalize_code("if x = 2\n")
+
+
+def test_lru_eviction_and_stats():
+    cache = LLMCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 2
+
+
+def test_disk_cache_survives_new_instance():
+    with tempfile.TemporaryDirectory() as directory:
+        key = LLMCache.make_key("m", {"max_length": 10}, "explain", "x = 1")
+        LLMCache(directory=directory).put(key, "cached")
+
+        cache = LLMCache(directory=directory)
+        assert cache.get(key) == "cached"
+        assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_directory_is_created_on_first_put(tmp_path):
+    directory = tmp_path / "llm_cache"
+    cache = LLMCache(directory=str(directory))
+    assert cache.get("a" * 64) is None
+    assert not directory.exists()
+
+    cache.put("a" * 64, "cached")
+    assert directory.exists()
+
+
+def test_disk_cache_prunes_least_recently_used_entries(tmp_path):
+    cache = LLMCache(directory=str(tmp_path), max_disk_entries=10)
+    keys = [f"{i:02d}" + "0" * 62 for i in range(10)]
+    for index, key in enumerate(keys):
+        cache.put(key, f"value {index}")
+        os.utime(cache._disk_path(key), ns=(index * 10 ** 9, index * 10 ** 9))
+    cache.clear()
+    assert cache.get(keys[0]) == "value 0"
+
+    cache.put("ff" + "0" * 62, "newest")
+    remaining = {os.path.basename(path)[:2] for path in cache._disk_files()}
+    assert len(remaining) == 9
+    assert {"00", "ff"} <= remaining
+    assert not {"01", "02"} & remaining
+
+
+def test_repeated_explain_skips_inference():
+    backend = StubBackend()
+    debugger = Debugger(llm_backend=backend, llm_cache=LLMCache())
+
+    first = debugger.explain_code("def f(x):\n    return x\n")
+    second = debugger.explain_code("def f(x):  # identity\n    return x\n")
+
+    assert first == second
+    assert backend.calls == 1
+    assert debugger.llm_cache.stats()["hits"] == 1
+
+
+def test_cached_suggestion_after_lines_shift_is_only_the_completion(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG["llm"], "prefix_cache", {"enabled": False})
+    backend = StubBackend()
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+    path = tmp_path / "script.py"
+    path.write_text("def f(x):\n    return x + 1\n")
+    first = debugger.suggest_fix_for_line(str(path), 1)
+
+    path.write_text("# helper\ndef f(x):\n    return x + 1\n")
+    second = debugger.suggest_fix_for_line(str(path), 2)
+
+    assert backend.calls == 1
+    assert debugger.llm_cache.stats()["hits"] == 1
+    assert second == first
+    assert not any("has an issue on line" in suggestion for suggestion in second)
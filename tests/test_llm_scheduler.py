@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from ai_debugger.config import Config
+from ai_debugger.llm_backends import LLMBackend, StubBackend, create_backend
+from ai_debugger.llm_scheduler import BatchScheduler
+
+
+class RecordingBackend(LLMBackend):
+    name = "recording"
+
+    def __init__(self):
+        self.batches = []
+
+    def generate_batch(self, prompts, model_name, max_length=150, **params):
+        self.batches.append((model_name, max_length, params, list(prompts)))
+        if any(prompt == "boom" for prompt in prompts):
+            raise RuntimeError("generation failed")
+        return [f"{model_name}:{prompt}" for prompt in prompts]
+
+
+def _concurrently(scheduler, calls):
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(scheduler.generate, *args, **kwargs) for args, kwargs in calls]
+        return [future.result() for future in futures]
+
+
+def test_concurrent_requests_share_a_batch():
+    backend = RecordingBackend()
+    scheduler = BatchScheduler(backend, max_batch_size=16, batch_window_ms=100)
+    try:
+        results = _concurrently(scheduler, [((f"p{i}", "m"), {}) for i in range(8)])
+    finally:
+        scheduler.close()
+
+    assert results == [f"m:p{i}" for i in range(8)]
+    assert len(backend.batches) < 8
+    assert scheduler.stats()["requests"] == 8
+
+
+def test_requests_grouped_by_model_and_params():
+    backend = RecordingBackend()
+    scheduler = BatchScheduler(backend, max_batch_size=16, batch_window_ms=100)
+    try:
+        _concurrently(scheduler, [
+            (("a", "m1"), {"max_length": 50}),
+            (("b", "m1"), {"max_length": 50}),
+            (("c", "m2"), {"max_length": 50}),
+            (("d", "m1"), {"max_length": 80}),
+        ])
+    finally:
+        scheduler.close()
+
+    groups = {("m1", 50): {"a", "b"}, ("m2", 50): {"c"}, ("m1", 80): {"d"}}
+    for model_name, max_length, params, prompts in backend.batches:
+        assert set(prompts) <= groups[(model_name, max_length)]
+
+
+def test_max_batch_size_is_respected():
+    backend = RecordingBackend()
+    scheduler = BatchScheduler(backend, max_batch_size=3, batch_window_ms=100)
+    try:
+        scheduler.generate_batch([f"p{i}" for i in range(7)], "m")
+    finally:
+        scheduler.close()
+
+    assert max(len(batch[3]) for batch in backend.batches) <= 3
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    scheduler = BatchScheduler(RecordingBackend(), batch_window_ms=0)
+    try:
+        with pytest.raises(RuntimeError):
+            scheduler.generate_batch(["ok", "boom"], "m")
+    finally:
+        scheduler.close()
+
+
+def test_create_backend_wraps_when_batching_enabled(monkeypatch):
+    # Config holds its own copy of the defaults, so patching it can't leak into other tests.
+    config = Config()
+    monkeypatch.setitem(config.config["llm"]["batching"], "enabled", True)
+
+    backend = create_backend(config, name="stub")
+    try:
+        assert isinstance(backend, BatchScheduler)
+        assert isinstance(backend.backend, StubBackend)
+        assert isinstance(create_backend(config, name="stub", batching=False), StubBackend)
+    finally:
+        backend.close()
@@ -0,0 +1,102 @@
+import logging
+
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.config import Config
+from ai_debugger.model_router import ModelRouter, create_router, output_confidence
+
+
+def _generator(outputs, calls):
+    def generate(model_name):
+        calls.append(model_name)
+        output = outputs[model_name]
+        if isinstance(output, Exception):
+            raise output
+        return "PROMPT" + output
+    return generate
+
+
+def test_confident_small_output_is_not_escalated():
+    calls = []
+    router = ModelRouter("small", "large")
+    response = router.route("explain", "PROMPT", _generator({"small": " x = compute(a, b)"}, calls))
+
+    assert response == "PROMPT x = compute(a, b)"
+    assert calls == ["small"]
+    assert router.stats()["escalations"] == 0
+
+
+def test_empty_and_repetitive_output_escalates():
+    assert output_confidence("the the the the the the the the") < 0.3
+
+    for small_output in ("", " the the the the the the the the"):
+        calls = []
+        router = ModelRouter("small", "large")
+        response = router.route("explain", "PROMPT", _generator({"small": small_output, "large": " fixed"}, calls))
+        assert response == "PROMPT fixed"
+        assert calls == ["small", "large"]
+
+
+def test_invalid_fix_escalates_and_user_can_request_large():
+    calls = []
+    router = ModelRouter("small", "large")
+    outputs = {"small": " if x = 1:", "large": " if x == 1:"}
+    validate = lambda completion: completion.strip() == "if x == 1:"
+
+    assert router.route("suggest_fix", "PROMPT", _generator(outputs, calls), validate) == "PROMPT if x == 1:"
+    assert router.route("explain", "PROMPT", _generator(outputs, calls), prefer_large=True) == "PROMPT if x == 1:"
+    assert calls == ["small", "large", "large"]
+
+    stats = router.stats()
+    assert [d["reason"] for d in stats["recent"]] == ["invalid_output", "user_request"]
+    assert stats["by_model"]["large"]["requests"] == 2
+    assert stats["by_model"]["large"]["mean_latency_ms"] >= 0
+
+
+def test_failed_escalation_keeps_small_output():
+    calls = []
+    router = ModelRouter("small", "large")
+    outputs = {"small": "", "large": RuntimeError("not a generative model")}
+
+    assert router.route("explain", "PROMPT", _generator(outputs, calls)) == "PROMPT"
+    decision = router.stats()["recent"][-1]
+    assert decision["model"] == "small"
+    assert decision["reason"] == "empty_output, escalation_failed"
+
+
+def test_debugger_routes_through_small_model_first():
+    backend = StubBackend()
+    router = ModelRouter("small", "large")
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(), llm_router=router)
+
+    debugger.explain_code("def f(x):\n    return x + 1\n")
+    debugger.explain_code("def g(y):\n    return y * 2\n", prefer_large=True)
+
+    assert [d["model"] for d in router.stats()["recent"]] == ["small", "large"]
+
+
+def test_routing_is_off_by_default():
+    router = create_router(Config(), small_model="small")
+
+    assert not router.enabled
+    calls = []
+    router.route("analyze", "PROMPT", _generator({"small": ""}, calls))
+    assert calls == ["small"]
+
+
+def test_large_request_without_routing_shares_the_small_cache_entry(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(logging, "warning", warnings.append)
+    backend = StubBackend()
+    cache = LLMCache()
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=cache,
+                        llm_router=ModelRouter("small", "large", enabled=False))
+
+    code = "def f(x):\n    return x + 1\n"
+    first = debugger.explain_code(code)
+    assert debugger.explain_code(code, prefer_large=True) == first
+
+    assert backend.calls == 1
+    assert cache.stats()["entries"] == 1
+    assert any("routing is disabled" in warning for warning in warnings)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from ai_debugger.llm_backends import HTTPBackend, StubBackend
+from ai_debugger.model_server import ModelServer
+
+
+@pytest.fixture
+def model_server():
+    directory = tempfile.mkdtemp()
+    stub = StubBackend(latency_ms=20)
+    server = ModelServer(os.path.join(directory, "llm.sock"), backend=stub, max_batch_size=8, batch_window_ms=50)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 5
+    while not os.path.exists(server.socket_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    yield server, stub
+
+    server.shutdown()
+    thread.join(timeout=5)
+    os.rmdir(directory)
+
+
+def test_requests_over_unix_socket_match_direct_generation(model_server):
+    server, stub = model_server
+    client = HTTPBackend(f"unix://{server.socket_path}", timeout=5)
+
+    assert client.generate("x = 1", "m", max_length=40) == StubBackend().generate("x = 1", "m", max_length=40)
+
+
+def test_concurrent_clients_are_micro_batched(model_server):
+    server, stub = model_server
+    client = HTTPBackend(f"unix://{server.socket_path}", timeout=5)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda i: client.generate(f"prompt {i}", "m"), range(6)))
+
+    assert results == [StubBackend().generate(f"prompt {i}", "m") for i in range(6)]
+    stats = server.status()["scheduler"]
+    assert stats["requests"] == 6
+    assert stats["batches"] < 6
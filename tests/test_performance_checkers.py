@@ -0,0 +1,73 @@
+from ai_debugger.debugger import Debugger
+from ai_debugger.static_analyzer import StaticAnalyzer
+
+CODE = '''import math
+import re
+
+def slow(records, names):
+    seen = []
+    out = ""
+    squares = []
+    for record in records:
+        if record not in seen:
+            seen.append(record)
+        out += str(record)
+        if re.match(r"\\d+", record):
+            out += "!"
+        for other in records:
+            squares.append(math.sqrt(len(other)))
+    return out, squares
+
+def fast(records):
+    result = []
+    for record in re.findall(r"\\w+", records):
+        result.append(record.upper())
+    return result
+'''
+
+
+def _found(code=CODE, checkers=("performance",)):
+    return [(issue["line"], issue["issue"]) for issue in StaticAnalyzer.analyze_code(code, list(checkers))]
+
+
+def test_performance_checkers_flag_quadratic_patterns():
+    found = _found()
+    assert (9, "Quadratic Membership Test") in found
+    assert (11, "String Concatenation In Loop") in found
+    assert (12, "Regex Compiled In Loop") in found
+    assert (15, "Global Lookup In Loop") in found
+    assert (12, "Global Lookup In Loop") not in found
+    assert (14, "Nested Loop Over Same Iterable") in found
+    assert (20, "Append In Loop") in found
+
+
+def test_loop_iterables_are_not_hot():
+    found = _found()
+    # re.findall in the for statement's iterable runs once.
+    assert (20, "Regex Compiled In Loop") not in found
+    assert all(line != 21 or issue == "Append In Loop" for line, issue in found)
+
+
+def test_fix_suggestions_are_concrete():
+    issues = {issue["issue"]: issue for issue in StaticAnalyzer.analyze_code(CODE, ["performance"])}
+    assert issues["Append In Loop"]["fix_suggestion"].startswith(
+        "result = [record.upper() for record in re.findall('\\\\w+', records)]")
+    assert "seen_set = set(seen)" in issues["Quadratic Membership Test"]["fix_suggestion"]
+    assert "sqrt = math.sqrt" in issues["Global Lookup In Loop"]["fix_suggestion"]
+    assert all(issue["category"] == "Performance" for issue in issues.values())
+
+
+def test_family_can_be_enabled_per_checker():
+    assert {issue for _, issue in _found(checkers=["perf_append"])} == {"Append In Loop"}
+
+
+def test_performance_findings_are_prioritized_and_reported():
+    errors = StaticAnalyzer.analyze_code(CODE, ["performance", "naming"]) + [
+        {"issue": "LLM Analysis", "message": "..."}, {"issue": "Syntax Error", "message": "...", "line": 1}]
+    prioritized = Debugger._prioritize_errors(None, errors)
+
+    assert prioritized[0]["issue"] == "Syntax Error"
+    assert prioritized[-1]["issue"] == "LLM Analysis"
+    report = Debugger()._generate_report("slow.py", {"errors": prioritized})
+    assert "Category: Performance" in report
+    assert "seen_set = set(seen)" in report
@@ -0,0 +1,58 @@
+import os
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import PrefixCache, StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.model_router import ModelRouter
+
+VALID_SCRIPT = os.path.join(os.path.dirname(__file__), "test_files", "valid_script.py")
+
+
+def test_prefix_cache_lru_and_stats():
+    cache = PrefixCache(max_entries=1)
+    first, second = PrefixCache.make_key("m", "a"), PrefixCache.make_key("m", "b")
+    cache.put(first, 1)
+    assert cache.get(first) == 1
+    cache.put(second, 2)
+
+    assert cache.get(first) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1, "max_entries": 1}
+
+
+def test_stub_only_prefills_the_suffix_after_a_prefix_hit():
+    backend = StubBackend()
+    prefix = "shared file context here\n\n"
+    backend.generate(prefix + "question one", "m", prefix=prefix)
+    backend.generate(prefix + "question two", "m", prefix=prefix)
+
+    assert backend.prompt_tokens == 12
+    assert backend.prefill_tokens == 12 - 4
+    assert backend.prefix_cache.stats()["hits"] == 1
+
+
+def test_line_requests_on_one_file_share_a_prefix():
+    backend = StubBackend()
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+
+    debugger.suggest_fix_for_line(VALID_SCRIPT, 0)
+    debugger.suggest_fix_for_line(VALID_SCRIPT, 3)
+    debugger.explain_code("return a + b", file_path=VALID_SCRIPT)
+
+    assert backend.calls == 3
+    assert backend.prefix_cache.stats()["hits"] == 2
+    assert backend.prefill_tokens < backend.prompt_tokens
+
+
+def test_comment_edit_keeps_prefixed_requests_cached(tmp_path):
+    backend = StubBackend()
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+    path = tmp_path / "script.py"
+    path.write_text("def f(x):\n    return x + 1\n")
+    debugger.suggest_fix_for_line(str(path), 1)
+
+    path.write_text("# helper\ndef f(x):\n    return x + 1\n\n\n# end\n")
+    debugger.suggest_fix_for_line(str(path), 2)
+
+    assert backend.calls == 1
+    assert debugger.llm_cache.stats()["hits"] == 1
@@ -0,0 +1,95 @@
+import os
+from ai_debugger.config import DEFAULT_CONFIG
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.model_router import ModelRouter
+from ai_debugger.profiler import profile_memory, profile_script
+
+SCRIPT = """import sys
+
+def square(x):
+    return x * x
+
+def busy(n):
+    total = 0
+    for i in range(n):
+        total += square(i)
+    return total
+
+print(busy(int(sys.argv[1])))
+"""
+
+
+def write_script(tmp_path, source=SCRIPT):
+    path = os.path.join(tmp_path, "target.py")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(source)
+    return path
+
+
+def test_profile_counts_lines_and_calls(tmp_path):
+    profile = profile_script(write_script(tmp_path), args=["2000"])
+
+    assert profile["returncode"] == 0 and profile["error"] is None
+    assert profile["stdout"].strip() == str(sum(i * i for i in range(2000)))
+    lines = {line["line"]: line for line in profile["lines"]}
+    assert lines[9]["hits"] == 2000 and lines[4]["hits"] == 2000
+    functions = {function["function"]: function for function in profile["functions"]}
+    assert functions["square"]["calls"] == 2000 and functions["busy"]["calls"] == 1
+    assert profile["hotspots"][0]["line"] in (4, 8, 9)
+    assert all(line["is_hot"] for line in profile["hotspots"])
+
+
+def test_profile_reports_crashes_with_partial_results(tmp_path):
+    profile = profile_script(write_script(tmp_path, "x = 1\nraise ValueError('boom')\n"))
+
+    assert "ValueError: boom" in profile["error"]
+    assert [line["line"] for line in profile["lines"]] == [1, 2]
+
+
+def test_debugger_asks_llm_about_top_hotspots(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG["profiling"], "llm_hotspots", 1)
+    backend = StubBackend()
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+
+    profile = debugger.profile_file(write_script(tmp_path), args=["500"])
+
+    assert backend.calls == 1
+    assert "suggestion" in profile["hotspots"][0]
+    assert all("suggestion" not in hotspot for hotspot in profile["hotspots"][1:])
+
+
+LEAK = """import time
+cache = []
+
+def load(i):
+    return bytearray(50000)
+
+for i in range(40):
+    cache.append(load(i))
+    time.sleep(0.01)
+"""
+
+
+def test_memory_profile_flags_growth_inside_loops(tmp_path):
+    profile = profile_memory(write_script(tmp_path, LEAK), interval_ms=20)
+
+    assert profile["error"] is None and profile["timeline"]
+    assert profile["peak_traced_kb"] >= 40 * 50000 // 1024
+    assert profile["hotspots"][0]["line"] == 5
+    finding = next(finding for finding in profile["findings"] if finding["issue"] == "Memory Growth")
+    assert finding["line"] == 5 and finding["category"] == "Memory"
+    assert "loop at line 8" in finding["message"]
+
+
+def test_analyze_file_can_include_memory_findings(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG["profiling"], "memory", dict(DEFAULT_CONFIG["profiling"]["memory"],
+                                                                    in_analysis=True, interval_ms=20))
+    debugger = Debugger(llm_model="small", llm_backend=StubBackend(), llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+
+    result = debugger.analyze_file(write_script(tmp_path, LEAK))
+
+    assert any(error["issue"] == "Memory Growth" and error["line"] == 5 for error in result["errors"])
@@ -0,0 +1,128 @@
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.prompt_builder import PromptBuilder, approximate_tokens
+
+SOURCE = '''import math
+
+RATE = 3
+
+
+def helper(value):
+    return math.sqrt(value) * RATE
+
+
+def unrelated():
+    data = [i for i in range(100)]
+    return sum(data) + len(data) * 2 - max(data)
+
+
+def target(items):
+    total = 0
+    for item in items:
+        total += helper(item)
+    return total
+
+
+result = target([1, 2, 3])
+'''
+
+
+def test_line_context_keeps_enclosing_function_and_referenced_definitions():
+    builder = PromptBuilder(budget=200)
+    context = builder.select_context(SOURCE, line_number=19)
+
+    assert "def target(items):" in context
+    assert "def helper(value):" in context
+    assert "def unrelated" not in context
+    assert context.rstrip().endswith("return total")
+
+
+def test_referenced_definitions_shrink_to_signatures_when_over_budget():
+    focus = "def target" + SOURCE.split("def target")[1].split("\n\n\n")[0]
+    builder = PromptBuilder(budget=approximate_tokens(focus) + 10)
+    context = builder.select_context(SOURCE, line_number=19)
+
+    assert "def target(items):" in context
+    assert "def helper(value):\n    ..." in context
+    assert "math.sqrt" not in context
+
+
+def test_module_level_line_uses_small_window():
+    builder = PromptBuilder(budget=500)
+    context = builder.select_context(SOURCE, line_number=23)
+
+    assert context.splitlines()[-1] == "result = target([1, 2, 3])"
+    assert len(context.splitlines()) <= 5
+
+
+def test_unparseable_code_falls_back_to_line_window():
+    code = "\n".join(f"x{i} = {i}" for i in range(50)) + "\nif x = 1\n"
+    context = PromptBuilder(budget=30).select_context(code, line_number=51)
+
+    assert "if x = 1" in context
+    assert approximate_tokens(context) <= 30
+
+
+def test_build_fits_budget_including_template():
+    builder = PromptBuilder(budget=60)
+    prompt, context = builder.build("Explain:\n{context}\nThanks {name}", SOURCE * 5, name="you")
+
+    assert prompt.startswith("Explain:\n")
+    assert approximate_tokens(prompt) <= 60
+    assert "def helper(value):" in context
+
+
+def test_split_chunks_cover_file_on_unit_boundaries():
+    code = SOURCE * 4
+    chunks = PromptBuilder(budget=60).split_chunks(code)
+    lines = code.splitlines()
+
+    assert chunks[0]["start_line"] == 1
+    assert chunks[-1]["end_line"] == len(lines)
+    for previous, following in zip(chunks, chunks[1:]):
+        assert previous["end_line"] + 1 == following["start_line"]
+    for chunk in chunks:
+        assert chunk["code"] == "\n".join(lines[chunk["start_line"] - 1:chunk["end_line"]])
+        assert approximate_tokens(chunk["code"]) <= 60
+        first_line = chunk["code"].lstrip("\n").splitlines()[0]
+        assert not first_line.startswith(" ")
+
+
+def test_oversized_function_is_split_inside_its_body():
+    body = "\n".join(f"    value_{i} = compute({i}, {i + 1})" for i in range(40))
+    code = f"def big():\n{body}\n    return value_0\n"
+    chunks = PromptBuilder(budget=80).split_chunks(code)
+
+    assert len(chunks) > 1
+    assert chunks[0]["code"].startswith("def big():")
+    assert all(approximate_tokens(chunk["code"]) <= 80 for chunk in chunks)
+
+
+def _analyze_prompts(tmp_path, monkeypatch, source):
+    path = tmp_path / "script.py"
+    path.write_text(source)
+    debugger = Debugger(llm_backend=StubBackend(), llm_cache=LLMCache())
+    prompts = []
+    monkeypatch.setattr(debugger, "_generate", lambda task, code, prompt, **kwargs: prompts.append(prompt))
+    debugger.analyze_file(str(path))
+    return prompts
+
+
+def test_analyze_prompt_includes_the_runtime_error(tmp_path, monkeypatch):
+    prompts = _analyze_prompts(tmp_path, monkeypatch, "values = []\nprint(values[3])\n")
+    assert len(prompts) == 1
+    assert "IndexError: list index out of range" in prompts[0]
+    assert "Traceback (most recent call last)" not in prompts[0]
+    assert prompts[0].endswith("print(values[3])\n")
+
+
+def test_analyze_prompt_includes_syntax_errors_once(tmp_path, monkeypatch):
+    prompts = _analyze_prompts(tmp_path, monkeypatch, "x = 1\nif x == 1\n    print(x)\n")
+    assert prompts[0].startswith("The following Python code fails with:\nSyntax Error on line 2: ")
+    assert "Traceback" not in prompts[0] and prompts[0].count("Syntax Error") == 1
+
+
+def test_analyze_prompt_is_only_the_code_without_errors(tmp_path, monkeypatch):
+    prompts = _analyze_prompts(tmp_path, monkeypatch, "x = 1\nprint(x)\n")
+    assert prompts == ["x = 1\nprint(x)\n"]
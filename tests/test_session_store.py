@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from ai_debugger.session_store import SessionStore, content_hash, file_content_hash
+
+
+def test_save_and_load_roundtrip():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionStore(directory)
+        snapshot = {
+            "file_path": "script.py",
+            "content_hash": "abc",
+            "debugger": {"current_line": 4, "breakpoints": {"script.py": [2, 9]}},
+            "analysis": None
+        }
+
+        assert store.save("session-1", snapshot)
+        loaded = store.load("session-1")
+        assert loaded["debugger"] == snapshot["debugger"]
+        assert os.listdir(directory) == ["session-1.json.gz"]
+
+        store.delete("session-1")
+        assert store.load("session-1") is None
+
+
+def test_directory_is_created_on_first_save():
+    with tempfile.TemporaryDirectory() as parent:
+        directory = os.path.join(parent, "sessions")
+        store = SessionStore(directory)
+        assert not os.path.exists(directory)
+
+        assert store.save("session-1", {})
+        assert os.path.exists(directory)
+
+
+def test_debugger_snapshot_restore_roundtrip():
+    from ai_debugger.debugger import Debugger
+    from ai_debugger.llm_backends import StubBackend
+
+    debugger = Debugger(llm_backend=StubBackend())
+    debugger.current_file = "script.py"
+    debugger.current_line = 7
+    debugger.breakpoints = {"script.py": [2, 9]}
+    debugger.call_stack = [{"file": "script.py", "line": 3, "function": "f", "locals": {"handle": object()}}]
+    debugger.variables = {"items": [1, 2], "pair": (1, "a")}
+
+    restored = Debugger(llm_backend=StubBackend())
+    restored.restore(json.loads(json.dumps(debugger.snapshot())))
+
+    assert (restored.current_file, restored.current_line) == ("script.py", 7)
+    assert restored.breakpoints == {"script.py": [2, 9]}
+    assert restored.call_stack[0]["function"] == "f"
+    assert isinstance(restored.call_stack[0]["locals"]["handle"], str)
+    assert restored.variables["items"] == [1, 2]
+
+
+def test_disabled_store_is_noop():
+    store = SessionStore(None)
+    assert not store.enabled
+    assert not store.save("session-1", {})
+    assert store.load("session-1") is None
+
+
+def test_rejects_path_like_session_ids():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionStore(directory)
+        assert store.load("../etc/passwd") is None
+
+
+def test_file_content_hash_matches_content_hash():
+    with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp:
+        temp.write("print('hi')\n")
+        temp_path = temp.name
+
+    try:
+        assert file_content_hash(temp_path) == content_hash("print('hi')\n")
+    finally:
+        os.unlink(temp_path)
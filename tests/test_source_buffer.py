@@ -0,0 +1,83 @@
+import os
+import tempfile
+import pytest
+from ai_debugger.source_buffer import SourceBuffer
+from ai_debugger.session_store import content_hash
+
+
+def _write_temp(content):
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix=".py") as temp:
+        temp.write(content)
+        return temp.name
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"x = 1",
+    b"x = 1\n",
+    b"x = 1\ny = 2\n\nz = 3",
+    "s = 'é'\r\nprint(s)\r\n".encode("utf-8"),
+])
+def test_lines_match_readlines(content):
+    path = _write_temp(content)
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            expected = f.readlines()
+
+        with SourceBuffer(path) as buffer:
+            assert len(buffer) == len(expected)
+            assert list(buffer) == expected
+            assert buffer[1:3] == expected[1:3]
+            assert buffer.text() == content.decode("utf-8")
+            assert buffer.sha256() == content_hash(content)
+    finally:
+        os.unlink(path)
+
+
+def test_line_index_errors():
+    path = _write_temp(b"a\nb\n")
+    try:
+        with SourceBuffer(path) as buffer:
+            assert buffer[-1] == "b\n"
+            with pytest.raises(IndexError):
+                buffer.line(2)
+    finally:
+        os.unlink(path)
+
+
+def test_remaps_after_truncation():
+    path = _write_temp(b"a = 1\nb = 2\nc = 3\n")
+    try:
+        with SourceBuffer(path) as buffer:
+            with open(path, 'wb') as f:
+                f.write(b"a = 1\n")
+            assert len(buffer[0:1]) == 1
+            assert len(buffer) == 1
+    finally:
+        os.unlink(path)
+
+
+def test_remaps_after_same_size_edit():
+    path = _write_temp(b"a = 1\nb = 2\nc = 3\n")
+    try:
+        with SourceBuffer(path) as buffer:
+            assert buffer[1] == "b = 2\n"
+            stat = os.stat(path)
+            with open(path, 'r+b') as f:
+                f.write(b"a = 10\nb = 2\nc=3\n")
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            assert buffer[1] == "b = 2\n"
+            assert buffer[0:3] == ["a = 10\n", "b = 2\n", "c=3\n"]
+    finally:
+        os.unlink(path)
+
+
+def test_remaps_after_file_is_replaced():
+    path = _write_temp(b"old = 1\n")
+    try:
+        with SourceBuffer(path) as buffer:
+            replacement = _write_temp(b"new = 1\n")
+            os.replace(replacement, path)
+            assert list(buffer) == ["new = 1\n"]
+    finally:
+        os.unlink(path)
@@ -0,0 +1,69 @@
+import ast
+from ai_debugger.static_analyzer import CHECKERS, Checker, StaticAnalyzer, _CheckerDispatcher, configured_checkers
+
+CODE = """
+import os
+import sys
+
+def Compute(values):
+    unused = 1
+    total = 0
+    for value in values:
+        if value > 0 and value < 10:
+            total += value
+    return total
+
+class lower_case:
+    def method(self):
+        print(sys.argv)
+"""
+
+
+def test_checkers_report_with_line_numbers():
+    issues = StaticAnalyzer.analyze_code(CODE)
+    found = [(issue["line"], issue["issue"]) for issue in issues]
+
+    assert (2, "Unused Import") in found
+    assert (3, "Unused Import") not in found
+    assert (5, "Naming Convention") in found
+    assert (6, "Unused Variable") in found
+    assert (7, "Unused Variable") not in found
+    assert (13, "Naming Convention") in found
+    assert [line for line, _ in found] == sorted(line for line, _ in found)
+
+
+def test_enabled_checkers_filter_and_timings():
+    result = StaticAnalyzer.run(CODE, enabled_checkers=["naming"])
+    assert {issue["issue"] for issue in result["issues"]} == {"Naming Convention"}
+    assert list(result["timings"]) == ["naming"]
+    assert StaticAnalyzer.run(CODE, enabled_checkers=[]) == {"issues": [], "timings": {}, "metrics": {}}
+
+
+def test_configured_checkers_keep_empty_for_older_user_lists():
+    assert configured_checkers({"enabled_checkers": ["unused", "naming"]}) == ["unused", "naming", "empty"]
+    assert configured_checkers({"enabled_checkers": ["empty", "naming"]}) == ["empty", "naming"]
+    assert configured_checkers({"enabled_checkers": ["unused", "naming"], "disabled_checkers": ["empty", "naming"]}) == [
+        "unused"]
+    assert configured_checkers({}) is None
+
+
+def test_complexity_limit_is_configurable():
+    issues = StaticAnalyzer.analyze_code(CODE, ["complexity"], {"max_complexity": 3})
+    assert [(issue["line"], issue["issue"]) for issue in issues] == [(5, "High Complexity")]
+    assert "complexity 4" in issues[0]["message"]
+
+
+def test_all_checkers_share_one_traversal():
+    class CountingDispatcher(_CheckerDispatcher):
+        visits = 0
+
+        def visit(self, node):
+            CountingDispatcher.visits += 1
+            super().visit(node)
+
+    tree = ast.parse(CODE)
+    node_count = sum(1 for _ in ast.walk(tree))
+    CountingDispatcher([CHECKERS[name]() for name in CHECKERS]).visit(tree)
+
+    assert CountingDispatcher.visits == node_count
+    assert all(issubclass(checker, Checker) for checker in CHECKERS.values())
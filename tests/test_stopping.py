@@ -0,0 +1,46 @@
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.model_router import ModelRouter
+from ai_debugger.stopping import stop_position, truncate_completion
+
+
+def test_stop_sequences_ignore_leading_whitespace():
+    assert stop_position("\n  x = 1\ny = 2", stop=["\n"]) == 8
+    assert stop_position("\n\n", stop=["\n"]) is None
+    assert truncate_completion("PROMPT", "PROMPT\nx = 1\ny = 2", {"stop": ["\n"]}) == "PROMPT\nx = 1"
+    assert truncate_completion("PROMPT", "PROMPT\nx = 1\ny = 2", {}) == "PROMPT\nx = 1\ny = 2"
+
+
+def test_stop_on_closing_fence():
+    completion = "```python\nx = 1\n```\nExplanation follows"
+    assert completion[:stop_position(completion, stop_on_fence=True)] == "```python\nx = 1\n```"
+    assert stop_position("```python\nx = 1\n", stop_on_fence=True) is None
+
+
+def test_complete_line_waits_for_multiline_statements():
+    completion = "```python\nresult = compute(a,\n                 b)\nprint(result)\n"
+    assert completion[:stop_position(completion, complete_line=True)].endswith("b)")
+    assert stop_position("    if x == 1:\n        y()", complete_line=True) == len("    if x == 1:")
+    assert stop_position("if x = 1\n", complete_line=True) is None
+
+
+def test_stub_terminates_early_on_stop():
+    backend = StubBackend(output_tokens=40, line_tokens=5)
+    text = backend.generate("PROMPT", "m", max_new_tokens=100, stop=["\n"])
+
+    assert len(text.split("\n", 1)[1].split()) == 5
+    assert backend.generated_tokens == 6
+    assert len(backend.generate("PROMPT", "m", max_new_tokens=100).split()) == 41
+
+
+def test_tasks_use_max_new_tokens_and_stops():
+    backend = StubBackend(output_tokens=1000, line_tokens=4)
+    debugger = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(),
+                        llm_router=ModelRouter("small"))
+
+    debugger.explain_code("def f(x):\n    return x + 1\n")
+    assert backend.generated_tokens == 256
+
+    assert debugger._generation_params("analyze") == {"max_new_tokens": debugger.max_length}
+    assert debugger._generation_params("auto_fix_line")["complete_line"]
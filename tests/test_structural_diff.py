@@ -0,0 +1,89 @@
+from ai_debugger.debugger import Debugger
+from ai_debugger.llm_backends import StubBackend
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.structural_diff import normalized_hash, structural_diff
+
+OLD = '''import os
+
+class Greeter:
+    def greet(self, name):
+        """Say hello."""
+        return 'Hello, ' + name  # greeting
+
+    def leave(self):
+        return 'bye'
+
+
+def helper(x):
+    return x+1
+
+
+def obsolete():
+    return os.getcwd()
+'''
+
+NEW = '''import os
+
+
+def assist(x):
+    return x + 1
+
+
+class Greeter:
+    def greet(self, name):
+        """
+        Say hello.
+        """
+        return "Hello, " + name
+
+    def leave(self):
+        return "goodbye"
+
+
+def added():
+    return None
+'''
+
+
+def statuses(diff):
+    return {unit["name"]: unit["status"] for unit in diff["units"]}
+
+
+def test_structural_diff_classifies_units():
+    diff = structural_diff(OLD, NEW)
+
+    assert statuses(diff) == {
+        "<module>": "unchanged",
+        "assist": "renamed",
+        "Greeter": "moved",
+        "Greeter.greet": "reformatted",
+        "Greeter.leave": "modified",
+        "added": "added",
+        "obsolete": "removed"
+    }
+    assert next(unit for unit in diff["units"] if unit["name"] == "assist")["old_name"] == "helper"
+    assert diff["changed"] == ["Greeter.leave", "added"]
+
+
+def test_normalized_hash_ignores_formatting_and_comments():
+    assert normalized_hash("x = [1,2]  # note\n") == normalized_hash("x = [\n    1,\n    2,\n]\n")
+    assert normalized_hash("x = [1, 2]\n") != normalized_hash("x = [2, 1]\n")
+    assert normalized_hash("def broken(:\n") is None
+    assert "error" in structural_diff("def broken(:\n", NEW)
+
+
+def test_chunked_analysis_reuses_results_for_reformatted_code():
+    backend = StubBackend(output_tokens=4)
+    debugger = Debugger(llm_backend=backend, llm_cache=LLMCache())
+    debugger.prompt_builder.budget = 60
+
+    # One function per chunk, so reformatting can't move chunk boundaries.
+    body = "".join(f"    total += x * {j}\n" for j in range(6))
+    debugger._analyze_chunks("module.py", "\n".join(
+        f"def f{i}(x):\n    total = 0\n{body}    return total+{i}\n" for i in range(4)))
+    calls = backend.calls
+    findings = debugger._analyze_chunks("module.py", "\n".join(
+        f"def f{i}(x):\n    total = 0\n{body}    return total + {i}  # ok\n" for i in range(4)))
+
+    assert backend.calls == calls
+    assert findings and all("def f" not in finding["message"] for finding in findings)
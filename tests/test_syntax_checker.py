@@ -127,6 +127,11 @@ def test_analyze_changes():
     changes = debugger.analyze_changes(old_file_path, new_file_path)
     assert "changed_lines" in changes
     assert len(changes["changed_lines"]) > 0
+    # Removals are numbered in the old file, additions in the new one.
+    assert changes["removed_lines"] == [2, 4]
+    assert changes["added_lines"] == [2, 4, 5, 6, 7]
+    assert changes["removed_info"][4]["content"] == 'greet("World!")'
+    assert changes["old_to_new"] == [0, -1, 2, -1]
 
 
 def test_analyze_file():
@@ -136,3 +141,115 @@ def test_analyze_file():
     assert "fixes" in result
     assert "validated_issues" in result
     assert "report" in result
+
+
+def test_check_all_recovers_after_each_error():
+    code = (
+        "def f(x)\n"
+        "    y = (1,\n"
+        "    return y\n"
+        "\n"
+        "if x = 1:\n"
+        "    pass\n"
+        "  z = 3\n"
+        "else:\n"
+        "    pass\n"
+        "print 'hi'\n"
+        "while True:\n"
+    )
+    errors = SyntaxChecker.check_all(code)
+
+    assert [error["line"] for error in errors] == [1, 2, 5, 7, 10, 11]
+    assert errors[1]["message"] == "'(' was never closed"
+    assert "unindent" in errors[3]["message"]
+    assert all(error["error"] == "Syntax Error" and error["fix_suggestion"] for error in errors)
+    assert SyntaxChecker.check_all("def f():\n    return [x for x in y]\n") == []
+
+
+def test_analyze_file_reports_every_syntax_error():
+    file_path = os.path.join(os.path.dirname(__file__), "test_files", "broken_script.py")
+
+    errors = SyntaxChecker.analyze_file_all(file_path)
+
+    assert [error["line"] for error in errors] == [1, 4]
+
+
+def test_scan_code_finds_line_heuristics_in_one_pass():
+    code = (
+        "def f(x)\n"
+        "    if x = 1\n"
+        "        s = 'abc\n"
+        "    doc = \"\"\"text\"\"\" if x else f(k=1)\n"
+        "    return x\n"
+    )
+    findings = SyntaxChecker.scan_code(code)
+
+    assert [(finding["line"], finding["fixed_line"]) for finding in findings] == [
+        (1, "def f(x):"), (2, "    if x == 1:"), (3, "        s = 'abc'")]
+    assert "comparison" in findings[1]["message"] and "colon" in findings[1]["message"]
+    assert SyntaxChecker.analyze_line('x = """abc"""', 0) is None
+
+
+def test_scan_code_leaves_one_line_bodies_alone():
+    code = (
+        "if x: y = 1\n"
+        "while x: total = total + 1\n"
+        "if flag = 1: count = 1\n"
+    )
+    findings = SyntaxChecker.scan_code(code)
+
+    assert [(finding["line"], finding["fixed_line"]) for finding in findings] == [(3, "if flag == 1: count = 1")]
+
+
+def test_auto_fix_keeps_valid_one_line_bodies(tmp_path):
+    from ai_debugger.llm_backends import StubBackend
+    from ai_debugger.llm_cache import LLMCache
+    from ai_debugger.model_router import ModelRouter
+
+    fixer = Debugger(llm_model="small", llm_backend=StubBackend(), llm_cache=LLMCache(),
+                     llm_router=ModelRouter("small"))
+    path = tmp_path / "script.py"
+    path.write_text("flag = True\nif flag: count = 1\ndef broken()\n    return 1\n")
+
+    fixed_code, changes = fixer.auto_fix_file(str(path))
+
+    assert "if flag: count = 1\n" in fixed_code
+    assert [change["line"] for change in changes] == [3]
+
+
+def test_auto_fix_ignores_performance_advice(tmp_path, monkeypatch):
+    from ai_debugger.llm_backends import StubBackend
+    from ai_debugger.llm_cache import LLMCache
+    from ai_debugger.model_router import ModelRouter
+
+    fixer = Debugger(llm_model="small", llm_backend=StubBackend(), llm_cache=LLMCache(),
+                     llm_router=ModelRouter("small"))
+    path = tmp_path / "script.py"
+    code = "def join(items):\n    out = ''\n    for item in items:\n        out += str(item)\n    return out\n"
+    path.write_text(code)
+    # No LLM or pylint findings, so the string-concatenation advice is the only issue in the file.
+    monkeypatch.setattr(fixer, "_generate", lambda *args, **kwargs: None)
+    monkeypatch.setattr("ai_debugger.debugger.analyze_code_with_pylint",
+                        lambda file_path: {"errors": [], "output": ""})
+
+    fixed_code, changes = fixer.auto_fix_file(str(path))
+
+    assert any(error.get("category") == "Performance" for error in fixer.analyze_file(str(path))["errors"])
+    assert fixed_code == code
+    assert changes == []
+
+
+def test_auto_fix_applies_scanner_fixes_without_llm_calls():
+    from ai_debugger.llm_backends import StubBackend
+    from ai_debugger.llm_cache import LLMCache
+    from ai_debugger.model_router import ModelRouter
+
+    backend = StubBackend()
+    fixer = Debugger(llm_model="small", llm_backend=backend, llm_cache=LLMCache(), llm_router=ModelRouter("small"))
+    file_path = os.path.join(os.path.dirname(__file__), "test_files", "broken_script.py")
+
+    fixed_code, changes = fixer.auto_fix_file(file_path)
+
+    assert [change["fixed"] for change in changes] == ["def missing_colon():", "if True:"]
+    assert SyntaxChecker.check_all(fixed_code) == []
+    assert backend.calls == 1
@@ -0,0 +1,52 @@
+import pytest
+
+from ai_debugger.llm_cache import LLMCache
+from ai_debugger.utils import analyze_complexity, complexity_rank, format_code, format_files, python_files
+
+UNFORMATTED = "def f( x ):\n    return x+1\n"
+
+
+def test_format_code_is_a_dry_run_by_default(tmp_path):
+    pytest.importorskip("black")
+    path = tmp_path / "mod.py"
+    path.write_text(UNFORMATTED)
+
+    formatted = format_code(str(path))
+
+    assert formatted == "def f(x):\n    return x + 1\n"
+    assert path.read_text() == UNFORMATTED
+    format_code(str(path), write=True)
+    assert path.read_text() == formatted
+
+
+def test_format_files_reports_diffs_errors_and_hits_the_cache(tmp_path):
+    pytest.importorskip("black")
+    (tmp_path / "a.py").write_text(UNFORMATTED)
+    (tmp_path / "b.py").write_text("x = 1\n")
+    (tmp_path / "c.py").write_text("def broken(:\n")
+    cache = LLMCache(max_entries=16)
+    paths = python_files([str(tmp_path)])
+
+    results = format_files(paths, cache=cache)
+    format_files(paths, cache=cache)
+
+    assert [result.get("changed") for result in results] == [True, False, None]
+    assert "+def f(x):" in results[0]["diff"]
+    assert results[1]["diff"] == ""
+    assert "error" in results[2]
+    assert cache.stats()["hits"] == 2
+
+
+def test_analyze_complexity_ranks_blocks_and_caches(tmp_path):
+    path = tmp_path / "mod.py"
+    branches = "".join(f"    if x == {i}:\n        return {i}\n" for i in range(6))
+    path.write_text("def simple():\n    return 1\n\n\ndef branchy(x):\n" + branches + "    return -1\n")
+    cache = LLMCache(max_entries=16)
+
+    blocks = analyze_complexity(str(path), cache=cache)
+
+    assert [(block["name"], block["complexity"], block["rank"]) for block in blocks] == [
+        ("simple", 1, "A"), ("branchy", 7, "B")]
+    assert analyze_complexity(str(path), cache=cache) == blocks
+    assert cache.stats()["hits"] == 1
+    assert [complexity_rank(value) for value in (5, 6, 41)] == ["A", "B", "F"]
@@ -0,0 +1,48 @@
+import pytest
+from ai_debugger.variable_inspector import VariableInspector
+
+
+def test_describe_truncates_large_values():
+    inspector = VariableInspector(max_repr_length=40)
+    handle = inspector.describe("data", list(range(100000)))
+
+    assert handle["type"] == "list"
+    assert handle["length"] == 100000
+    assert handle["has_children"]
+    assert len(handle["repr"]) <= 40
+
+
+def test_children_are_paginated():
+    inspector = VariableInspector(page_size=10)
+    variables = {"data": {"k%d" % i: i for i in range(100)}}
+
+    page = inspector.children(variables, "data", offset=20, limit=5)
+    assert page["total"] == 100
+    assert [item["ref"] for item in page["items"]] == ["data/20", "data/21", "data/22", "data/23", "data/24"]
+    assert page["items"][0]["key"] == "'k20'"
+    assert page["items"][0]["repr"] == "20"
+
+    page = inspector.children(variables, "data", limit=1000)
+    assert page["limit"] == 10
+    assert len(page["items"]) == 10
+
+
+def test_resolve_nested_ref():
+    inspector = VariableInspector()
+    variables = {"rows": [[1, 2], [3, [4, 5]]]}
+
+    assert inspector.resolve(variables, "rows/1/1/0") == 4
+    with pytest.raises(KeyError):
+        inspector.resolve(variables, "rows/5")
+    with pytest.raises(KeyError):
+        inspector.resolve(variables, "missing")
+
+
+def test_reprs_cached_per_step():
+    inspector = VariableInspector()
+    value = [1, 2, 3]
+
+    first = inspector.describe("value", value, step_key=1)
+    value.append(4)
+    assert inspector.describe("value", value, step_key=1) is first
+    assert inspector.describe("value", value, step_key=2)["length"] == 4